@@ -0,0 +1,58 @@
+"""
+gunicorn.conf.py
+
+Descripción: Configuración de Gunicorn para ejecutar la API (gunicorn).
+
+Detalles:
+- La aplicación y los modelos se cargan una sola vez en el proceso principal, antes de crear los procesos de
+  trabajo, que los comparten (copia al escribir). El archivo de la base de datos, los candados y los hilos de cada
+  proceso se preparan después del fork (ver main.iniciar_proceso_trabajo).
+- Los procesos de trabajo comparten la base de datos, las lápidas, el registro de cambios y las claves de
+  idempotencia a través de archivos bloqueados entre procesos. Las cachés de cada proceso se invalidan al detectar
+  los cambios de otro, y los clientes de /eventos reciben un evento "reinicio" cuando otro proceso cambió los datos.
+- Los comandos que se ejecutan mientras la API está en marcha se coordinan con ella bloqueando el archivo de la
+  base de datos.
+- Los traductores de CTranslate2 no sobreviven a un fork, por lo que cada proceso de trabajo los carga al iniciar.
+"""
+
+import gc
+import json
+import os
+
+
+# Los modelos se precargan en when_ready, no en un hilo de la aplicación (los hilos no sobreviven al fork)
+os.environ.setdefault("EVALUADOR_PRECARGA_MODELOS", "no")
+
+wsgi_app = "main:crear_app()"
+bind = "0.0.0.0:5000"
+# Un proceso de trabajo por CPU (o WEB_CONCURRENCY)
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+# Hilos del proceso: cada cliente de /eventos mantiene ocupado un hilo mientras está conectado
+worker_class = "gthread"
+threads = 32
+preload_app = True
+
+
+def when_ready(server):
+    """
+    Precarga los modelos en el proceso principal, antes de crear los procesos de trabajo.
+    """
+
+    import main
+
+    pares = json.loads(os.environ.get("EVALUADOR_PARES_PRECARGA", "null"))
+    main.registro_modelos.precargar(pares, calentar=False)
+
+    # Evitar que el recolector de basura modifique (y copie) las páginas compartidas en cada proceso
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Carga los traductores y prepara el estado propio del proceso de trabajo (ver main.iniciar_proceso_trabajo).
+    """
+
+    import main
+
+    main.registro_modelos.calentar()
+    main.iniciar_proceso_trabajo(server.app.wsgi())
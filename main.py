@@ -19,1231 +19,7751 @@ TODO:
 * Reestructurar el proyecto en carpetas
 """
 
-import argostranslate.package
-import argostranslate.translate
+import base64
+import click
+import contextvars
+import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import logging
+import math
+import numpy as np
+import os
+import re
+import secrets
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from functools import wraps
 from datetime import datetime
-from flask import Flask, request, jsonify
+from logging.handlers import RotatingFileHandler
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, request, jsonify, stream_with_context
 from tinydb import TinyDB, Query
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from tinydb.middlewares import Middleware
+from tinydb.storages import MemoryStorage, Storage, touch
+from tinydb.table import Document, Table
+from werkzeug.local import LocalProxy
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from sentimiento_es import AnalizadorSentimientoEs
 
+# fcntl solo existe en sistemas POSIX; sin él, la base de datos y el registro de cambios solo se bloquean dentro
+# del proceso
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
+# zstandard es opcional; sin él, la base de datos solo puede comprimirse con gzip
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
+# Argos Translate y VADER se importan al usarlos por primera vez (ver RegistroModelos), porque su carga es lenta
 
 
-# inicializar base de datos
-base_de_datos = TinyDB("base_de_datos.json")
 
-# crear tablas
-softwares = base_de_datos.table("softwares")
-evaluaciones = base_de_datos.table("evaluaciones")
-resultados = base_de_datos.table("resultados")
+
+
+# tablas de la base de datos de la aplicación actual (ver crear_app)
+softwares = LocalProxy(lambda: obtener_tabla("softwares"))
+evaluaciones = LocalProxy(lambda: obtener_tabla("evaluaciones"))
+resultados = LocalProxy(lambda: obtener_tabla("resultados"))
+estadisticas = LocalProxy(lambda: obtener_tabla("estadisticas"))
+historial = LocalProxy(lambda: obtener_tabla("historial"))
+regresiones = LocalProxy(lambda: obtener_tabla("regresiones"))
+contadores = LocalProxy(lambda: obtener_tabla("contadores"))
 
 # constante para indicar que no hay valor
 SIN_VALOR = -1
 
+# cantidad máxima de elementos por bloque al remuestrear (limita la memoria usada por el bootstrap)
+ELEMENTOS_POR_BLOQUE = 1 << 22
+
+# motores de análisis de sentimientos: VADER sobre la traducción al inglés, o léxico en español sin traducción
+MOTORES_SENTIMIENTO = ["vader", "lexico_es"]
+
+# idioma de los comentarios cuando no se puede detectar
+IDIOMA_PREDETERMINADO = "es"
+
+# palabras frecuentes de cada idioma, usadas para detectar el idioma de los comentarios
+PALABRAS_IDIOMA = {
+    "es": {
+        "el", "la", "los", "las", "de", "del", "que", "y", "en", "un", "una", "es", "por", "con", "para", "muy",
+        "pero", "se", "lo", "me", "mi", "su", "al", "como", "más", "mas", "está", "esta", "son", "hay", "también",
+        "cuando", "porque", "algunas", "algunos", "todo", "todas", "veces", "sin", "sobre", "fácil", "bien",
+    },
+    "en": {
+        "the", "and", "is", "it", "to", "of", "in", "that", "this", "for", "with", "are", "was", "but", "not",
+        "very", "have", "has", "be", "my", "i", "you", "on", "can", "too", "would", "some", "sometimes", "easy",
+        "great", "good", "bad", "love", "like", "really", "use", "app", "slow", "fast", "works", "nice", "don't",
+    },
+    "pt": {
+        "o", "os", "as", "da", "do", "das", "dos", "em", "um", "uma", "não", "muito", "com", "para", "mas", "é",
+        "são", "está", "também", "às", "vezes", "gosto", "fácil", "bom", "boa", "ótimo", "você", "isso", "nao",
+    },
+    "fr": {
+        "le", "les", "des", "est", "et", "un", "une", "du", "pas", "très", "avec", "pour", "mais", "je", "il",
+        "ce", "c'est", "sont", "dans", "sur", "facile", "j'aime", "bien", "trop", "parfois", "aussi", "nous",
+    },
+    "it": {
+        "il", "lo", "gli", "della", "di", "che", "è", "e", "un", "una", "non", "molto", "con", "per", "ma", "sono",
+        "anche", "mi", "piace", "facile", "bello", "buono", "volte", "questo", "questa", "troppo", "nel",
+    },
+    "de": {
+        "der", "die", "das", "und", "ist", "nicht", "sehr", "mit", "für", "aber", "ein", "eine", "ich", "es",
+        "sind", "auch", "zu", "gut", "einfach", "manchmal", "mir", "gefällt", "schnell", "langsam",
+    },
+}
+
+# palabras frecuentes (o caracteres propios) mínimas para detectar un idioma distinto del predeterminado: con menos,
+# una palabra compartida (p. ej. "e" en "Rápido e intuitivo") bastaría para tomar un comentario en español por otro
+# idioma
+EVIDENCIA_MINIMA_IDIOMA = 2
+
+# caracteres propios de cada idioma, que cuentan como una palabra frecuente más
+CARACTERES_IDIOMA = {"es": "ñ¿¡", "pt": "ãõç", "de": "ßäöü", "fr": "œêèà", "it": "ìò"}
+
+# expresión regular para separar las palabras de un comentario al detectar su idioma
+PATRON_PALABRAS = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+# bytes iniciales de los archivos comprimidos, para reconocer el formato de la base de datos al leerla
+MAGIA_COMPRESION = {"gzip": b"\x1f\x8b", "zstd": b"\x28\xb5\x2f\xfd"}
+
+# nombres válidos de los inquilinos (también son el nombre de su archivo, por lo que no admiten otras rutas)
+PATRON_INQUILINO = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# métricas de cada software, guardadas también en cada revisión del historial
+METRICAS_SOFTWARE = ["eficacia", "eficiencia", "satisfaccion_pun", "satisfaccion_com", "satisfaccion", "usabilidad"]
+
+# campos de las matrices de evaluación, con historial de revisiones
+CAMPOS_EVALUACION = ["tareas", "tiempos", "puntajes", "comentarios"]
+
+# tipos enteros usados por las matrices compactas, del más pequeño al más grande
+TIPOS_COMPACTOS = ["<i2", "<i4", "<i8"]
+
+# formatos de exportación soportados y tipo de contenido de cada uno
+FORMATOS_EXPORTACION = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# columnas de las filas exportadas (una fila por valor, en formato largo)
+COLUMNAS_EXPORTACION = [
+    "id_soft", "nombre", "version", "origen", "campo", "fila", "columna", "clave", "valor", "texto"
+]
+
+# cantidad de filas por bloque de salida al exportar
+FILAS_POR_BLOQUE = 10000
+
+# rutas cuyas solicitudes pueden repetirse con la cabecera Idempotency-Key sin volver a ejecutarse
+RUTAS_IDEMPOTENTES = {
+    "evaluador.nuevo_software", "evaluador.eliminar_soft", "evaluador.nuevos_softwares",
+    "evaluador.eliminar_softwares_ruta", "evaluador.guardar_tareas", "evaluador.guardar_tiempos",
+    "evaluador.guardar_puntajes", "evaluador.guardar_comentarios", "evaluador.lote", "evaluador.confirmar_subida",
+}
+
+# rutas que atiende una réplica de solo lectura (ver ORIGEN_REPLICA)
+RUTAS_LECTURA = {
+    "evaluador.listar", "evaluador.obtener_soft", "evaluador.obtener_estadisticas", "evaluador.obtener_val_tareas",
+    "evaluador.obtener_val_tiempos", "evaluador.obtener_val_puntajes", "evaluador.obtener_val_comentarios",
+    "evaluador.obtener_res_tareas", "evaluador.obtener_res_tiempos", "evaluador.obtener_res_puntajes",
+    "evaluador.obtener_res_comentarios", "evaluador.exportar", "evaluador.healthz", "evaluador.readyz",
+    "evaluador.readyz_comentarios", "evaluador.estado_modelos", "evaluador.obtener_metricas",
+    "evaluador.estado_replica", "evaluador.cambios", "evaluador.listar_regresiones",
+}
+
+# tablas copiadas en el registro de cambios, y campo de cada entrada con el documento de cada una
+TABLAS_REPLICADAS = {
+    "softwares": "software", "evaluaciones": "evaluacion", "resultados": "resultado", "estadisticas": "estadistica",
+    "regresiones": "regresion",
+}
+
+# rutas que pueden ejecutarse como operaciones de un lote (ver la ruta /lote)
+OPERACIONES_LOTE = {
+    "nuevo_soft", "nuevos_softs", "listar", "eliminar_soft", "eliminar_softs", "guardar_tareas", "guardar_tiempos",
+    "guardar_puntajes", "guardar_comentarios", "obtener_soft", "obtener_estadisticas", "calcular_intervalos",
+    "obtener_val_tareas", "obtener_val_tiempos", "obtener_val_puntajes", "obtener_val_comentarios",
+    "obtener_res_tareas", "obtener_res_tiempos", "obtener_res_puntajes", "obtener_res_comentarios",
+    "listar_revisiones", "obtener_revision", "restaurar_soft", "listar_eliminados", "listar_regresiones",
+}
+
+# rutas de lectura cuyas respuestas se guardan ya serializadas (ver CacheRespuestas)
+RUTAS_RESPUESTAS = [
+    "obtener_soft", *(f"obtener_val_{campo}" for campo in CAMPOS_EVALUACION),
+    *(f"obtener_res_{campo}" for campo in CAMPOS_EVALUACION),
+]
+
+
+
+
+
+
+# configuración predeterminada de la aplicación (puede cambiarse con variables de entorno con el prefijo EVALUADOR_)
+CONFIGURACION_PREDETERMINADA = {
+    # ruta del archivo de la base de datos
+    "BASE_DE_DATOS": "base_de_datos.json",
+    # compresión del archivo de la base de datos ("gzip", "zstd" o None para JSON sin comprimir) y su nivel (None usa
+    # el nivel 1, el más rápido); los archivos se leen en cualquier formato
+    "COMPRESION_BASE_DE_DATOS": None,
+    "NIVEL_COMPRESION": None,
+    # directorio de los paquetes de Argos Translate (None usa el directorio predeterminado de Argos Translate)
+    "DIRECTORIO_MODELOS": None,
+    # motor de análisis de sentimientos usado cuando la solicitud no indica uno
+    "MOTOR_SENTIMIENTO": "vader",
+    # guardar las matrices numéricas (tareas, tiempos y puntajes) como bloques binarios compactos, que los cálculos
+    # (p. ej. el comando recalcular) recorren sin expandirlos a listas (ver FilasArreglo)
+    "MATRICES_COMPACTAS": False,
+    # cantidad máxima de modelos de traducción cargados
+    "MAX_MODELOS_TRADUCCION": 3,
+    # pares de idiomas cuya traducción se carga al precargar los modelos
+    "PARES_PRECARGA": [["es", "en"]],
+    # "fondo" precarga los modelos en un hilo al crear la aplicación; "no" los carga al usarlos (o en Gunicorn)
+    "PRECARGA_MODELOS": "fondo",
+    # hilos que traducen y analizan comentarios, y solicitudes de análisis que pueden esperar además de las atendidas
+    "HILOS_ANALISIS": os.cpu_count() or 2,
+    "COLA_ANALISIS": 8,
+    # tiempo máximo (en segundos) para analizar cada comentario, y segundos sugeridos al rechazar una solicitud
+    "TIEMPO_MAXIMO_COMENTARIO": 30,
+    "ESPERA_REINTENTO": 5,
+    # tamaño máximo del cuerpo de las solicitudes (en bytes) y dimensiones máximas de las matrices de evaluación
+    "MAX_CONTENT_LENGTH": 16 * 1024 * 1024,
+    "MAX_FILAS": 10001,
+    "MAX_COLUMNAS": 200,
+    # cantidad máxima de respuestas guardadas para repetir las solicitudes con la cabecera Idempotency-Key, y
+    # segundos tras los que se descarta la reserva de una clave cuya solicitud no terminó (p. ej. si su proceso se
+    # detuvo)
+    "MAX_CLAVES_IDEMPOTENCIA": 1000,
+    "VIGENCIA_RESERVAS_IDEMPOTENCIA": 600,
+    # tamaño máximo (en bytes) de las respuestas de lectura guardadas ya serializadas (0 no las guarda), y tamaño
+    # mínimo de las que además se guardan comprimidas con gzip (None no las comprime)
+    "MAX_BYTES_RESPUESTAS": 64 * 1024 * 1024,
+    "MIN_BYTES_GZIP": 1024,
+    # cantidad de eventos recientes que se guardan para reanudar /eventos, y segundos entre mensajes de keep-alive
+    "MAX_EVENTOS": 1000,
+    "ESPERA_EVENTOS": 15,
+    # archivo donde se agregan los cambios guardados, que leen las réplicas (None no registra los cambios), y bytes
+    # de cambios tras los que se compacta en una instantánea (None no lo compacta)
+    "REGISTRO_CAMBIOS": None,
+    "MAX_BYTES_REGISTRO": 64 * 1024 * 1024,
+    # URL del servidor principal (o ruta de su registro de cambios) para ejecutar la aplicación como réplica de
+    # solo lectura; None la ejecuta como servidor principal
+    "ORIGEN_REPLICA": None,
+    # segundos entre consultas de la réplica al registro de cambios, cambios leídos por consulta, y segundos que
+    # una lectura con X-Revision-Minima espera a que la réplica alcance esa revisión
+    "INTERVALO_REPLICA": 1.0,
+    "CAMBIOS_POR_LECTURA": 1000,
+    "ESPERA_REPLICA": 5,
+    # cada cuántas revisiones de una matriz se guarda la matriz completa en el historial (en las demás, solo las
+    # filas que cambiaron respecto a la revisión anterior)
+    "INTERVALO_INSTANTANEAS": 10,
+    # directorio de las partes de las subidas por partes (None usa un directorio temporal del sistema), filas
+    # máximas de una matriz subida por partes, y horas tras las que se eliminan las subidas sin confirmar
+    "DIRECTORIO_SUBIDAS": None,
+    "MAX_FILAS_SUBIDA": 1000001,
+    "VIGENCIA_SUBIDAS": 24,
+    # archivo de las trazas de las solicitudes (None no guarda trazas), tamaño máximo (en bytes) y copias del
+    # archivo al rotarlo, y fracción de las solicitudes que se trazan si el cliente no lo indica (traceparent)
+    "ARCHIVO_TRAZAS": None,
+    "MAX_BYTES_TRAZAS": 10 * 1024 * 1024,
+    "COPIAS_TRAZAS": 5,
+    "MUESTREO_TRAZAS": 0.01,
+    # directorio de las bases de datos de los inquilinos (None atiende solo la base de datos BASE_DE_DATOS), y
+    # cantidad máxima de bases de datos de inquilinos abiertas a la vez
+    "DIRECTORIO_INQUILINOS": None,
+    "MAX_BASES_ABIERTAS": 32,
+    # segundos durante los que se puede restaurar un software eliminado, antes de que se borren sus documentos;
+    # segundos sin solicitudes antes de borrarlos, segundos entre revisiones y softwares borrados por transacción
+    "RETENCION_LAPIDAS": 3600,
+    "INACTIVIDAD_RECOLECCION": 5,
+    "INTERVALO_RECOLECCION": 30,
+    "LOTE_RECOLECCION": 500,
+    # valor p máximo de la prueba t de Welch para que una métrica o tarea que empeoró respecto a la versión anterior
+    # se informe como regresión
+    "SIGNIFICANCIA_REGRESIONES": 0.05,
+    # cantidad máxima de remuestras bootstrap que se pueden pedir al calcular los intervalos de confianza
+    "MAX_REMUESTREOS": 100000,
+}
+
+# contadores de las decisiones de la aplicación (idiomas detectados, rutas de análisis, modelos cargados, etc.)
+metricas = Counter()
+candado_metricas = threading.Lock()
+
+# Rutas y comandos de la aplicación, que se registran en cada aplicación creada con crear_app
+rutas = Blueprint("evaluador", __name__, cli_group=None)
+
+
+
+def crear_app(configuracion=None):
+    """
+    Crea la aplicación Flask con la configuración indicada.
+
+    Args:
+        configuracion (dict): Valores que reemplazan los de CONFIGURACION_PREDETERMINADA y los de las variables de
+        entorno con el prefijo EVALUADOR_ (p. ej. EVALUADOR_BASE_DE_DATOS).
 
+    Returns:
+        Flask: La aplicación.
 
+    Notas:
+    - Crear la aplicación solo abre la base de datos; los modelos se cargan en segundo plano o al usarlos, según
+    PRECARGA_MODELOS. Las rutas que no analizan comentarios responden de inmediato.
+    - Para ejecutarla con Flask: flask --app "main:crear_app()" run
+    """
 
+    # Crea una instancia de la aplicación Flask
+    app = Flask(__name__)
+    app.config.update(CONFIGURACION_PREDETERMINADA)
+    app.config.from_prefixed_env("EVALUADOR")
+    app.config.update(configuracion or {})
 
+    # Habilita CORS para todas las rutas
+    CORS(app)
 
-# Crea una instancia de la aplicación Flask
-app = Flask(__name__)
+    # Las rutas con el prefijo /t/<inquilino> equivalen a la cabecera X-Inquilino
+    if app.config["DIRECTORIO_INQUILINOS"]:
+        app.wsgi_app = PrefijoInquilino(app.wsgi_app)
 
-# Habilita CORS para todas las rutas
-CORS(app)
+    # Trazar también la serialización de las respuestas JSON
+    app.json = ProveedorJSON(app)
 
+    # Argos Translate lee el directorio de sus paquetes al importarse
+    if app.config["DIRECTORIO_MODELOS"]:
+        os.environ["ARGOS_PACKAGES_DIR"] = app.config["DIRECTORIO_MODELOS"]
 
+    registro = app.config["REGISTRO_CAMBIOS"]
+    replica = app.config["ORIGEN_REPLICA"]
+    inquilinos = app.config["DIRECTORIO_INQUILINOS"]
+    compresion = app.config["COMPRESION_BASE_DE_DATOS"]
+    nivel = app.config["NIVEL_COMPRESION"]
 
-# Configuración de la traducción
-from_code = "es"
-to_code = "en"
+    # El registro de cambios y las réplicas copian una sola base de datos
+    if inquilinos and (registro or replica):
+        raise ValueError("DIRECTORIO_INQUILINOS no puede usarse con REGISTRO_CAMBIOS ni con ORIGEN_REPLICA")
 
-# Download and install Argos Translate package
-argostranslate.package.update_package_index()
-available_packages = argostranslate.package.get_available_packages()
-package_to_install = next(
-    filter(
-        lambda x: x.from_code == from_code and x.to_code == to_code, available_packages
+    # inicializar base de datos (en memoria en las réplicas, que la copian del registro de cambios del principal)
+    if replica:
+        app.extensions["base_de_datos"] = TinyDB(storage=AlmacenTransaccional(MemoryStorage))
+    else:
+        app.extensions["base_de_datos"] = abrir_base_de_datos(app.config["BASE_DE_DATOS"], compresion, nivel)
+
+    # Bases de datos de los inquilinos, que se abren al usarlas
+    app.extensions["inquilinos"] = PoolBases(
+        inquilinos, app.config["MAX_BASES_ABIERTAS"], compresion, nivel
+    ) if inquilinos else None
+
+    # Registro de los cambios guardados, para las réplicas
+    app.extensions["registro_cambios"] = RegistroCambios(
+        registro, app.config["MAX_BYTES_REGISTRO"]
+    ) if registro and not replica else None
+
+    # Hilos para analizar comentarios, separados de los que atienden las solicitudes
+    app.extensions["pool_analisis"] = PoolAnalisis(app.config["HILOS_ANALISIS"], app.config["COLA_ANALISIS"])
+
+    # Respuestas de las solicitudes con clave de idempotencia, para repetirlas sin volver a ejecutarlas (guardadas
+    # junto a la base de datos; las réplicas no las aceptan)
+    app.extensions["idempotencia"] = CacheIdempotencia(
+        app.config["MAX_CLAVES_IDEMPOTENCIA"], None if replica else f"{app.config['BASE_DE_DATOS']}.idempotencia",
+        app.config["VIGENCIA_RESERVAS_IDEMPOTENCIA"]
     )
-)
-argostranslate.package.install_from_path(package_to_install.download())
 
+    # Respuestas de las rutas de lectura, ya serializadas
+    app.extensions["respuestas"] = CacheRespuestas(
+        app.config["MAX_BYTES_RESPUESTAS"], app.config["MIN_BYTES_GZIP"]
+    ) if app.config["MAX_BYTES_RESPUESTAS"] else None
 
+    # Eventos de los cambios guardados, para los clientes de /eventos
+    app.extensions["eventos"] = BusEventos(app.config["MAX_EVENTOS"])
 
+    # Recolector de los softwares eliminados (las réplicas copian los borrados del principal)
+    app.extensions["recolector"] = RecolectorLapidas(app) if not replica else None
 
+    # Exportador de las trazas de las solicitudes
+    archivo_trazas = app.config["ARCHIVO_TRAZAS"]
+    app.extensions["trazas"] = ExportadorTrazas(
+        archivo_trazas, app.config["MAX_BYTES_TRAZAS"], app.config["COPIAS_TRAZAS"]
+    ) if archivo_trazas else None
 
+    app.register_blueprint(rutas)
 
-# Rutas de la API para la gestion, listado y eliminación de softwares en la base de datos
-@app.route('/nuevo_soft', methods=['POST'])
-def nuevo_software():
-    """
-    Crea un nuevo software.
+    # Las réplicas aplican los cambios del principal en segundo plano, en un hilo que se inicia con la primera
+    # solicitud del proceso (ver Replica.iniciar)
+    if replica:
+        app.extensions["replica"] = Replica(
+            app.extensions["base_de_datos"], replica, app.config["INTERVALO_REPLICA"],
+            app.config["CAMBIOS_POR_LECTURA"], app.extensions["respuestas"]
+        )
 
-    Entrada (request JSON):
-    {
-        "nombre": "soft1",
-        "version": "2.0.2"
-    }
+    # Precargar los modelos sin bloquear el inicio de la aplicación
+    registro_modelos.traducciones.maximo = app.config["MAX_MODELOS_TRADUCCION"]
 
-    Valor de retorno:
-    Una respuesta en formato JSON que indica si el software fue creado exitosamente o no.
+    if app.config["PRECARGA_MODELOS"] == "fondo" and registro_modelos.precarga == "pendiente":
+        registro_modelos.precarga = "en_curso"
+        threading.Thread(
+            target=registro_modelos.precargar, args=(app.config["PARES_PRECARGA"],), daemon=True
+        ).start()
+
+    return app
+
+def iniciar_proceso_trabajo(app):
+    """
+    Prepara el estado propio de un proceso de trabajo creado con fork a partir de la aplicación ya cargada (ver
+    post_fork en gunicorn.conf.py).
+
+    Args:
+        app (Flask): La aplicación cargada en el proceso principal.
 
     Notas:
-    - La constante SIN_VALOR está definida con su respectivo valor.
+    - Los modelos y la aplicación se comparten con el proceso principal (copia al escribir), pero el archivo de la
+    base de datos, los candados y los hilos son de cada proceso: el archivo heredado comparte la posición y los
+    bloqueos con el del proceso principal, un candado pudo heredarse tomado y los hilos no sobreviven al fork.
     """
 
-    # Verificar si el campo "nombre" y "version" están presentes en la solicitud JSON
-    if "nombre" not in request.json or "version" not in request.json:
-        response = {"error": "Campos 'nombre' y 'version' faltantes en la solicitud"}
-        return jsonify(response), 400
+    almacen = app.extensions["base_de_datos"].storage
 
-    soft = request.json
+    # Candados nuevos, por si alguno se heredó tomado por un hilo del proceso principal
+    almacen.candado = threading.RLock()
+    almacen.dueno = None
+    app.extensions["idempotencia"].candado = threading.Lock()
 
-    # Crear el documento de software
-    software = {
-        "id_soft": SIN_VALOR,
-        "nombre": soft["nombre"],
-        "version": soft["version"],
-        "analizado": False,
-        "fecha": datetime.now().timestamp(),
-        "eficacia": SIN_VALOR,
-        "eficiencia": SIN_VALOR,
-        "satisfaccion_pun": SIN_VALOR,
-        "satisfaccion_com": SIN_VALOR,
-        "satisfaccion": SIN_VALOR,
-        "usabilidad": SIN_VALOR,
-    }
+    # Reabrir el archivo de la base de datos (ver AlmacenComprimido.archivo)
+    if isinstance(almacen.storage, AlmacenComprimido):
+        almacen.storage.archivo
 
-    # Insertar el documento de software en la colección "softwares"
-    id_gen = softwares.insert(software)
+    # Iniciar la copia de los cambios del principal (en las réplicas)
+    replica = app.extensions.get("replica")
 
-    # Actualizar el campo "id" con el ID generado
-    softwares.update({"id_soft": id_gen}, doc_ids=[id_gen])
+    if replica is not None:
+        replica.candado = threading.Lock()
+        replica.condicion = threading.Condition()
+        replica.iniciar()
 
-    # Crear el documento de evaluación asociado al software
-    evaluacion = {
-        "id_soft": id_gen,
-        "tareas": [],
-        "tiempos": [],
-        "puntajes": [],
-        "comentarios": []
-    }
+def obtener_tabla(nombre):
+    """
+    Obtiene una tabla de la base de datos actual (ver base_de_datos_actual).
 
-    # Insertar el documento de evaluación en la colección "evaluaciones"
-    evaluaciones.insert(evaluacion)
+    Args:
+        nombre (str): El nombre de la tabla ("softwares", "evaluaciones", "resultados", "estadisticas",
+        "historial", "regresiones" o "contadores").
 
-    # Crear el documento de resultado asociado al software
-    resultado = {
-        "id_soft": id_gen,
-        "tareas": [],
-        "tiempos": [],
-        "puntajes": [],
-        "comentarios": []
-    }
+    Returns:
+        Table: La tabla de TinyDB.
+    """
 
-    # Insertar el documento de resultado en la colección "resultados"
-    resultados.insert(resultado)
+    return base_de_datos_actual().table(nombre)
 
-    response = {"message": "Software creado exitosamente"}
-    return jsonify(response)
+def base_de_datos_actual():
+    """
+    Obtiene la base de datos del inquilino de la solicitud actual, o la de la aplicación si no indica un inquilino.
 
-@app.route('/listar')
-def listar():
+    Returns:
+        TinyDB: La base de datos.
     """
-    Lista todos los software disponibles.
 
-    Valor de retorno:
-    Una respuesta en formato JSON que contiene la lista de todos los software disponibles.
+    base_de_datos = g.get("base_de_datos")
 
-    Notas:
-    - Se asume que la variable "softwares" contiene la colección de datos de software.
+    return current_app.extensions["base_de_datos"] if base_de_datos is None else base_de_datos
+
+def inquilino_actual():
+    """
+    Obtiene el nombre del inquilino de la solicitud actual, o None si no indica uno (o fuera de una solicitud).
     """
 
-    # Obtener la lista de todos los software
-    lista_softwares = softwares.all()
+    return g.get("inquilino") if has_request_context() else None
 
-    # Verificar si no se encontraron software
-    if not lista_softwares:
-        response = {"message": "No se encontraron software"}
-        return jsonify(response), 404
+def abrir_base_de_datos(ruta, compresion=None, nivel=None):
+    """
+    Abre (o crea) una base de datos guardada en un archivo.
 
-    return jsonify(lista_softwares)
+    Args:
+        ruta (str): La ruta del archivo.
+        compresion (str): El formato en que se escribe el archivo ("gzip", "zstd" o None para JSON sin comprimir).
+        nivel (int): El nivel de compresión, o None para usar el más rápido (1).
 
-@app.route('/eliminar_soft', methods=['DELETE'])
-def eliminar_soft():
+    Returns:
+        TinyDB: La base de datos.
     """
-    Elimina un software y sus datos asociados.
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    almacen = AlmacenTransaccional(AlmacenComprimido)
+    base_de_datos = BaseDeDatos(ruta, storage=almacen, compresion=compresion, nivel=nivel)
+    base_de_datos.storage.lapidas = Lapidas(f"{ruta}.lapidas")
 
-    Valor de retorno:
-    Una respuesta en formato JSON que indica si el borrado fue exitoso o no.
+    return base_de_datos
+
+class TablaSinLapidas(Table):
+    """
+    Tabla de TinyDB que oculta los documentos de los softwares eliminados que aún no se borraron (ver Lapidas).
 
     Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
-    - Las tablas "softwares", "evaluaciones" y "resultados" contienen las colecciones de datos correspondientes.
+    - Las lecturas y consultas no ven esos documentos, pero las escrituras sí (p. ej. al borrarlos), y sus ID no
+    se asignan a documentos nuevos.
+    - Cada escritura lee y modifica la tabla dentro de una transacción, para que otro hilo o proceso no escriba
+    entre la lectura y la escritura.
+    - Las consultas guardadas y el siguiente ID se descartan cuando otro proceso modifica la base de datos.
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cambios_vistos = None
 
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    def revisar_cambios(self):
+        """
+        Descarta las consultas guardadas y el siguiente ID si otro proceso modificó la base de datos o las lápidas
+        desde la última revisión.
+        """
 
-    # Eliminar el software y sus datos asociados
-    softwares.remove(Query().id_soft == id_soft)
-    evaluaciones.remove(Query().id_soft == id_soft)
-    resultados.remove(Query().id_soft == id_soft)
+        almacen = self._storage
 
-    response = {"message": "Borrado exitosamente"}
-    return jsonify(response)
+        with almacen.candado:
+            cambios = almacen.cambios_externos()
 
+        if cambios != self.cambios_vistos:
+            self.clear_cache()
+            self._next_id = None
+            self.cambios_vistos = cambios
 
+    def search(self, cond):
+        self.revisar_cambios()
 
+        return super().search(cond)
 
+    def insert(self, document):
+        # El ID se calcula fuera de _update_table, por lo que se incluye en la misma transacción
+        self._storage.iniciar()
 
+        try:
+            self.revisar_cambios()
+            doc_id = super().insert(document)
+        except BaseException:
+            self._storage.terminar(confirmar=False)
+            self._next_id = None
+            raise
 
+        self._storage.terminar(confirmar=True)
 
-# Rutas de la API para almacenar datos de evaluación en la base de datos
-@app.route('/guardar_tareas', methods=["POST"])
-def guardar_tareas():
-    """
-    Guarda en la base de datos las tareas realizadas por un usuario sobre un software específico.
+        return doc_id
 
-    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+    def _update_table(self, updater):
+        self._storage.iniciar()
 
-        - id_soft: El ID del software.
-        - tareas: Una lista de con las tareas realizadas por el usuario.
-        El primer elemento de la lista contiene las referencias,
-        el segundo elemento contiene la cantidad de tareas del usuario 1,
-        el tercero contiene la cantidad de tareas del usuario 2 y así sucesivamente.
+        try:
+            self.revisar_cambios()
+            super()._update_table(updater)
+        except BaseException:
+            self._storage.terminar(confirmar=False)
+            self.clear_cache()
+            self._next_id = None
+            raise
 
-        Ejemplo:
-        {
-            "id_soft": 1,
+        self._storage.terminar(confirmar=True)
 
-            "tareas":[
-                [5, 4, 3],
-                [5, 3, 2],
-                [2, 4, 3],
-                [2, 1, 3],
-                [3, 2, 3],
-                [4, 4, 2]
-            ]
-        }
+    def _read_table(self):
+        tabla = super()._read_table()
+        eliminados = self._storage.lapidas.fechas
 
-    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+        return VistaSinLapidas(tabla, eliminados) if eliminados else tabla
 
-    En caso contrario, se actualiza la lista de tareas asignadas al software
-    y se devuelve un mensaje de éxito con el código de respuesta 200.
+    def _get_next_id(self):
+        # Los ID de los documentos ocultos siguen en uso
+        if self._next_id is None:
+            self._next_id = max(self.ids_documentos(), default=0) + 1
 
-    Returns:
-        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
-    """
-    try:
+        siguiente = self._next_id
+        self._next_id = siguiente + 1
 
-        # Validar que se haya enviado un cuerpo JSON en la solicitud
-        if not request.is_json:
-            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+        return siguiente
 
-        # Obtener los datos del JSON enviado en la solicitud
-        r = request.json
+    def ids_documentos(self):
+        """
+        Obtiene los ID de todos los documentos de la tabla, incluidos los ocultos.
+        """
 
-        # Validar que se hayan proporcionado los campos necesarios
-        if "id_soft" not in r or "tareas" not in r:
-            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+        return [int(doc_id) for doc_id in super()._read_table()]
 
-        # Obtener el id_soft del JSON y pasarlo a entero
-        id_soft = int(r["id_soft"])
+class BaseDeDatos(TinyDB):
+    """
+    Base de datos de TinyDB cuyas tablas ocultan los softwares eliminados (ver Lapidas).
+    """
 
-        # Verificar si el id_soft existe en la base de datos
-        if not softwares.contains(doc_id=id_soft):
-            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+    table_class = TablaSinLapidas
 
-        # Obtener las tareas del JSON
-        tareas = r["tareas"]
+class VistaSinLapidas(Mapping):
+    """
+    Vista de los documentos de una tabla (por doc_id) sin los de los softwares eliminados, sin copiar la tabla.
+    """
 
-        # Calcular eficacia
-        try:
+    def __init__(self, tabla, eliminados):
+        self.tabla = tabla
+        self.eliminados = eliminados
 
-            calcular_eficacia(id_soft, tareas)
+    def __getitem__(self, doc_id):
+        documento = self.tabla[doc_id]
 
-        except ValueError as e:
-            return jsonify({"error: ": str(e)}), 400
-        except ZeroDivisionError as e:
-            return jsonify({"error de división por cero: ": str(e)}), 400
-        except Exception as e:
-            return jsonify({"error inesperado: ": str(e)}), 500
+        if documento.get("id_soft") in self.eliminados:
+            raise KeyError(doc_id)
 
-        # Realizar la actualización de los datos en la base de datos
-        evaluaciones.update({"tareas": tareas}, Query().id_soft == id_soft)
+        return documento
 
-        return jsonify({"mensaje": "Tareas asignadas exitosamente"}), 200
+    def __iter__(self):
+        return (doc_id for doc_id, _ in self.items())
 
-    except Exception as e:
-        return jsonify({"error: ": str(e)}), 500
+    def __len__(self):
+        return sum(1 for _ in self.items())
 
-@app.route('/guardar_tiempos', methods=["POST"])
-def guardar_tiempos():
+    def items(self):
+        return (
+            (doc_id, documento) for doc_id, documento in self.tabla.items()
+            if documento.get("id_soft") not in self.eliminados
+        )
+
+class Lapidas:
     """
-    Guarda en la base de datos los tiempos tomados por un usuario al hacer tareas específico.
+    Softwares eliminados cuyos documentos aún no se borraron (lápidas), guardados en un registro junto a la base de
+    datos.
 
-    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+    Notas:
+    - Eliminar un software solo agrega una línea al registro: las tablas dejan de mostrarlo (ver TablaSinLapidas)
+    y se puede restaurar hasta que el recolector borra sus documentos (ver RecolectorLapidas).
+    - Cada línea del registro marca un software como eliminado (con la fecha) o lo quita de las lápidas (porque se
+    restauró o se borró). Después de borrar, el registro se reescribe solo con las lápidas vigentes.
+    - Los procesos que comparten la base de datos releen el registro cuando cambia. Durante una transacción, los
+    cambios se escriben en el registro al confirmarla, o se descartan.
+    - Sin ruta (p. ej. en las bases de datos en memoria), las lápidas solo se guardan en memoria.
+    """
 
-        - id_soft: El ID del software.
-        - tiempos: Una lista de con las tareas realizadas por el usuario.
-        El primer elemento de la lista contiene las referencias,
-        el segundo elemento contiene la cantidad de tareas del usuario 1,
-        el tercero contiene la cantidad de tareas del usuario 2 y así sucesivamente.
+    def __init__(self, ruta=None):
+        self.ruta = ruta
+        self.fechas = {}
+        self.firma = None
+        self.cambios_externos = 0
+        self.pendientes = None
+        self.anteriores = None
+        self.actualizar()
+
+    @contextmanager
+    def bloquear(self, modo):
+        """
+        Abre el registro (creándolo si no existe) con un bloqueo compartido o exclusivo entre procesos.
+        """
 
-        Ejemplo:
-        {
-            "id_soft": 1,
+        with open(self.ruta, "a+b") as archivo:
+            if fcntl is not None:
+                fcntl.flock(archivo, modo)
 
-            "tiempos":[
-                [7, 9, 5],
-                [4, 8, 4],
-                [4, 10, 5],
-                [8, 4, 7],
-                [10, 12, 4],
-                [7, 5, 2]
-            ]
-        }
+            yield archivo
 
-    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+    def leer(self, archivo):
+        """
+        Lee las lápidas vigentes del registro abierto.
+        """
 
-    En caso contrario, se actualiza la lista de tareas asignadas al software
-    y se devuelve un mensaje de éxito con el código de respuesta 200.
+        # Después de las escrituras propias se guarda la firma, por lo que otra firma es un cambio de otro proceso
+        estado = os.fstat(archivo.fileno())
 
-    Returns:
-        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
-    """
-    try:
+        if self.firma is not None and (estado.st_ino, estado.st_size, estado.st_mtime_ns) != self.firma:
+            self.cambios_externos += 1
 
-        # Validar que se haya enviado un cuerpo JSON en la solicitud
-        if not request.is_json:
-            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+        fechas = {}
+        archivo.seek(0)
 
-        # Obtener los datos del JSON enviado en la solicitud
-        r = request.json
+        for linea in archivo:
+            # Una línea incompleta es un cambio que aún se está escribiendo
+            if not linea.endswith(b"\n"):
+                break
 
-        # Validar que se hayan proporcionado los campos necesarios
-        if "id_soft" not in r or "tiempos" not in r:
-            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+            cambio = json.loads(linea)
 
-        # Obtener el id_soft del JSON y pasarlo a entero
-        id_soft = int(r["id_soft"])
+            if "fecha" in cambio:
+                fechas[cambio["id_soft"]] = cambio["fecha"]
+            else:
+                fechas.pop(cambio["id_soft"], None)
 
-        # Verificar si el id_soft existe en la base de datos
-        if not softwares.contains(doc_id=id_soft):
-            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+        estado = os.fstat(archivo.fileno())
+        self.fechas = fechas
+        self.firma = (estado.st_ino, estado.st_size, estado.st_mtime_ns)
 
-        # Obtener los tiempos del JSON
-        tiempos = r["tiempos"]
+    def actualizar(self):
+        """
+        Relee el registro si cambió desde la última lectura (p. ej. porque otro proceso eliminó un software).
+        """
+
+        if self.ruta is None or self.pendientes is not None:
+            return
 
-        # Calcular eficacia
         try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return
 
-            calcular_eficiencia(id_soft, tiempos)
+        if (estado.st_ino, estado.st_size, estado.st_mtime_ns) != self.firma:
+            with self.bloquear(fcntl.LOCK_SH if fcntl else None) as archivo:
+                self.leer(archivo)
 
-        except ValueError as e:
-            return jsonify({"error: ": str(e)}), 400
-        except ZeroDivisionError as e:
-            return jsonify({"error de división por cero: ": str(e)}), 400
-        except Exception as e:
-            return jsonify({"error inesperado: ": str(e)}), 500
+    def agregar(self, ids, fecha):
+        """
+        Marca softwares como eliminados.
+        """
 
-        # Realizar la actualización de los datos en la base de datos
-        evaluaciones.update({"tiempos": tiempos}, Query().id_soft == id_soft)
+        self.cambiar([{"id_soft": id_soft, "fecha": fecha} for id_soft in ids if id_soft not in self.fechas])
 
-        return jsonify({"mensaje": "Tiempos asignadas exitosamente"}), 200
+    def quitar(self, ids, motivo="restaurado"):
+        """
+        Quita las lápidas de softwares restaurados ("restaurado") o cuyos documentos se borraron ("borrado").
+        """
 
-    except Exception as e:
-        return jsonify({"error: ": str(e)}), 500
+        self.cambiar([{"id_soft": id_soft, motivo: True} for id_soft in ids if id_soft in self.fechas])
 
-@app.route('/guardar_puntajes', methods=["POST"])
-def guardar_puntajes():
-    """
-    Guarda en la base de datos los puntajes tomados por un usuario al responder preguntas cerradas.
+    def cambiar(self, cambios):
+        if not cambios:
+            return
 
-    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+        self.aplicar(cambios)
 
-        - id_soft: El ID del software.
-        - puntajes: Una lista de con los puntajes como respuestas de un usuario a un cuestionario.
-        El primer elemento de la lista contiene los pesos de las preguntas,
-        el segundo elemento contiene los puntajes de las respuestas del usuario 1,
-        el tercero contiene del usuario 2 y así sucesivamente.
+        # Dentro de una transacción, los cambios se escriben al confirmarla
+        if self.pendientes is not None:
+            self.pendientes.extend(cambios)
+        else:
+            self.escribir(cambios)
 
-        Ejemplo:
-        {
-            "id_soft": 1,
+    def aplicar(self, cambios):
+        for cambio in cambios:
+            if "fecha" in cambio:
+                self.fechas[cambio["id_soft"]] = cambio["fecha"]
+            else:
+                self.fechas.pop(cambio["id_soft"], None)
 
-            "puntajes":[
-                [20, 30, 10, 25, 10, 5],
-                [4, 5, 4, 4, 3, 4],
-                [4, 5, 5, 3, 2, 5],
-                [3, 4, 4, 3, 2, 1],
-                [5, 4, 2, 4, 3, 2],
-                [3, 4, 3, 3, 5, 3]
-            ]
-        }
+    def escribir(self, cambios):
+        """
+        Agrega cambios al final del registro.
+        """
 
-    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+        if self.ruta is None:
+            return
 
-    En caso contrario, se actualiza la lista de puntajes asignada al software
-    y se devuelve un mensaje de éxito con el código de respuesta 200.
+        with self.bloquear(fcntl.LOCK_EX if fcntl else None) as archivo:
+            # Incluir los cambios de otros procesos antes de aplicar los propios
+            self.leer(archivo)
+            self.aplicar(cambios)
 
-    Returns:
-        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
-    """
-    try:
+            archivo.write(b"".join(json.dumps(cambio).encode("utf-8") + b"\n" for cambio in cambios))
+            archivo.flush()
+            os.fsync(archivo.fileno())
 
-        # Validar que se haya enviado un cuerpo JSON en la solicitud
-        if not request.is_json:
-            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+            estado = os.fstat(archivo.fileno())
+            self.firma = (estado.st_ino, estado.st_size, estado.st_mtime_ns)
 
-        # Obtener los datos del JSON enviado en la solicitud
-        r = request.json
+    def compactar(self):
+        """
+        Reescribe el registro solo con las lápidas vigentes.
+        """
 
-        # Validar que se hayan proporcionado los campos necesarios
-        if "id_soft" not in r or "puntajes" not in r:
-            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+        if self.ruta is None:
+            return
 
-        # Obtener el id_soft del JSON y pasarlo a entero
-        id_soft = int(r["id_soft"])
+        with self.bloquear(fcntl.LOCK_EX if fcntl else None) as archivo:
+            self.leer(archivo)
+            archivo.truncate(0)
 
-        # Verificar si el id_soft existe en la base de datos
-        if not softwares.contains(doc_id=id_soft):
-            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+            archivo.write(b"".join(
+                json.dumps({"id_soft": id_soft, "fecha": fecha}).encode("utf-8") + b"\n"
+                for id_soft, fecha in self.fechas.items()
+            ))
+            archivo.flush()
+            os.fsync(archivo.fileno())
 
-        # Obtener los puntajes del JSON
-        puntajes = r["puntajes"]
+            estado = os.fstat(archivo.fileno())
+            self.firma = (estado.st_ino, estado.st_size, estado.st_mtime_ns)
 
-        # Calcular satisfaccion en preguntas cerradas
-        try:
+    @contextmanager
+    def recolectar(self):
+        """
+        Reserva el borrado de los softwares eliminados para el proceso actual, con un bloqueo del archivo
+        <registro>.recolector, para que el recolector de la API y el comando recolectar_eliminados no borren a la
+        vez.
 
-            calcular_sat_puntajes(id_soft, puntajes)
+        Yields:
+            bool: True si se reservó, o False si otro proceso está borrando.
+        """
 
-        except ValueError as e:
-            return jsonify({"error: ": str(e)}), 400
-        except Exception as e:
-            return jsonify({"error inesperado: ": str(e)}), 500
+        if self.ruta is None or fcntl is None:
+            yield True
+            return
 
-        # Realizar la actualización de los datos en la base de datos
-        evaluaciones.update({"puntajes": puntajes}, Query().id_soft == id_soft)
+        with open(f"{self.ruta}.recolector", "a+b") as archivo:
+            try:
+                fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                reservado = True
+            except BlockingIOError:
+                reservado = False
 
-        return jsonify({"mensaje": "Puntajes asignados exitosamente"}), 200
+            yield reservado
 
-    except Exception as e:
-        return jsonify({"error: ": str(e)}), 500
+    def iniciar(self):
+        """
+        Inicia una transacción (ver AlmacenTransaccional).
+        """
 
-@app.route('/guardar_comentarios', methods=["POST"])
-def guardar_comentarios():
-    """
-    Guarda en la base de datos los comentarios tomados por un usuario al responder preguntas abiertas.
+        self.actualizar()
+        self.pendientes = []
+        self.anteriores = dict(self.fechas)
 
-    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+    def terminar(self, confirmar):
+        """
+        Termina una transacción, escribiendo sus cambios o descartándolos.
+        """
 
-        - id_soft: El ID del software.
-        - puntajes: Una lista de con los puntajes como respuestas de un usuario a un cuestionario
-        El primer elemento de la lista contiene los pesos de las preguntas,
-        el segundo elemento contiene los comentarios del usuario 1,
-        el tercero contiene del usuario 2 y así sucesivamente.
+        pendientes = self.pendientes
+        self.pendientes = None
 
-        Ejemplo:
-        {
-            "id_soft": 1,
-            "comentarios": [
-                [30, 70],
-                ["Me encanta la interfaz intuitiva y fácil de usar", "No me gusta la falta de opciones de personalización"],
-                ["Las características son increíbles, cumplen con todas mis necesidades", "A veces experimento problemas de rendimiento"],
-                ["El soporte al cliente es excepcional, siempre resuelven mis dudas", "La falta de actualizaciones frecuentes es decepcionante"],
-                ["La integración con otras herramientas es perfecta", "A veces encuentro errores que interrumpen mi flujo de trabajo"],
-                ["La velocidad y eficiencia del software son impresionantes", "Algunas funciones no son tan intuitivas como me gustaría"]
-            ]
-        }
+        if not confirmar:
+            self.fechas = self.anteriores
+        elif pendientes:
+            self.escribir(pendientes)
 
-    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+        self.anteriores = None
 
-    En caso contrario, se actualiza la lista de puntajes asignada al software
-    y se devuelve un mensaje de éxito con el código de respuesta 200.
+class AlmacenComprimido(Storage):
+    """
+    Almacenamiento de TinyDB en un archivo JSON, opcionalmente comprimido con gzip o zstd.
 
-    Returns:
-        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
+    Notas:
+    - Al leer, el formato se reconoce por los primeros bytes del archivo (ver MAGIA_COMPRESION), por lo que se
+    pueden abrir las bases de datos existentes sin comprimir, que se comprimen al escribirlas por primera vez.
+    - El JSON se comprime a medida que se escribe en el archivo, sin guardar la versión comprimida en memoria.
     """
-    try:
 
-        # Validar que se haya enviado un cuerpo JSON en la solicitud
-        if not request.is_json:
-            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+    def __init__(self, ruta, compresion=None, nivel=None):
+        super().__init__()
+
+        if compresion not in (None, *MAGIA_COMPRESION):
+            raise ValueError(f"Compresión no válida: {compresion} (debe ser {', '.join(MAGIA_COMPRESION)} o None)")
+        if compresion == "zstd" and zstandard is None:
+            raise ValueError("La compresión zstd requiere el paquete zstandard")
+
+        self.compresion = compresion
+        self.nivel = nivel
+        self.ruta = ruta
+        touch(ruta, create_dirs=False)
+        self.abierto = open(ruta, "rb+")
+        self.pid = os.getpid()
+        self.firma = None
+        self.cambios_externos = 0
+        self.verificar_cambios()
+
+    @property
+    def archivo(self):
+        """
+        El archivo abierto por el proceso actual.
 
-        # Obtener los datos del JSON enviado en la solicitud
-        r = request.json
+        Notas:
+        - Un proceso creado con fork (p. ej. un proceso de trabajo de Gunicorn) reabre el archivo, porque el heredado
+        comparte la posición y los bloqueos con el del proceso principal.
+        """
 
-        # Validar que se hayan proporcionado los campos necesarios
-        if "id_soft" not in r or "comentarios" not in r:
-            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+        if self.pid != os.getpid():
+            self.abierto.close()
+            self.abierto = open(self.ruta, "rb+")
+            self.pid = os.getpid()
 
-        # Obtener el id_soft del JSON y pasarlo a entero
-        id_soft = int(r["id_soft"])
+        return self.abierto
 
-        # Verificar si el id_soft existe en la base de datos
-        if not softwares.contains(doc_id=id_soft):
-            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+    def bloquear(self, modo):
+        """
+        Bloquea el archivo entre procesos (con fcntl, si está disponible).
 
-        # Obtener los comentarios del JSON
-        comentarios = r["comentarios"]
+        Args:
+            modo (int): fcntl.LOCK_SH para leer, fcntl.LOCK_EX para escribir o fcntl.LOCK_UN para desbloquearlo.
 
-        # Calcular satisfaccion en preguntas abiertas
-        try:
+        Notas:
+        - El bloqueo es del archivo abierto por el proceso, por lo que los hilos deben coordinarse aparte (ver
+        AlmacenTransaccional).
+        """
 
-            calcular_sat_comentarios(id_soft, comentarios)
+        if fcntl is not None:
+            fcntl.flock(self.archivo, modo)
 
-        except ValueError as e:
-            return jsonify({"error: ": str(e)}), 400
-        except Exception as e:
-            return jsonify({"error inesperado: ": str(e)}), 500
+    def close(self):
+        self.archivo.close()
 
-        # Realizar la actualización de los datos en la base de datos
-        evaluaciones.update({"comentarios": comentarios}, Query().id_soft == id_soft)
+    def firma_archivo(self):
+        """
+        Obtiene el tamaño y la fecha de modificación del archivo, que cambian con cada escritura.
+        """
 
-        return jsonify({"mensaje": "Comentarios asignados exitosamente"}), 200
+        estado = os.fstat(self.archivo.fileno())
 
-    except Exception as e:
-        return jsonify({"error: ": str(e)}), 500
+        return (estado.st_size, estado.st_mtime_ns)
 
+    def verificar_cambios(self):
+        """
+        Cuenta los cambios del archivo hechos por otros procesos desde la última escritura propia (ver
+        CacheRespuestas).
 
+        Returns:
+            int: La cantidad de cambios externos detectados.
+        """
 
+        firma = self.firma_archivo()
 
+        if self.firma is not None and firma != self.firma:
+            self.cambios_externos += 1
 
+        self.firma = firma
 
-# Funciones auxiliares para realizar los cálculos de eficacia, efiencia y satisfacción
-def calcular_eficacia(id_soft, tareas):
-    """
-    Calcula la eficacia de las tareas asignadas a un software y actualiza los resultados.
+        return self.cambios_externos
 
-    Args:
-        id_soft (int): El ID del software.
-        tareas (list): Una lista que contiene las tareas asignadas, donde cada tarea es una lista de valores.
+    def read(self):
+        self.archivo.seek(0)
+        magia = self.archivo.read(4)
 
-    Raises:
-        ValueError: Si el ID del software no existe en la base de datos.
-        ValueError: Si la lista de tareas está vacía o contiene elementos no válidos.
-        ValueError: Si algún elemento de las tareas es mayor que la referencia correspondiente.
-        ZeroDivisionError: Si algunos de los elementos de la lista de referencias es cero.
+        if not magia:
+            return None
 
-    Returns:
-        None
-    """
+        self.archivo.seek(0)
 
-    # Validar la lista de tareas
-    if not isinstance(tareas, list) or len(tareas) < 2:
-        raise ValueError("La lista de tareas debe contener al menos dos elementos.")
+        # Descomprimir según el formato del archivo, que puede no ser el configurado
+        if magia.startswith(MAGIA_COMPRESION["gzip"]):
+            with gzip.GzipFile(fileobj=self.archivo, mode="rb") as lector:
+                return json.load(lector)
 
-    eficacia_usuarios = []
-    referencias = tareas[0]
+        if magia.startswith(MAGIA_COMPRESION["zstd"]):
+            if zstandard is None:
+                raise ValueError("La base de datos está comprimida con zstd, que requiere el paquete zstandard")
 
-    # Validar que la lista de referencias contenga solamente elementos numéricos
-    if not all(isinstance(e, int) for e in referencias):
-        raise ValueError("Los valores de la lista de referencias deben ser numéricos.")
+            with zstandard.ZstdDecompressor().stream_reader(self.archivo, closefd=False) as lector:
+                return json.load(lector)
 
-    # Validar si algún elemento de la lista de referencias es cero
-    if any(e == 0 for e in referencias):
-        raise ZeroDivisionError("No se puede dividir por cero. Algún elemento de la lista de referencias es cero.")
+        return json.load(self.archivo)
 
-    # Validar si algún elemento de la lista de referencias es negativo
-    if any(e < 0 for e in referencias):
-        raise ValueError("No se pueden proporcionar valores negativos en la lista de referencias.")
+    def write(self, data):
+        # Contar los cambios de otros procesos antes de reemplazar la firma del archivo
+        self.verificar_cambios()
 
-    for tarea in tareas[1:]:
+        self.archivo.seek(0)
+        contenido = json.dumps(data).encode("utf-8")
 
-        cont = 0
-        valores = []
+        # Escribir el JSON en el archivo a través del compresor
+        if self.compresion == "gzip":
+            nivel = 1 if self.nivel is None else self.nivel
 
-        for e in tarea:
+            with gzip.GzipFile("", "wb", nivel, self.archivo, mtime=0) as escritor:
+                escritor.write(contenido)
+        elif self.compresion == "zstd":
+            nivel = 1 if self.nivel is None else self.nivel
 
-            # Validar si los valores son numéricos
-            if not isinstance(e, int):
-                raise ValueError("Los valores de las tareas deben ser numéricos.")
+            with zstandard.ZstdCompressor(level=nivel).stream_writer(self.archivo, closefd=False) as escritor:
+                escritor.write(contenido)
+        else:
+            self.archivo.write(contenido)
 
-            # Validar si algún elemento es negativo
-            if e < 0:
-                raise ValueError("No se pueden proporcionar valores negativos en los valores.")
+        # Descartar el resto del contenido anterior y asegurar que el archivo se escribió
+        self.archivo.truncate()
+        self.archivo.flush()
+        os.fsync(self.archivo.fileno())
 
-            # Validar si algún elemento es mayor que los de la lista de referencias
-            if e > referencias[cont]:
-                raise ValueError("Los valores de las tareas no pueden ser mayores que los de la lista de referencias.")
+        self.firma = self.firma_archivo()
 
-            # Calcular la eficacia en cada tarea
-            operacion = e / referencias[cont]
-            valores.append(operacion)
-            cont = cont + 1
+@rutas.cli.command("medir_compresion")
+@click.option("--repeticiones", type=int, default=5, help="Escrituras por formato (se informa la mediana).")
+def medir_compresion(repeticiones):
+    """
+    Compara el tiempo de escritura y de lectura y el tamaño de la base de datos actual con cada compresión.
+    """
 
-        prom_usuario = (sum(valores) / len(valores))
-        porcentaje_usuario = round(prom_usuario * 100)
-        eficacia_usuarios.append(porcentaje_usuario)
+    datos = base_de_datos_actual().storage.read() or {}
+    opciones = [(None, None), ("gzip", 1), ("gzip", 6)]
 
-    # Calcular la eficacia promedio
-    eficacia_porcentaje = round(sum(eficacia_usuarios) / len(eficacia_usuarios))
+    if zstandard is not None:
+        opciones = opciones + [("zstd", 1), ("zstd", 3), ("zstd", 9)]
 
-    # Actualizar los resultados en la base de datos
-    resultados.update({"tareas": eficacia_usuarios}, Query().id_soft == id_soft)
-    softwares.update({"eficacia": eficacia_porcentaje}, Query().id_soft == id_soft)
+    click.echo(f"{'compresión':<12}{'nivel':>6}{'tamaño (MB)':>14}{'escritura (ms)':>16}{'lectura (ms)':>14}")
 
-    # Actualizar el estado del software
-    es_analizado(id_soft)
+    with tempfile.TemporaryDirectory() as directorio:
+        for compresion, nivel in opciones:
+            almacen = AlmacenComprimido(os.path.join(directorio, f"{compresion}_{nivel}.json"), compresion, nivel)
+            escrituras = []
+            lecturas = []
 
-def calcular_eficiencia(id_soft, tiempos):
-    """
-    Calcula la eficiencia en las tareas asignadas a un usuario y actualiza los resultados.
+            # Medir cada escritura completa de la base de datos (como al confirmar una transacción) y su lectura
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                almacen.write(datos)
+                escrituras.append(time.perf_counter() - inicio)
 
-    Args:
-        id_soft (int): El ID del software.
-        tiempos (list): Una lista que contiene los tiempos tomados, donde cada tiempo es una lista de valores.
+                inicio = time.perf_counter()
+                almacen.read()
+                lecturas.append(time.perf_counter() - inicio)
 
-    Raises:
-        ValueError: Si el ID del software no existe en la base de datos.
-        ValueError: Si la lista de tiempos está vacía o contiene elementos no válidos.
-        ZeroDivisionError: Si alguno de los elementos de la lista de referencias es cero.
+            tamano = os.fstat(almacen.archivo.fileno()).st_size
+            almacen.close()
 
-    Returns:
-        None
-    """
+            click.echo(
+                f"{compresion or 'ninguna':<12}{nivel if nivel is not None else '-':>6}{tamano / 1e6:>14.2f}"
+                f"{statistics.median(escrituras) * 1000:>16.1f}{statistics.median(lecturas) * 1000:>14.1f}"
+            )
 
-    # Validar la lista de tiempos
-    if not isinstance(tiempos, list) or len(tiempos) < 2:
-        raise ValueError("La lista de tiempos debe contener al menos dos elementos.")
+class AlmacenTransaccional(Middleware):
+    """
+    Almacenamiento de TinyDB que permite agrupar varias escrituras en una transacción (ver transaccion).
 
-    eficiencia_usuarios = []
-    referencias = tiempos[0]
+    Notas:
+    - Durante una transacción, las lecturas y escrituras se hacen sobre una copia en memoria de la base de datos,
+    que se escribe en el archivo una sola vez al confirmarla, o se descarta.
+    - La transacción bloquea el almacenamiento: las lecturas y escrituras de otros hilos esperan a que termine.
+    Además bloquea el archivo entre procesos (p. ej. un comando ejecutado mientras la API está en marcha): las
+    lecturas fuera de una transacción toman un bloqueo compartido y las escrituras uno exclusivo.
+    - Las transacciones anidadas forman parte de la exterior, que es la que confirma o descarta los cambios.
+    - Los eventos de los cambios hechos durante la transacción se publican solo si se confirma (ver publicar_evento).
+    """
 
-    # Validar que la lista de referencias contenga solamente elementos numéricos
-    if not all(isinstance(e, int) for e in referencias):
-        raise ValueError("Los valores de la lista de referencias deben ser numéricos.")
+    def __init__(self, storage_cls):
+        super().__init__(storage_cls)
+        self.candado = threading.RLock()
+        self.datos = None
+        self.escritos = None
+        self.nivel = 0
+        self.dueno = None
+        self.eventos = []
+        self.lapidas = Lapidas()
+        self.versiones = IndiceVersiones()
 
-    # Validar si algún elemento de la lista de referencias es negativo
-    if any(e < 0 for e in referencias):
-        raise ValueError("No se pueden proporcionar valores negativos en la lista de referencias.")
+    def read(self):
+        with tramo("almacen.leer"):
+            inicio = time.perf_counter()
 
-    for tiempo in tiempos[1:]:
+            with self.candado:
+                anotar(espera_candado_ms=round((time.perf_counter() - inicio) * 1000, 3), en_transaccion=self.nivel > 0)
 
-        cont = 0
-        valores = []
+                if self.nivel:
+                    return self.datos
 
-        for e in tiempo:
+                # Ver los softwares eliminados por otros procesos (una vez por solicitud, ver cambios_externos)
+                self.cambios_externos()
 
-            # Validar si los valores son numéricos
-            if not isinstance(e, int):
-                raise ValueError("Los valores de las tiempos deben ser numéricos.")
+                self.bloquear(fcntl.LOCK_SH if fcntl else None)
 
-            # Validar si algún elemento de los valores es cero
-            if e == 0:
-                raise ZeroDivisionError("No se puede dividir por cero. Algún valor de la lista de tiempos es cero.")
+                try:
+                    return self.storage.read()
+                finally:
+                    self.bloquear(fcntl.LOCK_UN if fcntl else None)
 
-            # Validar si algún elemento es negativo
-            if e < 0:
-                raise ValueError("No se pueden proporcionar valores negativos en los valores.")
+    def write(self, data):
+        with tramo("almacen.escribir"):
+            inicio = time.perf_counter()
 
-            # Calcular la eficiencia en cada tarea
-            operacion = referencias[cont] / e
-            valores.append(operacion)
-            cont = cont + 1
+            with self.candado:
+                anotar(espera_candado_ms=round((time.perf_counter() - inicio) * 1000, 3), en_transaccion=self.nivel > 0)
 
-        prom_usuario = (sum(valores) / len(valores))
-        porcentaje_usuario = round(prom_usuario * 100)
-        eficiencia_usuarios.append(porcentaje_usuario)
+                if self.nivel:
+                    self.datos = data
+                else:
+                    self.bloquear(fcntl.LOCK_EX if fcntl else None)
 
-    # Calcular la eficiencia promedio
-    eficacia_porcentaje = round(sum(eficiencia_usuarios) / len(eficiencia_usuarios))
+                    try:
+                        self.storage.write(data)
+                        self.escritos = data
+                    finally:
+                        self.bloquear(fcntl.LOCK_UN if fcntl else None)
 
-    # Actualizar los resultados en la base de datos
-    resultados.update({"tiempos": eficiencia_usuarios}, Query().id_soft == id_soft)
-    softwares.update({"eficiencia": eficacia_porcentaje}, Query().id_soft == id_soft)
+    def bloquear(self, modo):
+        """
+        Bloquea o desbloquea el archivo entre procesos (ver AlmacenComprimido.bloquear), si el almacenamiento usa
+        uno.
+        """
 
-    # Actualizar el estado del software
-    es_analizado(id_soft)
+        bloquear = getattr(self.storage, "bloquear", None)
 
-def calcular_sat_puntajes(id_soft, puntajes):
-    """
-    Calcula la satisfacción con los puntajes de las preguntas cerradas y actualiza los resultados.
+        if bloquear is not None:
+            bloquear(modo)
 
-    Args:
-        id_soft (int): El ID del software.
-        puntajes (list): Una lista que contiene los puntajes tomados, donde cada puntaje es una lista de valores.
+    def iniciar(self):
+        """
+        Inicia una transacción (o una transacción anidada), esperando a que terminen las de otros hilos y procesos.
+        """
 
-    Raises:
-        ValueError: Si el ID del software no existe en la base de datos.
-        ValueError: Si la lista de puntajes está vacía o contiene elementos no válidos.
+        self.candado.acquire()
 
-    Returns:
-        None
-    """
+        if self.nivel == 0:
+            try:
+                # La transacción lee los datos más recientes y nadie más los escribe hasta que termina
+                self.bloquear(fcntl.LOCK_EX if fcntl else None)
+                self.datos = self.storage.read() or {}
+            except BaseException:
+                self.bloquear(fcntl.LOCK_UN if fcntl else None)
+                self.candado.release()
+                raise
 
-    # Validar la lista de puntajes
-    if not isinstance(puntajes, list) or len(puntajes) < 2:
-        raise ValueError("La lista de puntajes debe contener al menos dos elementos.")
+            self.dueno = threading.get_ident()
+            self.lapidas.iniciar()
 
-    puntajes_usuarios = []
-    pesos = puntajes[0]
+        self.nivel = self.nivel + 1
 
-    # Validar que la lista de pesos contenga solamente elementos numéricos
-    if not all(isinstance(e, int) for e in pesos):
-        raise ValueError("Los valores de la lista de pesos deben ser numéricos.")
+    def en_transaccion(self):
+        """
+        Indica si el hilo actual está dentro de una transacción.
+        """
 
-    # Validar si algún elemento de la lista de pesos es negativo
-    if any(e < 0 for e in pesos):
-        raise ValueError("No se pueden proporcionar valores negativos en la lista de pesos.")
+        return self.nivel > 0 and self.dueno == threading.get_ident()
 
-    for puntaje in puntajes[1:]:
+    def cambios_externos(self):
+        """
+        Cuenta los cambios de la base de datos y de las lápidas hechos por otros procesos (ver CacheRespuestas).
 
-        cont = 0
-        valores = []
+        Returns:
+            tuple: Las cantidades de cambios externos del archivo (0 en memoria) y del registro de lápidas.
+
+        Notas:
+        - Debe llamarse con el candado tomado, fuera de una transacción.
+        - Durante una solicitud, el archivo y las lápidas se revisan solo la primera vez (en g.cambios_externos), y
+        las lecturas siguientes usan el mismo resultado: los cambios de otros procesos se ven desde la solicitud
+        siguiente. Fuera de una solicitud (p. ej. en los comandos y en los hilos en segundo plano) se revisan en
+        cada llamada.
+        """
 
-        for e in puntaje:
+        revisados = g.setdefault("cambios_externos", {}) if has_request_context() else {}
 
-            # Validar si los valores son numéricos
-            if not isinstance(e, int):
-                raise ValueError("Los valores de las puntajes deben ser numéricos.")
+        if id(self) not in revisados:
+            verificar = getattr(self.storage, "verificar_cambios", None)
+            self.lapidas.actualizar()
+            revisados[id(self)] = (verificar() if verificar is not None else 0, self.lapidas.cambios_externos)
 
-            # Validar si algún elemento de los valores es cero
-            if e < 1 or e > 5:
-                raise ValueError("Los valores de las puntajes deben estar entre 1 y 5.")
+        return revisados[id(self)]
 
-            # Validar si algún elemento es negativo
-            if e < 0:
-                raise ValueError("No se pueden proporcionar valores negativos en los valores.")
+    def datos_escritos(self):
+        """
+        Obtiene los datos de la base de datos sin leer el archivo, a partir de la última escritura propia, si ningún
+        otro proceso lo modificó después (en ese caso se lee el archivo).
 
-            # Calcular la satisfacción en cada pregunta
-            operacion = e * pesos[cont] * 20
-            valores.append(operacion)
-            cont = cont + 1
+        Returns:
+            dict: Los datos de la base de datos.
 
-        porcentaje_usuario = round(sum(valores) / sum(pesos))
-        puntajes_usuarios.append(porcentaje_usuario)
+        Notas:
+        - Debe llamarse con el candado tomado, fuera de una transacción (ver RegistroCambios.agregar).
+        """
 
-    # Calcular la satisfacción promedio con los puntajes
-    puntajes_porcentaje = round(sum(puntajes_usuarios) / len(puntajes_usuarios))
+        firma_archivo = getattr(self.storage, "firma_archivo", None)
 
-    # Actualizar los resultados en la base de datos
-    resultados.update({"puntajes": puntajes_usuarios}, Query().id_soft == id_soft)
-    softwares.update({"satisfaccion_pun": puntajes_porcentaje}, Query().id_soft == id_soft)
+        if self.escritos is not None and (firma_archivo is None or firma_archivo() == self.storage.firma):
+            return self.escritos
 
-    # Calcular la satisfacción general
-    calcular_satisfaccion(id_soft)
+        return self.read()
 
-def calcular_sat_comentarios(id_soft, comentarios):
-    """
-        Calcula la satisfacción con los puntajes de las preguntas abiertas y actualiza los resultados.
+    def terminar(self, confirmar):
+        """
+        Termina la transacción iniciada por el hilo actual.
 
         Args:
-            id_soft (int): El ID del software.
-            comentarios (list): Una lista que contiene los comentarios tomados, donde cada comentario es una lista de valores.
-
-        Raises:
-            ValueError: Si el ID del software no existe en la base de datos.
-            ValueError: Si la lista de comentarios está vacía o contiene elementos no válidos.
+            confirmar (bool): True para escribir los cambios en el archivo (si es la transacción exterior), o False
+            para descartarlos.
 
         Returns:
-            None
+            list: Los eventos de la transacción, si se confirmó la exterior.
         """
 
-    # Validar la lista de puntajes
-    if not isinstance(comentarios, list) or len(comentarios) < 2:
-        raise ValueError("La lista de comentarios debe contener al menos dos elementos.")
+        eventos = []
 
-    comentarios_usuarios = []
-    pesos = comentarios[0]
+        try:
+            self.nivel = self.nivel - 1
+
+            if self.nivel == 0:
+                confirmada = False
+
+                try:
+                    if confirmar:
+                        with tramo("almacen.confirmar"):
+                            self.storage.write(self.datos)
+
+                        self.escritos = self.datos
+                        eventos = self.eventos
+                        confirmada = True
+                finally:
+                    # Las lápidas se confirman o se descartan junto con los datos
+                    try:
+                        self.lapidas.terminar(confirmada)
+                    finally:
+                        self.bloquear(fcntl.LOCK_UN if fcntl else None)
+                        self.datos = None
+                        self.dueno = None
+                        self.eventos = []
+        finally:
+            self.candado.release()
+
+        return eventos
+
+@contextmanager
+def transaccion():
+    """
+    Agrupa las escrituras en la base de datos de la aplicación actual en una transacción.
 
-    # Analizador de sentimientos de VADER (Valence Aware Dictionary and sEntiment Reasoner) para comentarios
-    analizador = SentimentIntensityAnalyzer()
+    Los cambios se escriben en el archivo una sola vez al terminar el bloque with, o se descartan si el bloque
+    lanza una excepción.
+    """
 
-    for comentario in comentarios[1:]:
-        cont = 0
-        valores_neg = []
-        valores_neu = []
-        valores_pos = []
-        valores_comp = []
+    base_de_datos = base_de_datos_actual()
+    base_de_datos.storage.iniciar()
 
-        porcentaje_usuario = {}
+    try:
+        yield
+    except BaseException:
+        base_de_datos.storage.terminar(confirmar=False)
+        reiniciar_tablas(base_de_datos)
+        raise
+    else:
+        emitir_eventos(base_de_datos.storage.terminar(confirmar=True))
+
+def reiniciar_tablas(base_de_datos):
+    """
+    Descarta las consultas y el siguiente ID guardados por las tablas, después de cambiar los datos sin usarlas.
+
+    Args:
+        base_de_datos (TinyDB): La base de datos.
+    """
+
+    for tabla in base_de_datos._tables.values():
+        tabla.clear_cache()
+        tabla._next_id = None
+
+def registrar_cambio(ids):
+    """
+    Marca softwares modificados por la solicitud actual, para agregarlos al registro de cambios al terminarla.
+
+    Args:
+        ids (list): Los ID de los softwares.
+
+    Notas:
+    - Fuera de una solicitud (p. ej. en un comando), los softwares se agregan al registro al llamar a
+    agregar_cambios_registrados.
+    """
+
+    if current_app.extensions["registro_cambios"] is not None:
+        g.setdefault("cambios", set()).update(ids)
+
+def agregar_cambios_registrados():
+    """
+    Agrega al registro de cambios los softwares marcados con registrar_cambio.
+
+    Returns:
+        int: La revisión después de agregarlos, o None si no se marcó ninguno o no hay registro de cambios.
+
+    Notas:
+    - Debe llamarse después de confirmar la transacción de los cambios, para que el registro los incluya.
+    """
+
+    ids = g.pop("cambios", None)
+    registro = current_app.extensions["registro_cambios"]
+
+    if not ids or registro is None:
+        return None
+
+    return registro.agregar(ids)
+
+def publicar_evento(tipo, id_soft, datos=None):
+    """
+    Publica un evento de un cambio guardado en la base de datos para los clientes de /eventos.
+
+    Args:
+        tipo (str): El tipo de cambio ("nuevo_soft", "eliminar_soft", "restaurar_soft", "metricas" o
+        "intervalos").
+        id_soft (int): El ID del software modificado.
+        datos (dict): Los valores que cambiaron.
+
+    Notas:
+    - Dentro de una transacción el evento se publica al confirmarla, y se descarta si se descarta la transacción.
+    - Durante una solicitud, los eventos se publican al terminarla (ver emitir_eventos).
+    """
+
+    almacen = base_de_datos_actual().storage
+    evento = (tipo, id_soft, datos, inquilino_actual())
+
+    if almacen.en_transaccion():
+        almacen.eventos.append(evento)
+    else:
+        emitir_eventos([evento])
+
+def emitir_eventos(eventos):
+    """
+    Publica eventos de cambios ya guardados (ver publicar_evento).
+
+    Args:
+        eventos (list): Los eventos, como tuplas con los argumentos de BusEventos.publicar.
+
+    Notas:
+    - Durante una solicitud, los eventos se publican al terminarla (ver publicar_cambios), después de todas sus
+    escrituras: p. ej. el evento "metricas" de guardar_tareas no se publica antes de guardar la matriz.
+    """
+
+    if has_request_context():
+        g.setdefault("eventos", []).extend(eventos)
+        return
+
+    for evento in eventos:
+        current_app.extensions["eventos"].publicar(*evento)
+
+def invalidar_respuestas(ids, rutas=None):
+    """
+    Descarta las respuestas guardadas de softwares modificados (ver CacheRespuestas).
+
+    Args:
+        ids (list): Los ID de los softwares.
+        rutas (list): Las rutas cuyas respuestas cambian, o None para todas las de RUTAS_RESPUESTAS.
+
+    Notas:
+    - Debe llamarse después de escribir los cambios (o dentro de su transacción), para que una respuesta leída
+    antes del cambio no se guarde después de descartarla.
+    """
+
+    cache = current_app.extensions["respuestas"]
+
+    if cache is not None:
+        cache.invalidar(inquilino_actual(), ids, rutas)
+
+def respuesta_guardada(ruta, id_soft, obtener):
+    """
+    Devuelve la respuesta de una ruta de lectura guardada en la caché de respuestas, o la genera y la guarda.
+
+    Args:
+        ruta (str): La ruta (una de RUTAS_RESPUESTAS).
+        id_soft (int): El ID del software.
+        obtener (callable): Función que lee de la base de datos los datos de la respuesta, o devuelve None si no
+        existen (no se guarda nada y la ruta responde el error).
+
+    Returns:
+        Response: La respuesta JSON (comprimida con gzip si el cliente lo acepta y se guardó comprimida), o None si
+        obtener devolvió None.
+
+    Notas:
+    - El candado de la base de datos no se espera: durante una transacción (propia, como en /lote, o de otro hilo)
+    la respuesta se lee de la base de datos sin usar la caché.
+    """
+
+    cache = current_app.extensions["respuestas"]
+    almacen = base_de_datos_actual().storage
+    clave = (inquilino_actual(), id_soft, ruta)
+    respuesta = None
+    generacion = None
+
+    # Buscar la respuesta, descartando las de la base de datos si otro proceso la modificó
+    if cache is not None and almacen.candado.acquire(blocking=False):
+        try:
+            if not almacen.en_transaccion():
+                respuesta, generacion = cache.obtener(clave, (almacen, almacen.cambios_externos()))
+        finally:
+            almacen.candado.release()
+
+    if respuesta is not None:
+        contar("respuestas.guardadas")
+        anotar(respuesta_guardada=True)
+    else:
+        datos = obtener()
+
+        if datos is None:
+            return None
+
+        if generacion is None:
+            return jsonify(datos)
+
+        contar("respuestas.generadas")
+        respuesta = cache.guardar(clave, jsonify(datos).get_data(), generacion)
+
+    cuerpo, comprimido = respuesta
+
+    if comprimido is None:
+        return Response(cuerpo, mimetype="application/json")
+
+    if request.accept_encodings["gzip"]:
+        response = Response(comprimido, mimetype="application/json", headers={"Content-Encoding": "gzip"})
+    else:
+        response = Response(cuerpo, mimetype="application/json")
+
+    # La respuesta depende de la cabecera Accept-Encoding (para los proxies con caché)
+    response.vary.add("Accept-Encoding")
+
+    return response
+
+
+
+
+
+
+# Trazas de las solicitudes (formato JSON de Zipkin v2, un tramo por línea)
+
+# tramo en curso del contexto actual (None si la solicitud no se traza)
+tramo_actual = contextvars.ContextVar("tramo_actual", default=None)
+
+class Tramo:
+    """
+    Una operación trazada (span), con su traza, su tramo padre, su duración y sus atributos.
+    """
+
+    def __init__(self, exportador, nombre, id_traza, id_padre=None, tipo=None):
+        self.exportador = exportador
+        self.nombre = nombre
+        self.id_traza = id_traza
+        self.id = secrets.token_hex(8)
+        self.id_padre = id_padre
+        self.tipo = tipo
+        self.atributos = {}
+        self.inicio = time.time()
+        self.reloj = time.perf_counter()
+
+    def terminar(self):
+        """
+        Termina el tramo y lo exporta.
+        """
+
+        tramo = {
+            "traceId": self.id_traza,
+            "id": self.id,
+            "name": self.nombre,
+            "timestamp": int(self.inicio * 1_000_000),
+            "duration": max(1, int((time.perf_counter() - self.reloj) * 1_000_000)),
+            "localEndpoint": {"serviceName": "evaluador"},
+            "tags": {clave: str(valor) for clave, valor in self.atributos.items()},
+        }
+
+        if self.id_padre:
+            tramo["parentId"] = self.id_padre
+        if self.tipo:
+            tramo["kind"] = self.tipo
+
+        self.exportador.exportar(tramo)
+
+class ExportadorTrazas:
+    """
+    Escribe los tramos terminados en un archivo, una línea JSON por tramo, rotándolo al alcanzar su tamaño máximo.
+
+    Notas:
+    - El archivo se abre con el primer tramo de cada proceso: la aplicación se crea en el proceso principal de
+    Gunicorn, que no atiende solicitudes, y el proceso de trabajo creado con fork no hereda un archivo abierto (cuya
+    posición y rotación compartiría con el principal).
+    """
+
+    def __init__(self, ruta, max_bytes, copias):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.copias = copias
+        self.abierto = None
+        self.pid = None
+        self.candado = threading.Lock()
+
+    @property
+    def manejador(self):
+        """
+        El manejador del archivo abierto por el proceso actual.
+        """
+
+        with self.candado:
+            if self.pid != os.getpid():
+                self.abierto = RotatingFileHandler(
+                    self.ruta, maxBytes=self.max_bytes, backupCount=self.copias, encoding="utf-8"
+                )
+                self.abierto.setFormatter(logging.Formatter("%(message)s"))
+                self.pid = os.getpid()
+
+            return self.abierto
+
+    def exportar(self, tramo):
+        self.manejador.handle(logging.makeLogRecord({"msg": json.dumps(tramo, ensure_ascii=False)}))
+
+@contextmanager
+def tramo(nombre, **atributos):
+    """
+    Traza una operación como un tramo hijo del tramo en curso, si la solicitud se está trazando.
+
+    Args:
+        nombre (str): El nombre de la operación.
+        **atributos: Los atributos del tramo (p. ej. id_soft).
+
+    Yields:
+        Tramo: El tramo, o None si la solicitud no se traza (en ese caso no se hace nada más).
+    """
+
+    padre = tramo_actual.get()
+
+    if padre is None:
+        yield None
+        return
+
+    hijo = Tramo(padre.exportador, nombre, padre.id_traza, padre.id)
+    hijo.atributos.update(atributos)
+    token = tramo_actual.set(hijo)
+
+    try:
+        yield hijo
+    except BaseException as e:
+        hijo.atributos["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        tramo_actual.reset(token)
+        hijo.terminar()
+
+def anotar(**atributos):
+    """
+    Agrega atributos al tramo en curso, si la solicitud se está trazando.
+    """
+
+    actual = tramo_actual.get()
+
+    if actual is not None:
+        actual.atributos.update(atributos)
+
+def trazar_calculo(funcion):
+    """
+    Traza una función calcular_*(id_soft, matriz, ...) como un tramo con el id_soft y la forma de la matriz.
+    """
+
+    @wraps(funcion)
+    def trazada(id_soft, matriz, *args, **kwargs):
+        if tramo_actual.get() is None:
+            return funcion(id_soft, matriz, *args, **kwargs)
+
+        with tramo(funcion.__name__, id_soft=id_soft, filas=len(matriz), columnas=len(matriz[0]) if len(matriz) else 0):
+            return funcion(id_soft, matriz, *args, **kwargs)
+
+    return trazada
+
+class ProveedorJSON(DefaultJSONProvider):
+    """
+    Serializador JSON de Flask que traza la serialización de las respuestas.
+    """
+
+    def response(self, *args, **kwargs):
+        with tramo("json.serializar"):
+            return super().response(*args, **kwargs)
+
+@rutas.before_request
+def iniciar_traza():
+    """
+    Inicia el tramo de la solicitud, si se guardan trazas y la solicitud se muestrea.
+
+    Notas:
+    - Si la solicitud tiene la cabecera traceparent (W3C Trace Context), el tramo continúa esa traza y se respeta
+    su decisión de muestreo; si no, se traza una fracción MUESTREO_TRAZAS de las solicitudes.
+    """
+
+    exportador = current_app.extensions["trazas"]
+
+    if exportador is None:
+        return None
+
+    cabecera = re.fullmatch(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})", request.headers.get("traceparent", ""))
+
+    if cabecera:
+        id_traza, id_padre, opciones = cabecera.groups()
+        muestreada = int(opciones, 16) & 1
+    else:
+        id_traza, id_padre = secrets.token_hex(16), None
+        muestreada = secrets.randbelow(1_000_000) < current_app.config["MUESTREO_TRAZAS"] * 1_000_000
+
+    if not muestreada:
+        return None
+
+    raiz = Tramo(exportador, f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                 id_traza, id_padre, "SERVER")
+    raiz.atributos.update({"http.method": request.method, "http.path": request.path})
+
+    datos = request.get_json(silent=True)
+    if isinstance(datos, dict) and "id_soft" in datos:
+        raiz.atributos["id_soft"] = datos["id_soft"]
+
+    g.tramo = (raiz, tramo_actual.set(raiz))
+
+    return None
+
+@rutas.after_request
+def anotar_traza(response):
+    """
+    Agrega el código de la respuesta al tramo de la solicitud, y devuelve la traza en la cabecera traceresponse.
+    """
+
+    if "tramo" in g:
+        raiz, _ = g.tramo
+        raiz.atributos["http.status_code"] = response.status_code
+        response.headers["traceresponse"] = f"00-{raiz.id_traza}-{raiz.id}-01"
+
+    return response
+
+@rutas.teardown_request
+def terminar_traza(error=None):
+    """
+    Termina y exporta el tramo de la solicitud.
+    """
+
+    if "tramo" in g:
+        raiz, token = g.pop("tramo")
+
+        if error is not None:
+            raiz.atributos["error"] = f"{type(error).__name__}: {error}"
+
+        tramo_actual.reset(token)
+        raiz.terminar()
+
+
+
+
+
+
+# Bases de datos de los inquilinos
+class PoolBases:
+    """
+    Bases de datos abiertas de los inquilinos, cada una en su archivo, con una cantidad máxima abierta a la vez.
+
+    Notas:
+    - Al superar el máximo se cierra la base de datos usada hace más tiempo (cerrarla termina de escribir su
+    archivo). Las que están en uso por alguna solicitud no se cierran hasta que se liberan.
+    - Cada base de datos tiene su propio candado (ver AlmacenTransaccional): las escrituras o transacciones
+    largas de un inquilino no hacen esperar a los demás.
+    """
+
+    def __init__(self, directorio, maximo, compresion=None, nivel=None):
+        self.directorio = directorio
+        self.maximo = maximo
+        self.compresion = compresion
+        self.nivel = nivel
+        self.abiertas = OrderedDict()
+        self.candado = threading.Lock()
+        os.makedirs(directorio, exist_ok=True)
+
+    def adquirir(self, inquilino):
+        """
+        Obtiene la base de datos de un inquilino, abriéndola (o creándola) si no está abierta.
+
+        Args:
+            inquilino (str): El nombre del inquilino (ver PATRON_INQUILINO).
+
+        Returns:
+            TinyDB: La base de datos, que debe liberarse al terminar de usarla (ver liberar).
+        """
+
+        with self.candado:
+            abierta = self.abiertas.get(inquilino)
+
+            if abierta is None:
+                contar("inquilinos.abiertas")
+                ruta = os.path.join(self.directorio, f"{inquilino}.json")
+                abierta = self.abiertas[inquilino] = [abrir_base_de_datos(ruta, self.compresion, self.nivel), 0]
+
+            self.abiertas.move_to_end(inquilino)
+            abierta[1] = abierta[1] + 1
+            cerrar = self.desalojar()
+
+        self.cerrar(cerrar)
+
+        return abierta[0]
+
+    def liberar(self, inquilino):
+        """
+        Indica que una solicitud terminó de usar la base de datos de un inquilino.
+        """
+
+        with self.candado:
+            self.abiertas[inquilino][1] = self.abiertas[inquilino][1] - 1
+            cerrar = self.desalojar()
+
+        self.cerrar(cerrar)
+
+    def desalojar(self):
+        """
+        Quita del pool las bases de datos sin uso que exceden el máximo, empezando por las usadas hace más tiempo.
+
+        Returns:
+            list: Las bases de datos quitadas, para cerrarlas sin bloquear el pool.
+        """
+
+        sin_uso = [inquilino for inquilino, (_, usos) in self.abiertas.items() if usos == 0]
+
+        return [self.abiertas.pop(inquilino)[0] for inquilino in sin_uso[:max(0, len(self.abiertas) - self.maximo)]]
+
+    def cerrar(self, bases_de_datos):
+        for base_de_datos in bases_de_datos:
+            contar("inquilinos.cerradas")
+            base_de_datos.close()
+
+class PrefijoInquilino:
+    """
+    Middleware WSGI que atiende las rutas /t/<inquilino>/... como las rutas sin el prefijo con la cabecera
+    X-Inquilino.
+    """
+
+    def __init__(self, aplicacion):
+        self.aplicacion = aplicacion
+
+    def __call__(self, environ, start_response):
+        partes = environ.get("PATH_INFO", "").split("/", 3)
+
+        if len(partes) == 4 and partes[0] == "" and partes[1] == "t":
+            environ["HTTP_X_INQUILINO"] = partes[2]
+            environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + f"/t/{partes[2]}"
+            environ["PATH_INFO"] = "/" + partes[3]
+
+        return self.aplicacion(environ, start_response)
+
+@rutas.before_request
+def abrir_inquilino():
+    """
+    Usa la base de datos del inquilino indicado en la cabecera X-Inquilino (o en el prefijo /t/<inquilino>) durante
+    la solicitud.
+    """
+
+    inquilino = request.headers.get("X-Inquilino")
+
+    if inquilino is None:
+        return None
+
+    pool = current_app.extensions["inquilinos"]
+
+    if pool is None:
+        return jsonify({"error": "La aplicación no atiende inquilinos (DIRECTORIO_INQUILINOS)"}), 400
+
+    if not PATRON_INQUILINO.fullmatch(inquilino):
+        return jsonify({"error": f"Nombre de inquilino no válido: {inquilino}"}), 400
+
+    g.base_de_datos = pool.adquirir(inquilino)
+    g.inquilino = inquilino
+    anotar(inquilino=inquilino)
+
+    return None
+
+@rutas.teardown_request
+def liberar_inquilino(error=None):
+    """
+    Libera la base de datos del inquilino de la solicitud.
+    """
+
+    if "inquilino" in g:
+        g.pop("base_de_datos")
+        current_app.extensions["inquilinos"].liberar(g.pop("inquilino"))
+
+@rutas.teardown_request
+def olvidar_cambios_externos(error=None):
+    """
+    Descarta la revisión de los cambios de otros procesos hecha durante la solicitud (ver
+    AlmacenTransaccional.cambios_externos), para que la siguiente vuelva a revisarlos.
+    """
+
+    g.pop("cambios_externos", None)
+
+
+
+
+
+
+# Réplicas de solo lectura
+@rutas.before_request
+def atender_en_replica():
+    """
+    En una réplica, rechaza las rutas que modifican datos y espera la revisión pedida con X-Revision-Minima.
+
+    Si la ruta modifica datos se devuelve el código 405. Si la réplica no alcanza la revisión de X-Revision-Minima
+    (la cabecera X-Revision de la respuesta de una escritura en el principal) en ESPERA_REPLICA segundos, se
+    devuelve el código 503 con la cabecera Retry-After.
+
+    Returns:
+        Response: La respuesta de error, o None para atender la solicitud.
+    """
+
+    replica = current_app.extensions.get("replica")
+
+    if replica is None:
+        return None
+
+    replica.iniciar()
+
+    if request.endpoint not in RUTAS_LECTURA:
+        response = {"error": "Esta instancia es una réplica de solo lectura", "origen": replica.origen}
+        return jsonify(response), 405
+
+    minima = request.headers.get("X-Revision-Minima")
+
+    if minima and not minima.isdigit():
+        return jsonify({"error": "La cabecera X-Revision-Minima debe ser un entero"}), 400
+
+    if minima and not replica.esperar(int(minima), current_app.config["ESPERA_REPLICA"]):
+        response = {"error": "La réplica aún no tiene la revisión pedida", "revision": replica.revision}
+        return jsonify(response), 503, {"Retry-After": "1"}
+
+    return None
+
+
+
+
+
+
+# Repetición de las solicitudes con la cabecera Idempotency-Key
+@rutas.before_request
+def repetir_solicitud():
+    """
+    Devuelve la respuesta guardada de una solicitud repetida con la misma cabecera Idempotency-Key.
+
+    Solo se aplica a las rutas de RUTAS_IDEMPOTENTES. Si la clave ya se usó con otro cuerpo se devuelve el código
+    422, y si su primera solicitud aún se está ejecutando, el código 409.
+
+    Returns:
+        Response: La respuesta guardada, o None para ejecutar la solicitud.
+    """
+
+    clave = request.headers.get("Idempotency-Key")
+
+    if not clave or request.endpoint not in RUTAS_IDEMPOTENTES:
+        return None
+
+    clave = (inquilino_actual(), request.endpoint, clave)
+    huella = hashlib.sha256(request.get_data()).hexdigest()
+    guardada = current_app.extensions["idempotencia"].reservar(clave, huella)
+
+    # Primera solicitud con esta clave: se ejecuta y su respuesta se guarda al terminar
+    if guardada is None:
+        g.idempotencia = (clave, huella)
+        return None
+
+    huella_guardada, respuesta = guardada
+
+    if huella_guardada != huella:
+        return jsonify({"error": "La clave de idempotencia ya se usó con otra solicitud"}), 422
+
+    if respuesta is None:
+        response = {"error": "La solicitud con esta clave de idempotencia aún se está ejecutando"}
+        return jsonify(response), 409, {"Retry-After": "1"}
+
+    contar("idempotencia.repetidas")
+    anotar(idempotencia_repetida=True)
+    cuerpo, codigo, tipo = respuesta
+
+    return Response(cuerpo, codigo, content_type=tipo, headers={"Idempotent-Replayed": "true"})
+
+@rutas.after_request
+def guardar_respuesta(response):
+    """
+    Guarda la respuesta de una solicitud con clave de idempotencia, salvo los errores del servidor (5xx), que
+    liberan la clave para poder reintentar.
+    """
+
+    if "idempotencia" in g:
+        clave, huella = g.pop("idempotencia")
+        cache = current_app.extensions["idempotencia"]
+
+        if response.status_code < 500:
+            cache.guardar(clave, huella, (response.get_data(), response.status_code, response.content_type))
+        else:
+            cache.liberar(clave)
+
+    return response
+
+@rutas.teardown_request
+def liberar_clave(error=None):
+    """
+    Libera la clave de idempotencia de una solicitud que terminó con una excepción.
+    """
+
+    if "idempotencia" in g:
+        clave, _ = g.pop("idempotencia")
+        current_app.extensions["idempotencia"].liberar(clave)
+
+@rutas.after_request
+def publicar_cambios(response):
+    """
+    Agrega al registro de cambios los softwares modificados por la solicitud (ver registrar_cambio), devuelve la
+    revisión resultante en la cabecera X-Revision y publica los eventos de la solicitud (ver emitir_eventos).
+
+    Notas:
+    - Se ejecuta antes que guardar_respuesta (Flask ejecuta estas funciones en orden inverso), para que las
+    respuestas repetidas con Idempotency-Key también incluyan la cabecera.
+    """
+
+    revision = agregar_cambios_registrados()
+
+    if revision is not None:
+        response.headers["X-Revision"] = str(revision)
+
+    for evento in g.pop("eventos", []):
+        current_app.extensions["eventos"].publicar(*evento)
+
+    return response
+
+
+
+
+
+
+# Rutas de la API para la gestion, listado y eliminación de softwares en la base de datos
+@rutas.route('/nuevo_soft', methods=['POST'])
+def nuevo_software():
+    """
+    Crea un nuevo software.
+
+    Entrada (request JSON):
+    {
+        "nombre": "soft1",
+        "version": "2.0.2"
+    }
+
+    Valor de retorno:
+    Una respuesta en formato JSON que indica si el software fue creado exitosamente o no.
+
+    Notas:
+    - La constante SIN_VALOR está definida con su respectivo valor.
+    """
+
+    # Verificar si el campo "nombre" y "version" están presentes en la solicitud JSON
+    if "nombre" not in request.json or "version" not in request.json:
+        response = {"error": "Campos 'nombre' y 'version' faltantes en la solicitud"}
+        return jsonify(response), 400
+
+    # Crear el software y sus documentos asociados
+    crear_softwares([request.json])
+
+    response = {"message": "Software creado exitosamente"}
+    return jsonify(response)
+
+@rutas.route('/listar')
+def listar():
+    """
+    Lista todos los software disponibles.
+
+    Valor de retorno:
+    Una respuesta en formato JSON que contiene la lista de todos los software disponibles.
+
+    Notas:
+    - Se asume que la variable "softwares" contiene la colección de datos de software.
+    """
+
+    # Obtener la lista de todos los software
+    lista_softwares = softwares.all()
+
+    # Verificar si no se encontraron software
+    if not lista_softwares:
+        response = {"message": "No se encontraron software"}
+        return jsonify(response), 404
+
+    return jsonify(lista_softwares)
+
+@rutas.route('/eliminar_soft', methods=['DELETE'])
+def eliminar_soft():
+    """
+    Elimina un software y sus datos asociados.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una respuesta en formato JSON que indica si el borrado fue exitoso o no.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    - Las tablas "softwares", "evaluaciones", "resultados" y "estadisticas" contienen las colecciones de datos
+    correspondientes.
+    - El software deja de mostrarse de inmediato, pero sus datos se borran después (ver RecolectorLapidas); hasta
+    entonces se puede restaurar con /restaurar_soft.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Eliminar el software y sus datos asociados
+    eliminar_softwares([id_soft])
+
+    response = {"message": "Borrado exitosamente"}
+    return jsonify(response)
+
+
+
+
+
+
+
+@rutas.route('/nuevos_softs', methods=['POST'])
+def nuevos_softwares():
+    """
+    Crea varios softwares a la vez.
+
+    Entrada (request JSON):
+    {
+        "softwares": [
+            {"nombre": "soft1", "version": "2.0.2"},
+            {"nombre": "soft1", "version": "2.1.0"}
+        ]
+    }
+
+    Valor de retorno:
+    Un JSON con los ID generados ("ids"), en el mismo orden que los softwares recibidos.
+
+    Notas:
+    - Todos los softwares se crean en una sola transacción: cada tabla se modifica una vez y la base de datos se
+    escribe una vez.
+    """
+
+    lista = request.json.get("softwares") if request.is_json else None
+
+    # Validar que cada software tenga nombre y versión antes de crear alguno
+    if not isinstance(lista, list):
+        response = {"error": "Campo 'softwares' faltante o no es una lista"}
+        return jsonify(response), 400
+
+    for indice, soft in enumerate(lista):
+        if not isinstance(soft, dict) or "nombre" not in soft or "version" not in soft:
+            response = {"error": f"Campos 'nombre' y 'version' faltantes en el software {indice}"}
+            return jsonify(response), 400
+
+    with transaccion():
+        ids = crear_softwares(lista)
+
+    response = {"message": f"{len(ids)} softwares creados exitosamente", "ids": ids}
+    return jsonify(response)
+
+@rutas.route('/eliminar_softs', methods=['DELETE'])
+def eliminar_softwares_ruta():
+    """
+    Elimina varios softwares y sus datos asociados.
+
+    Entrada (request JSON), con los ID de los softwares o con la fecha (timestamp) antes de la cual se crearon:
+    {
+        "ids": [1, 2, 3]
+    }
+    {
+        "antes_de": 1686787200
+    }
+
+    Valor de retorno:
+    Un JSON con los ID de los softwares eliminados ("ids").
+
+    Notas:
+    - Todos los softwares se eliminan en una sola transacción, sin modificar la base de datos (ver
+    eliminar_softwares); se pueden restaurar con /restaurar_soft hasta que se borren sus documentos.
+    """
+
+    r = request.json if request.is_json else {}
+
+    try:
+
+        # Obtener los ID indicados, o los de los softwares creados antes de la fecha
+        if "ids" in r:
+            ids = [int(id_soft) for id_soft in r["ids"]]
+        elif "antes_de" in r:
+            antes_de = float(r["antes_de"])
+            ids = [soft["id_soft"] for soft in softwares.search(Query().fecha < antes_de)]
+        else:
+            response = {"error": "Campo 'ids' o 'antes_de' faltante en la solicitud"}
+            return jsonify(response), 400
+
+    except (TypeError, ValueError) as e:
+        return jsonify({"error: ": str(e)}), 400
+
+    with transaccion():
+        eliminar_softwares(ids)
+
+    response = {"message": f"{len(ids)} softwares borrados exitosamente", "ids": ids}
+    return jsonify(response)
+
+def crear_softwares(lista):
+    """
+    Crea softwares con sus documentos de evaluación, resultados y estadísticas.
+
+    Args:
+        lista (list): Los softwares a crear, cada uno con "nombre" y "version".
+
+    Returns:
+        list: Los ID generados, en el mismo orden que la lista.
+
+    Notas:
+    - La constante SIN_VALOR está definida con su respectivo valor.
+    - Cada tabla se modifica una vez, sea cual sea la cantidad de softwares, y la base de datos se escribe una vez.
+    - El último ID asignado se guarda en la tabla "contadores", para no volver a asignar los ID de los softwares
+    borrados (ver borrar_softwares).
+    """
+
+    fecha = datetime.now().timestamp()
+
+    # Los ID se calculan y los documentos se insertan en una misma transacción, para que otro hilo o proceso no
+    # asigne los mismos ID
+    with transaccion():
+        # Los ID se asignan antes de insertar, para guardarlos también en el campo "id_soft" (los de los softwares
+        # eliminados siguen en uso, aunque ya se hayan borrado)
+        contador = contadores.get(doc_id=1) or {}
+        siguiente = max(max(softwares.ids_documentos(), default=0), contador.get("ultimo_id_soft", 0)) + 1
+        ids = list(range(siguiente, siguiente + len(lista)))
+        contadores.upsert(Document({"ultimo_id_soft": ids[-1] if ids else siguiente - 1}, doc_id=1))
+
+        # Una lápida de un ID nuevo es de un software ya borrado (p. ej. si se interrumpió la recolección)
+        almacen = base_de_datos_actual().storage
+
+        with almacen.candado:
+            almacen.lapidas.quitar(ids, "borrado")
+            almacen.versiones.agregar((id_gen, soft["nombre"], soft["version"]) for id_gen, soft in zip(ids, lista))
+
+        # Crear los documentos de software
+        softwares.insert_multiple(
+            Document({
+                "id_soft": id_gen,
+                "nombre": soft["nombre"],
+                "version": soft["version"],
+                "analizado": False,
+                "fecha": fecha,
+                "eficacia": SIN_VALOR,
+                "eficiencia": SIN_VALOR,
+                "satisfaccion_pun": SIN_VALOR,
+                "satisfaccion_com": SIN_VALOR,
+                "satisfaccion": SIN_VALOR,
+                "usabilidad": SIN_VALOR,
+                "intervalos": {},
+            }, doc_id=id_gen)
+            for id_gen, soft in zip(ids, lista)
+        )
+
+        # Crear los documentos de evaluación, resultados y estadísticas por columna asociados a cada software
+        evaluaciones.insert_multiple(
+            {"id_soft": id_gen, "tareas": [], "tiempos": [], "puntajes": [], "comentarios": [], "hashes": {}}
+            for id_gen in ids
+        )
+        resultados.insert_multiple(
+            {"id_soft": id_gen, "tareas": [], "tiempos": [], "puntajes": [], "comentarios": []} for id_gen in ids
+        )
+        estadisticas.insert_multiple(
+            {"id_soft": id_gen, "tareas": [], "tiempos": [], "puntajes": [], "comentarios": []} for id_gen in ids
+        )
+
+        for id_gen, soft in zip(ids, lista):
+            publicar_evento("nuevo_soft", id_gen, {"nombre": soft["nombre"], "version": soft["version"]})
+
+    registrar_cambio(ids)
+
+    return ids
+
+def eliminar_softwares(ids):
+    """
+    Elimina softwares: dejan de mostrarse de inmediato, y sus documentos se borran después (ver Lapidas).
+
+    Args:
+        ids (list): Los ID de los softwares.
+
+    Notas:
+    - No se lee ni se modifica la base de datos, solo se agrega una línea por software al registro de lápidas, por
+    lo que el tiempo no depende del tamaño de la base de datos. Las lápidas de ID que no existen no ocultan nada
+    y se descartan al recolectar.
+    """
+
+    ids = sorted(set(ids))
+    base_de_datos = base_de_datos_actual()
+
+    with base_de_datos.storage.candado:
+        base_de_datos.storage.lapidas.agregar(ids, datetime.now().timestamp())
+
+    # Las consultas y las respuestas guardadas aún incluyen los softwares eliminados
+    reiniciar_tablas(base_de_datos)
+    invalidar_respuestas(ids)
+
+    for id_soft in ids:
+        publicar_evento("eliminar_soft", id_soft)
+
+    registrar_cambio(ids)
+
+def restaurar_softwares(ids):
+    """
+    Restaura softwares eliminados cuyos documentos aún no se borraron.
+
+    Args:
+        ids (list): Los ID de los softwares.
+
+    Returns:
+        list: Los ID de los softwares restaurados (los demás no estaban eliminados o ya se borraron).
+    """
+
+    base_de_datos = base_de_datos_actual()
+
+    with base_de_datos.storage.candado:
+        lapidas = base_de_datos.storage.lapidas
+        lapidas.actualizar()
+        ids = sorted({id_soft for id_soft in ids if id_soft in lapidas.fechas})
+        lapidas.quitar(ids)
+
+    reiniciar_tablas(base_de_datos)
+
+    for id_soft in ids:
+        publicar_evento("restaurar_soft", id_soft)
+
+    registrar_cambio(ids)
+
+    return ids
+
+def borrar_softwares(ids):
+    """
+    Borra los documentos de softwares eliminados, recorriendo cada tabla una vez.
+
+    Args:
+        ids (list): Los ID de los softwares.
+
+    Notas:
+    - Los informes de regresión de otros softwares que los comparaban con uno de los borrados se borran, y se
+    vuelven a calcular con su nueva versión anterior (ver detectar_regresiones).
+    """
+
+    ids = set(ids)
+    afectados = {
+        informe["id_soft"] for informe in regresiones.search(Query().anterior.id_soft.one_of(ids))
+    } - ids
+
+    for tabla in (softwares, evaluaciones, resultados, estadisticas, historial):
+        tabla.remove(Query().id_soft.one_of(ids))
+
+    regresiones.remove(Query().id_soft.one_of(ids | afectados))
+
+    base_de_datos_actual().storage.lapidas.quitar(ids, "borrado")
+
+    # Los softwares eliminados con informes afectados no se ven, y su informe se calcula si se restauran y analizan
+    for software in softwares.search(Query().id_soft.one_of(afectados)):
+        if software["analizado"]:
+            detectar_regresiones(software)
+
+    registrar_cambio(afectados)
+
+def recolectar_lapidas(continuar=None, retencion=None):
+    """
+    Borra los documentos de los softwares eliminados hace más de `retencion` segundos, en la base de datos de la
+    aplicación y en las de los inquilinos abiertas, por lotes de LOTE_RECOLECCION softwares.
+
+    Args:
+        continuar (callable): Indica si se puede borrar otro lote (p. ej. mientras no haya solicitudes), o None
+        para borrar todos.
+        retencion (float): Los segundos desde la eliminación (por defecto, RETENCION_LAPIDAS).
+
+    Returns:
+        int: La cantidad de softwares borrados.
+
+    Notas:
+    - Las bases de datos que otro proceso está recolectando se omiten (ver Lapidas.recolectar).
+    """
+
+    retencion = current_app.config["RETENCION_LAPIDAS"] if retencion is None else retencion
+    lote = current_app.config["LOTE_RECOLECCION"]
+    pool = current_app.extensions["inquilinos"]
+    inquilinos = [None]
+    borrados = 0
+
+    if pool is not None:
+        with pool.candado:
+            inquilinos = inquilinos + list(pool.abiertas)
+
+    for inquilino in inquilinos:
+        if inquilino is not None:
+            g.base_de_datos = pool.adquirir(inquilino)
+
+        try:
+            almacen = base_de_datos_actual().storage
+
+            limite = time.time() - retencion
+
+            with almacen.lapidas.recolectar() as reservado:
+                if not reservado:
+                    contar("lapidas.omitidas")
+                    continue
+
+                with almacen.candado:
+                    almacen.lapidas.actualizar()
+                    vencidas = [id_soft for id_soft, fecha in almacen.lapidas.fechas.items() if fecha <= limite]
+
+                for inicio in range(0, len(vencidas), lote):
+                    if continuar is not None and not continuar():
+                        break
+
+                    # Dentro de la transacción, omitir los softwares restaurados mientras tanto
+                    with transaccion():
+                        ids = [
+                            id_soft for id_soft in vencidas[inicio:inicio + lote] if id_soft in almacen.lapidas.fechas
+                        ]
+                        borrar_softwares(ids)
+
+                    borrados = borrados + len(ids)
+                    contar("lapidas.borradas", len(ids))
+                    agregar_cambios_registrados()
+
+                if vencidas:
+                    with almacen.candado:
+                        almacen.lapidas.compactar()
+        finally:
+            if inquilino is not None:
+                g.pop("base_de_datos")
+                pool.liberar(inquilino)
+
+    return borrados
+
+class RecolectorLapidas:
+    """
+    Borra en segundo plano los documentos de los softwares eliminados, mientras la aplicación no atiende solicitudes.
+
+    Notas:
+    - Cada INTERVALO_RECOLECCION segundos, si pasaron INACTIVIDAD_RECOLECCION segundos sin solicitudes, borra los
+    softwares eliminados hace más de RETENCION_LAPIDAS segundos (ver recolectar_lapidas). Deja de borrar si llega
+    una solicitud, y continúa en la siguiente revisión.
+    - El hilo se inicia con la primera solicitud del proceso, porque los hilos no sobreviven al fork del proceso
+    de trabajo de Gunicorn.
+    - La inactividad es la del proceso. Si varios procesos de trabajo (o el comando recolectar_eliminados) están
+    inactivos a la vez, solo uno borra (ver Lapidas.recolectar), y cada lote se borra en una transacción que
+    bloquea la base de datos para los demás procesos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.activas = 0
+        self.ultima = time.monotonic()
+        self.candado = threading.Lock()
+        self.hilo = None
+
+    def entrar(self):
+        """
+        Registra el inicio de una solicitud, e inicia el hilo del recolector si no está en ejecución.
+        """
+
+        with self.candado:
+            self.activas = self.activas + 1
+            self.ultima = time.monotonic()
+
+            if self.hilo is None or not self.hilo.is_alive():
+                self.hilo = threading.Thread(target=self.ejecutar, daemon=True)
+                self.hilo.start()
+
+    def salir(self):
+        """
+        Registra el final de una solicitud.
+        """
+
+        with self.candado:
+            self.activas = self.activas - 1
+            self.ultima = time.monotonic()
+
+    def inactiva(self):
+        """
+        Indica si la aplicación lleva INACTIVIDAD_RECOLECCION segundos sin solicitudes.
+        """
+
+        espera = self.app.config["INACTIVIDAD_RECOLECCION"]
+
+        return self.activas == 0 and time.monotonic() - self.ultima >= espera
+
+    def ejecutar(self):
+        while True:
+            time.sleep(self.app.config["INTERVALO_RECOLECCION"])
+
+            if not self.inactiva():
+                continue
+
+            try:
+                with self.app.app_context():
+                    recolectar_lapidas(self.inactiva)
+            except Exception:
+                contar("lapidas.errores")
+
+@rutas.before_request
+def registrar_actividad():
+    """
+    Registra la solicitud para que el recolector de softwares eliminados espere a que termine.
+    """
+
+    recolector = current_app.extensions["recolector"]
+
+    if recolector is not None:
+        recolector.entrar()
+        g.actividad = recolector
+
+@rutas.teardown_request
+def terminar_actividad(error=None):
+    """
+    Registra el final de la solicitud (ver registrar_actividad).
+    """
+
+    if "actividad" in g:
+        g.pop("actividad").salir()
+
+@rutas.route('/restaurar_soft', methods=['POST'])
+def restaurar_soft():
+    """
+    Restaura un software eliminado, si sus documentos aún no se borraron.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Un JSON con un mensaje, o con un error y el código 404 si el software no está eliminado o ya se borró.
+
+    Notas:
+    - Los softwares eliminados se pueden restaurar durante RETENCION_LAPIDAS segundos, o hasta que el recolector
+    borra sus documentos (ver /listar_eliminados).
+    """
+
+    r = request.json if request.is_json else {}
+
+    if "id_soft" not in r:
+        return jsonify({"error": "Campo 'id_soft' faltante en la solicitud"}), 400
+
+    try:
+        id_soft = int(r["id_soft"])
+    except (TypeError, ValueError) as e:
+        return jsonify({"error: ": str(e)}), 400
+
+    if not restaurar_softwares([id_soft]):
+        return jsonify({"error": f"No hay un software eliminado con el id_soft {id_soft} que se pueda restaurar"}), 404
+
+    return jsonify({"message": "Software restaurado exitosamente"})
+
+@rutas.route('/listar_eliminados', methods=['GET'])
+def listar_eliminados():
+    """
+    Lista los softwares eliminados que aún se pueden restaurar.
+
+    Valor de retorno:
+    Una lista JSON con el ID de cada software ("id_soft") y la fecha (timestamp) en que se eliminó ("fecha").
+    """
+
+    lapidas = base_de_datos_actual().storage.lapidas
+    lapidas.actualizar()
+
+    return jsonify([{"id_soft": id_soft, "fecha": fecha} for id_soft, fecha in sorted(lapidas.fechas.items())])
+
+@rutas.cli.command("recolectar_eliminados")
+@click.option("--retencion", type=float, default=None,
+              help="Borrar los softwares eliminados hace más de estos segundos (por defecto, RETENCION_LAPIDAS).")
+def recolectar_eliminados(retencion):
+    """
+    Borra ahora los documentos de los softwares eliminados (ver RecolectorLapidas).
+    """
+
+    click.echo(f"Softwares borrados: {recolectar_lapidas(retencion=retencion)}")
+
+@rutas.route('/listar_regresiones', methods=['GET'])
+def listar_regresiones():
+    """
+    Lista los informes de regresión de los softwares, que los comparan con su versión analizada anterior.
+
+    Parámetros de la URL:
+    - nombre: Solo los informes de los softwares con este nombre.
+    - todos: "1" para incluir también los informes sin regresiones.
+
+    Valor de retorno:
+    Una lista JSON de informes, del más reciente al más antiguo. Cada uno tiene el software ("id_soft", "nombre" y
+    "version"), la versión comparada ("anterior": "id_soft" y "version"), la fecha, la comparación de cada métrica
+    ("metricas") y de cada tarea ("tareas", por métrica), con los valores "anterior" y "actual", la diferencia
+    ("delta") y el valor p ("p"), y las regresiones ("regresiones": la métrica, y la tarea o null).
+
+    Notas:
+    - Los informes se calculan al guardar los resultados (ver detectar_regresiones), por lo que aquí solo se leen.
+    """
+
+    nombre = request.args.get("nombre")
+    todos = request.args.get("todos") == "1"
+
+    informes = [
+        informe for informe in regresiones.all()
+        if (todos or informe["regresiones"]) and nombre in (None, informe["nombre"])
+    ]
+
+    return jsonify(sorted(informes, key=lambda informe: informe["fecha"], reverse=True)), 200
+
+@rutas.route('/lote', methods=['POST'])
+def lote():
+    """
+    Ejecuta varias operaciones de la API en una sola solicitud y en una sola transacción.
+
+    Entrada (request JSON):
+    {
+        "operaciones": [
+            {"ruta": "nuevo_soft", "datos": {"nombre": "soft1", "version": "2.0.2"}},
+            {"ruta": "guardar_tareas", "datos": {"id_soft": 1, "tareas": [[5, 4], [5, 3]]}},
+            {"ruta": "obtener_soft", "datos": {"id_soft": 1}}
+        ],
+        "continuar": false
+    }
+
+    Cada operación indica una ruta de OPERACIONES_LOTE y el JSON que recibiría esa ruta. Las operaciones se
+    ejecutan en orden y su resultado es la respuesta de la ruta ("codigo" y "respuesta").
+
+    Valor de retorno:
+    Un JSON con los resultados de las operaciones ("resultados") y si sus cambios se guardaron ("confirmado").
+
+    Notas:
+    - Por defecto el lote es atómico: si una operación falla (código 400 o mayor), no se ejecutan las siguientes, se
+    descartan los cambios de las anteriores y se devuelve el código de la operación fallida.
+    - Con "continuar": true se ejecutan todas las operaciones y se guardan los cambios de las que no fallaron.
+    - Los cambios de todas las operaciones se escriben en la base de datos una sola vez.
+    - Los comentarios de las operaciones guardar_comentarios se analizan antes de iniciar la transacción (ver
+    analizar_comentarios_lote), para no bloquear la base de datos durante el análisis. Si el pool de análisis está
+    lleno se devuelve el código 503, y si el análisis supera el tiempo máximo, el código 504.
+    """
+
+    if not request.is_json or not isinstance(request.json.get("operaciones"), list):
+        response = {"error": "Campo 'operaciones' faltante o no es una lista"}
+        return jsonify(response), 400
+
+    operaciones = request.json["operaciones"]
+    continuar = bool(request.json.get("continuar", False))
+    resultados_lote = []
+
+    # Validar las rutas antes de ejecutar alguna operación
+    for operacion in operaciones:
+        if not isinstance(operacion, dict) or operacion.get("ruta") not in OPERACIONES_LOTE:
+            response = {"error": f"Operación no válida: {operacion}"}
+            return jsonify(response), 400
+
+    # Analizar los comentarios nuevos sin tomar el candado de la base de datos
+    if any(operacion["ruta"] == "guardar_comentarios" for operacion in operaciones):
+        try:
+
+            with current_app.extensions["pool_analisis"].admitir():
+                analizar_comentarios_lote(operaciones)
+
+        except PoolSaturado as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(current_app.config["ESPERA_REINTENTO"])}
+        except TimeoutError as e:
+            return jsonify({"error": str(e)}), 504
+
+    try:
+
+        with transaccion():
+            for operacion in operaciones:
+                codigo, respuesta = ejecutar_operacion(operacion["ruta"], operacion.get("datos", {}))
+                resultados_lote.append({"ruta": operacion["ruta"], "codigo": codigo, "respuesta": respuesta})
+
+                # Descartar todo el lote si una operación falla
+                if codigo >= 400 and not continuar:
+                    raise LoteFallido(codigo)
+
+    except LoteFallido as e:
+        contar("lote.descartados")
+        return jsonify({"confirmado": False, "resultados": resultados_lote}), e.codigo
+
+    contar("lote.operaciones", len(operaciones))
+
+    return jsonify({"confirmado": True, "resultados": resultados_lote}), 200
+
+def analizar_comentarios_lote(operaciones):
+    """
+    Analiza los comentarios de las operaciones guardar_comentarios de un lote (o de una sola solicitud que guarda
+    comentarios), antes de su transacción.
+
+    Args:
+        operaciones (list): Las operaciones del lote.
+
+    Notas:
+    - Las polaridades se guardan en g.polaridades_lote ({motor: {comentario: polaridad}}), de donde las toma
+    calcular_sat_comentarios, por lo que dentro de la transacción no se analiza ningún comentario.
+    - No se analizan los comentarios ya guardados para el software con el mismo motor. Los datos no válidos (p. ej.
+    comentarios que no son texto) se omiten: la operación los rechaza al ejecutarse.
+    """
+
+    pendientes = {}
+
+    for operacion in operaciones:
+        datos = operacion.get("datos")
+
+        if operacion["ruta"] != "guardar_comentarios" or not isinstance(datos, dict):
+            continue
+
+        comentarios = datos.get("comentarios")
+        motor = datos.get("motor") or current_app.config["MOTOR_SENTIMIENTO"]
+
+        if not isinstance(comentarios, (list, FilasSubida)) or motor not in MOTORES_SENTIMIENTO:
+            continue
+
+        try:
+            previas = obtener_polaridades_previas(int(datos.get("id_soft")), motor)
+        except (TypeError, ValueError):
+            previas = {}
+
+        for fila in comentarios[1:]:
+            for comentario in fila if isinstance(fila, list) else []:
+                if isinstance(comentario, str) and comentario not in previas:
+                    pendientes.setdefault(motor, {})[comentario] = None
+
+    anotar(comentarios_lote=sum(len(textos) for textos in pendientes.values()))
+    g.polaridades_lote = {motor: analizar_comentarios(list(textos), motor) for motor, textos in pendientes.items()}
+
+class LoteFallido(Exception):
+    """
+    Error lanzado para descartar los cambios de un lote cuando una de sus operaciones falla.
+    """
+
+    def __init__(self, codigo):
+        super().__init__(codigo)
+        self.codigo = codigo
+
+def ejecutar_operacion(ruta, datos):
+    """
+    Ejecuta una ruta de la API como si se hubiera recibido una solicitud con el JSON indicado.
+
+    Args:
+        ruta (str): El nombre de la ruta (p. ej. "guardar_tareas").
+        datos (dict): El JSON de la solicitud.
+
+    Returns:
+        tuple: El código de la respuesta y su JSON.
+    """
+
+    # Obtener la función y el método HTTP de la ruta
+    regla = next(r for r in current_app.url_map.iter_rules() if r.rule == "/" + ruta)
+    metodo = next(m for m in sorted(regla.methods) if m not in ("HEAD", "OPTIONS"))
+
+    with current_app.test_request_context("/" + ruta, method=metodo, json=datos):
+        response = current_app.make_response(current_app.view_functions[regla.endpoint]())
+
+    return response.status_code, response.get_json(silent=True)
+
+
+
+
+
+
+# Rutas de la API para almacenar datos de evaluación en la base de datos
+@rutas.route('/guardar_tareas', methods=["POST"])
+def guardar_tareas():
+    """
+    Guarda en la base de datos las tareas realizadas por un usuario sobre un software específico.
+
+    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+
+        - id_soft: El ID del software.
+        - tareas: Una lista de con las tareas realizadas por el usuario.
+        El primer elemento de la lista contiene las referencias,
+        el segundo elemento contiene la cantidad de tareas del usuario 1,
+        el tercero contiene la cantidad de tareas del usuario 2 y así sucesivamente.
+
+        Ejemplo:
+        {
+            "id_soft": 1,
+
+            "tareas":[
+                [5, 4, 3],
+                [5, 3, 2],
+                [2, 4, 3],
+                [2, 1, 3],
+                [3, 2, 3],
+                [4, 4, 2]
+            ]
+        }
+
+    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+
+    En caso contrario, se actualiza la lista de tareas asignadas al software
+    y se devuelve un mensaje de éxito con el código de respuesta 200.
+
+    Returns:
+        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
+    """
+    try:
+
+        # Validar que se haya enviado un cuerpo JSON en la solicitud
+        if not request.is_json:
+            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+
+        # Obtener los datos del JSON enviado en la solicitud
+        r = request.json
+
+        # Validar que se hayan proporcionado los campos necesarios
+        if "id_soft" not in r or "tareas" not in r:
+            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+
+        # Obtener el id_soft del JSON y pasarlo a entero
+        id_soft = int(r["id_soft"])
+
+        # Verificar si el id_soft existe en la base de datos
+        if not softwares.contains(doc_id=id_soft):
+            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+        # Obtener las tareas del JSON
+        tareas = r["tareas"]
+
+        # Validar las dimensiones de la matriz antes de procesarla
+        error = validar_dimensiones(tareas)
+        if error:
+            return jsonify({"error": error}), 413
+
+        # Si la matriz no cambió, sus resultados ya están guardados
+        huella = calcular_huella(tareas)
+        if matriz_sin_cambios(id_soft, "tareas", huella):
+            return jsonify({"mensaje": "Tareas asignadas exitosamente", "sin_cambios": True}), 200
+
+        # Calcular eficacia y guardar la matriz en una sola transacción, que escribe el archivo una vez
+        try:
+
+            with transaccion():
+                calcular_eficacia(id_soft, tareas)
+                guardar_matriz(id_soft, "tareas", codificar_matriz(tareas), huella)
+
+        except ValueError as e:
+            return jsonify({"error: ": str(e)}), 400
+        except ZeroDivisionError as e:
+            return jsonify({"error de división por cero: ": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error inesperado: ": str(e)}), 500
+
+        return jsonify({"mensaje": "Tareas asignadas exitosamente"}), 200
+
+    except Exception as e:
+        return jsonify({"error: ": str(e)}), 500
+
+@rutas.route('/guardar_tiempos', methods=["POST"])
+def guardar_tiempos():
+    """
+    Guarda en la base de datos los tiempos tomados por un usuario al hacer tareas específico.
+
+    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+
+        - id_soft: El ID del software.
+        - tiempos: Una lista de con las tareas realizadas por el usuario.
+        El primer elemento de la lista contiene las referencias,
+        el segundo elemento contiene la cantidad de tareas del usuario 1,
+        el tercero contiene la cantidad de tareas del usuario 2 y así sucesivamente.
+
+        Ejemplo:
+        {
+            "id_soft": 1,
+
+            "tiempos":[
+                [7, 9, 5],
+                [4, 8, 4],
+                [4, 10, 5],
+                [8, 4, 7],
+                [10, 12, 4],
+                [7, 5, 2]
+            ]
+        }
+
+    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+
+    En caso contrario, se actualiza la lista de tareas asignadas al software
+    y se devuelve un mensaje de éxito con el código de respuesta 200.
+
+    Returns:
+        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
+    """
+    try:
+
+        # Validar que se haya enviado un cuerpo JSON en la solicitud
+        if not request.is_json:
+            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+
+        # Obtener los datos del JSON enviado en la solicitud
+        r = request.json
+
+        # Validar que se hayan proporcionado los campos necesarios
+        if "id_soft" not in r or "tiempos" not in r:
+            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+
+        # Obtener el id_soft del JSON y pasarlo a entero
+        id_soft = int(r["id_soft"])
+
+        # Verificar si el id_soft existe en la base de datos
+        if not softwares.contains(doc_id=id_soft):
+            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+        # Obtener los tiempos del JSON
+        tiempos = r["tiempos"]
+
+        # Validar las dimensiones de la matriz antes de procesarla
+        error = validar_dimensiones(tiempos)
+        if error:
+            return jsonify({"error": error}), 413
+
+        # Si la matriz no cambió, sus resultados ya están guardados
+        huella = calcular_huella(tiempos)
+        if matriz_sin_cambios(id_soft, "tiempos", huella):
+            return jsonify({"mensaje": "Tiempos asignadas exitosamente", "sin_cambios": True}), 200
+
+        # Calcular eficiencia y guardar la matriz en una sola transacción, que escribe el archivo una vez
+        try:
+
+            with transaccion():
+                calcular_eficiencia(id_soft, tiempos)
+                guardar_matriz(id_soft, "tiempos", codificar_matriz(tiempos), huella)
+
+        except ValueError as e:
+            return jsonify({"error: ": str(e)}), 400
+        except ZeroDivisionError as e:
+            return jsonify({"error de división por cero: ": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error inesperado: ": str(e)}), 500
+
+        return jsonify({"mensaje": "Tiempos asignadas exitosamente"}), 200
+
+    except Exception as e:
+        return jsonify({"error: ": str(e)}), 500
+
+@rutas.route('/guardar_puntajes', methods=["POST"])
+def guardar_puntajes():
+    """
+    Guarda en la base de datos los puntajes tomados por un usuario al responder preguntas cerradas.
+
+    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+
+        - id_soft: El ID del software.
+        - puntajes: Una lista de con los puntajes como respuestas de un usuario a un cuestionario.
+        El primer elemento de la lista contiene los pesos de las preguntas,
+        el segundo elemento contiene los puntajes de las respuestas del usuario 1,
+        el tercero contiene del usuario 2 y así sucesivamente.
+
+        Ejemplo:
+        {
+            "id_soft": 1,
+
+            "puntajes":[
+                [20, 30, 10, 25, 10, 5],
+                [4, 5, 4, 4, 3, 4],
+                [4, 5, 5, 3, 2, 5],
+                [3, 4, 4, 3, 2, 1],
+                [5, 4, 2, 4, 3, 2],
+                [3, 4, 3, 3, 5, 3]
+            ]
+        }
+
+    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+
+    En caso contrario, se actualiza la lista de puntajes asignada al software
+    y se devuelve un mensaje de éxito con el código de respuesta 200.
+
+    Returns:
+        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
+    """
+    try:
+
+        # Validar que se haya enviado un cuerpo JSON en la solicitud
+        if not request.is_json:
+            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+
+        # Obtener los datos del JSON enviado en la solicitud
+        r = request.json
+
+        # Validar que se hayan proporcionado los campos necesarios
+        if "id_soft" not in r or "puntajes" not in r:
+            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+
+        # Obtener el id_soft del JSON y pasarlo a entero
+        id_soft = int(r["id_soft"])
+
+        # Verificar si el id_soft existe en la base de datos
+        if not softwares.contains(doc_id=id_soft):
+            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+        # Obtener los puntajes del JSON
+        puntajes = r["puntajes"]
+
+        # Validar las dimensiones de la matriz antes de procesarla
+        error = validar_dimensiones(puntajes)
+        if error:
+            return jsonify({"error": error}), 413
+
+        # Si la matriz no cambió, sus resultados ya están guardados
+        huella = calcular_huella(puntajes)
+        if matriz_sin_cambios(id_soft, "puntajes", huella):
+            return jsonify({"mensaje": "Puntajes asignados exitosamente", "sin_cambios": True}), 200
+
+        # Calcular satisfaccion en preguntas cerradas y guardar la matriz en una sola transacción, que escribe el
+        # archivo una vez
+        try:
+
+            with transaccion():
+                calcular_sat_puntajes(id_soft, puntajes)
+                guardar_matriz(id_soft, "puntajes", codificar_matriz(puntajes), huella)
+
+        except ValueError as e:
+            return jsonify({"error: ": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error inesperado: ": str(e)}), 500
+
+        return jsonify({"mensaje": "Puntajes asignados exitosamente"}), 200
+
+    except Exception as e:
+        return jsonify({"error: ": str(e)}), 500
+
+@rutas.route('/guardar_comentarios', methods=["POST"])
+def guardar_comentarios():
+    """
+    Guarda en la base de datos los comentarios tomados por un usuario al responder preguntas abiertas.
+
+    Esta función maneja una solicitud POST y espera recibir un cuerpo JSON con los siguientes campos:
+
+        - id_soft: El ID del software.
+        - puntajes: Una lista de con los puntajes como respuestas de un usuario a un cuestionario
+        El primer elemento de la lista contiene los pesos de las preguntas,
+        el segundo elemento contiene los comentarios del usuario 1,
+        el tercero contiene del usuario 2 y así sucesivamente.
+
+        Ejemplo:
+        {
+            "id_soft": 1,
+            "comentarios": [
+                [30, 70],
+                ["Me encanta la interfaz intuitiva y fácil de usar", "No me gusta la falta de opciones de personalización"],
+                ["Las características son increíbles, cumplen con todas mis necesidades", "A veces experimento problemas de rendimiento"],
+                ["El soporte al cliente es excepcional, siempre resuelven mis dudas", "La falta de actualizaciones frecuentes es decepcionante"],
+                ["La integración con otras herramientas es perfecta", "A veces encuentro errores que interrumpen mi flujo de trabajo"],
+                ["La velocidad y eficiencia del software son impresionantes", "Algunas funciones no son tan intuitivas como me gustaría"]
+            ],
+            "motor": "lexico_es"
+        }
+
+        El campo "motor" es opcional e indica el motor de análisis de sentimientos ("vader" traduce los comentarios
+        al inglés; "lexico_es" los analiza directamente en español). Por defecto se usa el de la configuración
+        (MOTOR_SENTIMIENTO).
+
+    Si el ID del software no existe en la base de datos, se devuelve un mensaje de error con el código de respuesta 404.
+
+    Si el pool de análisis está lleno, se devuelve el código 503 con la cabecera Retry-After; si el análisis de algún
+    comentario supera TIEMPO_MAXIMO_COMENTARIO segundos, el código 504.
+
+    En caso contrario, se actualiza la lista de puntajes asignada al software
+    y se devuelve un mensaje de éxito con el código de respuesta 200.
+
+    Returns:
+        JSON: Un JSON con un mensaje de éxito o un mensaje de error en caso de fallo.
+    """
+    try:
+
+        # Validar que se haya enviado un cuerpo JSON en la solicitud
+        if not request.is_json:
+            return jsonify({"error": "El cuerpo de la solicitud debe ser un JSON"}), 400
+
+        # Obtener los datos del JSON enviado en la solicitud
+        r = request.json
+
+        # Validar que se hayan proporcionado los campos necesarios
+        if "id_soft" not in r or "comentarios" not in r:
+            return jsonify({"error": "Faltan campos obligatorios en el JSON"}), 400
+
+        # Obtener el id_soft del JSON y pasarlo a entero
+        id_soft = int(r["id_soft"])
+
+        # Verificar si el id_soft existe en la base de datos
+        if not softwares.contains(doc_id=id_soft):
+            return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+        # Obtener los comentarios del JSON
+        comentarios = r["comentarios"]
+
+        # Validar las dimensiones de la matriz antes de procesarla
+        error = validar_dimensiones(comentarios)
+        if error:
+            return jsonify({"error": error}), 413
+
+        # Si los comentarios no cambiaron (ni el motor con que se analizan), sus resultados ya están guardados
+        huella = calcular_huella(comentarios, r.get("motor") or current_app.config["MOTOR_SENTIMIENTO"])
+        if matriz_sin_cambios(id_soft, "comentarios", huella):
+            conteo = {"analizados": 0, "reutilizados": sum(len(fila) for fila in comentarios[1:])}
+            return jsonify({"mensaje": "Comentarios asignados exitosamente", "sin_cambios": True, **conteo}), 200
+
+        # Esperar a que terminen de cargarse los modelos antes de analizar comentarios
+        if registro_modelos.precarga == "en_curso":
+            response = {"error": "Los modelos de análisis de comentarios se están cargando"}
+            return jsonify(response), 503, {"Retry-After": "5"}
+
+        # Analizar los comentarios nuevos sin tomar el candado de la base de datos, si hay lugar en el pool de análisis
+        # (en un lote, ya se analizaron antes de su transacción), y luego calcular la satisfaccion en preguntas
+        # abiertas y guardar la matriz en una sola transacción, que escribe el archivo una vez
+        try:
+
+            if "polaridades_lote" not in g:
+                with current_app.extensions["pool_analisis"].admitir():
+                    analizar_comentarios_lote([{"ruta": "guardar_comentarios", "datos": r}])
+
+            with transaccion():
+                conteo = calcular_sat_comentarios(id_soft, comentarios, r.get("motor"))
+                guardar_matriz(id_soft, "comentarios", comentarios, huella)
+
+        except PoolSaturado as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(current_app.config["ESPERA_REINTENTO"])}
+        except TimeoutError as e:
+            return jsonify({"error": str(e)}), 504
+        except ValueError as e:
+            return jsonify({"error: ": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error inesperado: ": str(e)}), 500
+
+        return jsonify({"mensaje": "Comentarios asignados exitosamente", **conteo}), 200
+
+    except Exception as e:
+        return jsonify({"error: ": str(e)}), 500
+
+
+
+
+
+
+# Rutas de la API para subir por partes las matrices de evaluación muy grandes
+@rutas.route('/subidas', methods=['POST'])
+def abrir_subida():
+    """
+    Abre una subida por partes de una matriz de evaluación.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1,
+        "campo": "tiempos"
+    }
+
+    Valor de retorno:
+    {"id_subida": "..."} con el código 201.
+
+    Notas:
+    - Las partes se envían con PUT /subidas/<id_subida>/<número de parte>, numeradas desde 0, cada una con una lista
+    de filas. La primera fila de la parte 0 son las referencias o pesos, igual que en las rutas guardar_*.
+    - GET /subidas/<id_subida> indica las partes recibidas, y POST /subidas/<id_subida>/confirmar calcula y guarda
+    la matriz completa.
+    - Se eliminan las subidas sin confirmar con más de VIGENCIA_SUBIDAS horas.
+    """
+
+    r = request.json
+
+    # Validar que se hayan proporcionado los campos necesarios
+    if "id_soft" not in r or r.get("campo") not in CAMPOS_EVALUACION:
+        response = {"error": f"Campos 'id_soft' y 'campo' ({', '.join(CAMPOS_EVALUACION)}) faltantes en el JSON"}
+        return jsonify(response), 400
+
+    id_soft = int(r["id_soft"])
+
+    # Verificar si el id_soft existe en la base de datos
+    if not softwares.contains(doc_id=id_soft):
+        return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+    eliminar_subidas_vencidas()
+
+    # Crear el directorio de la subida con sus datos
+    id_subida = uuid.uuid4().hex
+    directorio = directorio_subida(id_subida)
+    os.makedirs(directorio)
+
+    subida = {
+        "id_soft": id_soft,
+        "campo": r["campo"],
+        "fecha": datetime.now().timestamp(),
+        "inquilino": inquilino_actual(),
+    }
+
+    with open(os.path.join(directorio, "subida.json"), "w", encoding="utf-8") as archivo:
+        json.dump(subida, archivo)
+
+    return jsonify({"id_subida": id_subida}), 201
+
+@rutas.route('/subidas/<id_subida>/<int:parte>', methods=['PUT'])
+def guardar_parte(id_subida, parte):
+    """
+    Guarda una parte de una subida. Enviar de nuevo una parte la reemplaza.
+
+    Entrada (request JSON): La lista de filas de la parte, p. ej. [[7, 9, 5], [4, 8, 4]].
+
+    Valor de retorno:
+    {"parte": <número>, "filas": <filas de la parte>}, o un error 400 si las filas no son válidas (valores que no son
+    números enteros, o cadenas de texto en los comentarios, o filas de distinta longitud, dentro de la parte o
+    respecto a las partes ya recibidas).
+    """
+
+    datos = leer_subida(id_subida)
+
+    if datos is None:
+        return jsonify({"error": f"No se encontró la subida {id_subida}"}), 404
+
+    filas = request.get_json(silent=True)
+
+    # Validar las filas antes de guardarlas
+    error = validar_parte(filas, datos["campo"], parte)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Comparar la cantidad de columnas con la de la parte 0 (o, si todavía no se recibió, con la de otra parte)
+    recibidas = [numero for numero in partes_subida(id_subida) if numero != parte]
+    columnas = columnas_parte(id_subida, recibidas[0]) if recibidas else None
+
+    if columnas is not None and len(filas[0]) != columnas:
+        response = {"error": f"Las filas de la parte deben tener {columnas} valores, igual que las partes recibidas."}
+        return jsonify(response), 400
+
+    # Escribir la parte (una fila JSON por línea) en un archivo temporal y renombrarlo, para no dejar partes
+    # incompletas
+    ruta = os.path.join(directorio_subida(id_subida), f"parte_{parte:08d}.jsonl")
+
+    with open(ruta + ".tmp", "w", encoding="utf-8") as archivo:
+        for fila in filas:
+            archivo.write(json.dumps(fila, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    os.replace(ruta + ".tmp", ruta)
+
+    return jsonify({"parte": parte, "filas": len(filas)}), 200
+
+@rutas.route('/subidas/<id_subida>', methods=['GET'])
+def estado_subida(id_subida):
+    """
+    Obtiene las partes recibidas de una subida.
+
+    Valor de retorno:
+    {"id_soft": ..., "campo": ..., "partes": [[0, 4], [6, 9]], "cantidad": 9}, donde "partes" son los rangos (con
+    ambos extremos incluidos) de partes recibidas y "cantidad" la cantidad de partes recibidas.
+    """
+
+    datos = leer_subida(id_subida)
+
+    if datos is None:
+        return jsonify({"error": f"No se encontró la subida {id_subida}"}), 404
+
+    partes = partes_subida(id_subida)
+    rangos = []
+
+    # Agrupar los números de parte consecutivos
+    for parte in partes:
+        if rangos and rangos[-1][1] == parte - 1:
+            rangos[-1][1] = parte
+        else:
+            rangos.append([parte, parte])
+
+    return jsonify({"id_soft": datos["id_soft"], "campo": datos["campo"], "partes": rangos, "cantidad": len(partes)})
+
+@rutas.route('/subidas/<id_subida>', methods=['DELETE'])
+def cancelar_subida(id_subida):
+    """
+    Cancela una subida y elimina sus partes.
+    """
+
+    if leer_subida(id_subida) is None:
+        return jsonify({"error": f"No se encontró la subida {id_subida}"}), 404
+
+    shutil.rmtree(directorio_subida(id_subida), ignore_errors=True)
+
+    return jsonify({"message": "Subida cancelada"}), 200
+
+@rutas.route('/subidas/<id_subida>/confirmar', methods=['POST'])
+def confirmar_subida(id_subida):
+    """
+    Calcula y guarda la matriz de una subida, recorriendo sus partes en orden, y elimina la subida.
+
+    Entrada (request JSON):
+    {
+        "partes": 12,
+        "motor": "lexico_es"
+    }
+
+    "partes" es la cantidad total de partes enviadas (numeradas de 0 a partes - 1); "motor" solo se usa para los
+    comentarios (ver /guardar_comentarios).
+
+    Valor de retorno:
+    La misma respuesta que la ruta guardar_* del campo de la subida. Si las partes recibidas no son exactamente las
+    partes 0 a partes - 1 se devuelve el código 400 con las partes faltantes y las sobrantes.
+
+    Notas:
+    - Los cálculos leen las filas de las partes una por una, sin cargar la matriz completa en memoria, y las
+    matrices numéricas se codifican en forma compacta de la misma manera (ver codificar_matriz). Los comentarios, y
+    las matrices que no se compactan, se cargan completos al guardarlos, porque la base de datos se escribe como un
+    único archivo JSON.
+    """
+
+    datos = leer_subida(id_subida)
+
+    if datos is None:
+        return jsonify({"error": f"No se encontró la subida {id_subida}"}), 404
+
+    r = request.get_json(silent=True) or {}
+
+    try:
+        total = int(r["partes"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Campo 'partes' faltante o no es un entero"}), 400
+
+    # Verificar que las partes recibidas sean exactamente las partes 0 a partes - 1
+    recibidas = set(partes_subida(id_subida))
+    faltantes = sorted(set(range(total)) - recibidas)
+    sobrantes = sorted(recibidas - set(range(total)))
+
+    if faltantes or sobrantes:
+        response = {"error": "Las partes recibidas no coinciden con 'partes'", "faltantes": faltantes[:100],
+                    "sobrantes": sobrantes[:100]}
+        return jsonify(response), 400
+
+    id_soft = datos["id_soft"]
+    campo = datos["campo"]
+
+    if not softwares.contains(doc_id=id_soft):
+        return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+    # Verificar que todas las partes tengan la misma cantidad de columnas (cada parte se validó por separado)
+    if len({columnas_parte(id_subida, parte) for parte in range(total)}) > 1:
+        return jsonify({"error": "Todas las partes deben tener la misma cantidad de valores por fila."}), 400
+
+    filas = FilasSubida(directorio_subida(id_subida), total)
+
+    max_filas = current_app.config["MAX_FILAS_SUBIDA"]
+
+    if len(filas) > max_filas:
+        return jsonify({"error": f"La matriz no puede tener más de {max_filas} filas."}), 413
+
+    # Si la matriz no cambió, sus resultados ya están guardados
+    motor = r.get("motor") or current_app.config["MOTOR_SENTIMIENTO"]
+    huella = filas.huella(motor) if campo == "comentarios" else filas.huella()
+    response = {"mensaje": f"Subida de {campo} confirmada exitosamente", "filas": len(filas)}
+
+    if matriz_sin_cambios(id_soft, campo, huella):
+        shutil.rmtree(directorio_subida(id_subida), ignore_errors=True)
+        return jsonify({**response, "sin_cambios": True}), 200
+
+    # Calcular las métricas y guardar la matriz en una sola transacción, que escribe el archivo una vez (los
+    # comentarios nuevos se analizan antes, sin tomar el candado de la base de datos)
+    try:
+
+        if campo == "comentarios":
+            with current_app.extensions["pool_analisis"].admitir():
+                datos = {"id_soft": id_soft, "comentarios": filas, "motor": r.get("motor")}
+                analizar_comentarios_lote([{"ruta": "guardar_comentarios", "datos": datos}])
+
+        with transaccion():
+            if campo == "tareas":
+                calcular_eficacia(id_soft, filas)
+            elif campo == "tiempos":
+                calcular_eficiencia(id_soft, filas)
+            elif campo == "puntajes":
+                calcular_sat_puntajes(id_soft, filas)
+            else:
+                response.update(calcular_sat_comentarios(id_soft, filas, r.get("motor")))
+
+            # Cargar la matriz solo si no se compacta
+            valor = filas if campo == "comentarios" else codificar_matriz(filas)
+            guardar_matriz(id_soft, campo, valor if isinstance(valor, dict) else list(valor), huella)
+
+    except PoolSaturado as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(current_app.config["ESPERA_REINTENTO"])}
+    except TimeoutError as e:
+        return jsonify({"error": str(e)}), 504
+    except ValueError as e:
+        return jsonify({"error: ": str(e)}), 400
+    except ZeroDivisionError as e:
+        return jsonify({"error de división por cero: ": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error inesperado: ": str(e)}), 500
+
+    shutil.rmtree(directorio_subida(id_subida), ignore_errors=True)
+
+    return jsonify(response), 200
+
+def directorio_subida(id_subida=None):
+    """
+    Obtiene el directorio de las subidas por partes, o el de una subida.
+
+    Args:
+        id_subida (str): El ID de la subida, o None para obtener el directorio de todas.
+
+    Returns:
+        str: La ruta del directorio.
+    """
+
+    base = current_app.config["DIRECTORIO_SUBIDAS"] or os.path.join(tempfile.gettempdir(), "evaluador_subidas")
+
+    return base if id_subida is None else os.path.join(base, id_subida)
+
+def leer_subida(id_subida):
+    """
+    Obtiene los datos de una subida (id_soft, campo, fecha de creación e inquilino).
+
+    Args:
+        id_subida (str): El ID de la subida.
+
+    Returns:
+        dict: Los datos, o None si la subida no existe (o el ID no es válido).
+    """
+
+    # Los ID son hexadecimales, lo que impide usar otras rutas del sistema de archivos
+    if not re.fullmatch(r"[0-9a-f]{32}", id_subida):
+        return None
+
+    try:
+        with open(os.path.join(directorio_subida(id_subida), "subida.json"), encoding="utf-8") as archivo:
+            subida = json.load(archivo)
+    except FileNotFoundError:
+        return None
+
+    # Las subidas de otro inquilino no existen para la solicitud actual
+    return subida if subida.get("inquilino") == inquilino_actual() else None
+
+def partes_subida(id_subida):
+    """
+    Obtiene los números de las partes recibidas de una subida, en orden.
+    """
+
+    return sorted(
+        int(nombre[6:-6]) for nombre in os.listdir(directorio_subida(id_subida))
+        if nombre.startswith("parte_") and nombre.endswith(".jsonl")
+    )
+
+def columnas_parte(id_subida, parte):
+    """
+    Obtiene la cantidad de columnas de una parte recibida, leyendo solo su primera fila.
+
+    Returns:
+        int: La cantidad de valores de las filas de la parte, o None si la parte no existe.
+    """
+
+    try:
+        with open(os.path.join(directorio_subida(id_subida), f"parte_{parte:08d}.jsonl"), encoding="utf-8") as archivo:
+            return len(json.loads(archivo.readline()))
+    except FileNotFoundError:
+        return None
+
+def validar_parte(filas, campo, parte):
+    """
+    Valida las filas de una parte de una subida.
+
+    Args:
+        filas (list): Las filas recibidas.
+        campo (str): El campo de la matriz ("tareas", "tiempos", "puntajes" o "comentarios").
+        parte (int): El número de la parte (la primera fila de la parte 0 son las referencias o pesos).
+
+    Returns:
+        str: Un mensaje de error si las filas no son válidas, o None si lo son.
+
+    Notas:
+    - Los valores se validan en detalle (rangos, referencias, etc.) al confirmar la subida.
+    """
+
+    if not isinstance(filas, list) or not filas or not all(isinstance(fila, list) for fila in filas):
+        return "La parte debe ser una lista de filas (listas de valores)."
+
+    columnas = len(filas[0])
+
+    if columnas > current_app.config["MAX_COLUMNAS"]:
+        return f"La matriz no puede tener más de {current_app.config['MAX_COLUMNAS']} columnas."
+
+    if any(len(fila) != columnas for fila in filas):
+        return "Todas las filas de la parte deben tener la misma cantidad de valores."
+
+    # Las referencias o pesos son enteros en todas las matrices
+    if parte == 0:
+        if any(type(e) is not int for e in filas[0]):
+            return "Los valores de la lista de referencias o pesos deben ser números enteros."
+
+        filas = filas[1:]
+
+    tipo = str if campo == "comentarios" else int
+
+    if any(type(e) is not tipo for fila in filas for e in fila):
+        return f"Los valores de {campo} deben ser {'cadenas de texto' if tipo is str else 'números enteros'}."
+
+    return None
+
+def eliminar_subidas_vencidas():
+    """
+    Elimina las subidas sin confirmar creadas hace más de VIGENCIA_SUBIDAS horas.
+    """
+
+    base = directorio_subida()
+    limite = time.time() - current_app.config["VIGENCIA_SUBIDAS"] * 3600
+
+    if not os.path.isdir(base):
+        return
+
+    for id_subida in os.listdir(base):
+        directorio = os.path.join(base, id_subida)
+
+        if os.path.getmtime(directorio) < limite:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+class FilasSubida:
+    """
+    Filas de una subida por partes, leídas de sus archivos a medida que se recorren.
+
+    Se comporta como la lista de filas que reciben las funciones calcular_*: tiene longitud, su primera fila se
+    obtiene con [0] y las demás con [1:], y puede recorrerse varias veces.
+    """
+
+    def __init__(self, directorio, partes, desde=0):
+        self.directorio = directorio
+        self.partes = partes
+        self.desde = desde
+        self.filas = None
+
+    def lineas(self):
+        """
+        Recorre las líneas (filas en JSON) de las partes en orden, desde la fila "desde".
+        """
+
+        omitidas = 0
+
+        for parte in range(self.partes):
+            with open(os.path.join(self.directorio, f"parte_{parte:08d}.jsonl"), encoding="utf-8") as archivo:
+                for linea in archivo:
+
+                    # Omitir las filas anteriores a "desde" (p. ej. la fila de referencias)
+                    if omitidas < self.desde:
+                        omitidas = omitidas + 1
+                        continue
+
+                    yield linea
+
+    def __iter__(self):
+        return (json.loads(linea) for linea in self.lineas())
+
+    def __len__(self):
+        if self.filas is None:
+            self.filas = sum(1 for _ in self.lineas())
+
+        return self.filas
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice) and indice.stop is None and indice.step is None:
+            return FilasSubida(self.directorio, self.partes, self.desde + (indice.start or 0))
+
+        if indice == 0:
+            for fila in self:
+                return fila
+
+        raise IndexError("Las filas de una subida solo admiten [0] y [n:].")
+
+    def huella(self, *extras):
+        """
+        Calcula la huella de las filas igual que calcular_huella(filas, *extras), sin cargarlas todas a la vez.
+        """
+
+        sha = hashlib.sha256(b"[[")
+
+        # Las líneas tienen cada fila en el mismo formato que usa calcular_huella
+        for i, linea in enumerate(self.lineas()):
+            sha.update((("," if i else "") + linea.rstrip("\n")).encode("utf-8"))
+
+        sha.update(b"]")
+
+        for extra in extras:
+            sha.update(("," + json.dumps(extra, ensure_ascii=False, separators=(",", ":"))).encode("utf-8"))
+
+        sha.update(b"]")
+
+        return sha.hexdigest()
+
+
+
+
+
+
+# Funciones auxiliares para realizar los cálculos de eficacia, efiencia y satisfacción
+@trazar_calculo
+def calcular_eficacia(id_soft, tareas):
+    """
+    Calcula la eficacia de las tareas asignadas a un software y actualiza los resultados y sus estadísticas por tarea.
+
+    Args:
+        id_soft (int): El ID del software.
+        tareas (list): Una lista que contiene las tareas asignadas, donde cada tarea es una lista de valores.
+
+    Raises:
+        ValueError: Si el ID del software no existe en la base de datos.
+        ValueError: Si la lista de tareas está vacía o contiene elementos no válidos.
+        ValueError: Si algún elemento de las tareas es mayor que la referencia correspondiente.
+        ZeroDivisionError: Si algunos de los elementos de la lista de referencias es cero.
+
+    Returns:
+        None
+    """
+
+    # Validar la lista de tareas
+    if not isinstance(tareas, (list, FilasSubida, FilasArreglo)) or len(tareas) < 2:
+        raise ValueError("La lista de tareas debe contener al menos dos elementos.")
+
+    eficacia_usuarios = []
+    referencias = tareas[0]
+
+    # Valores de eficacia agrupados por tarea (columna) para las estadísticas
+    columnas = [[] for _ in referencias]
+
+    # Validar que la lista de referencias contenga solamente elementos numéricos
+    if not all(isinstance(e, int) for e in referencias):
+        raise ValueError("Los valores de la lista de referencias deben ser numéricos.")
+
+    # Validar si algún elemento de la lista de referencias es cero
+    if any(e == 0 for e in referencias):
+        raise ZeroDivisionError("No se puede dividir por cero. Algún elemento de la lista de referencias es cero.")
+
+    # Validar si algún elemento de la lista de referencias es negativo
+    if any(e < 0 for e in referencias):
+        raise ValueError("No se pueden proporcionar valores negativos en la lista de referencias.")
+
+    for tarea in tareas[1:]:
+
+        cont = 0
+        valores = []
+
+        for e in tarea:
+
+            # Validar si los valores son numéricos
+            if not isinstance(e, int):
+                raise ValueError("Los valores de las tareas deben ser numéricos.")
+
+            # Validar si algún elemento es negativo
+            if e < 0:
+                raise ValueError("No se pueden proporcionar valores negativos en los valores.")
+
+            # Validar si algún elemento es mayor que los de la lista de referencias
+            if e > referencias[cont]:
+                raise ValueError("Los valores de las tareas no pueden ser mayores que los de la lista de referencias.")
+
+            # Calcular la eficacia en cada tarea
+            operacion = e / referencias[cont]
+            valores.append(operacion)
+            columnas[cont].append(operacion * 100)
+            cont = cont + 1
+
+        prom_usuario = (sum(valores) / len(valores))
+        porcentaje_usuario = round(prom_usuario * 100)
+        eficacia_usuarios.append(porcentaje_usuario)
+
+    # Calcular la eficacia promedio
+    eficacia_porcentaje = round(sum(eficacia_usuarios) / len(eficacia_usuarios))
+
+    # Actualizar los resultados en la base de datos
+    resultados.update({"tareas": eficacia_usuarios}, Query().id_soft == id_soft)
+    invalidar_respuestas([id_soft], ["obtener_res_tareas"])
+    estadisticas.upsert(
+        {"id_soft": id_soft, "tareas": calcular_estadisticas(columnas)}, Query().id_soft == id_soft
+    )
+
+    # Actualizar la eficacia y las métricas que dependen de ella
+    actualizar_metricas(id_soft, {"eficacia": eficacia_porcentaje})
+
+@trazar_calculo
+def calcular_eficiencia(id_soft, tiempos):
+    """
+    Calcula la eficiencia en las tareas asignadas a un usuario y actualiza los resultados y sus estadísticas por tarea.
+
+    Args:
+        id_soft (int): El ID del software.
+        tiempos (list): Una lista que contiene los tiempos tomados, donde cada tiempo es una lista de valores.
+
+    Raises:
+        ValueError: Si el ID del software no existe en la base de datos.
+        ValueError: Si la lista de tiempos está vacía o contiene elementos no válidos.
+        ZeroDivisionError: Si alguno de los elementos de la lista de referencias es cero.
+
+    Returns:
+        None
+    """
+
+    # Validar la lista de tiempos
+    if not isinstance(tiempos, (list, FilasSubida, FilasArreglo)) or len(tiempos) < 2:
+        raise ValueError("La lista de tiempos debe contener al menos dos elementos.")
+
+    eficiencia_usuarios = []
+    referencias = tiempos[0]
+
+    # Valores de eficiencia agrupados por tarea (columna) para las estadísticas
+    columnas = [[] for _ in referencias]
+
+    # Validar que la lista de referencias contenga solamente elementos numéricos
+    if not all(isinstance(e, int) for e in referencias):
+        raise ValueError("Los valores de la lista de referencias deben ser numéricos.")
+
+    # Validar si algún elemento de la lista de referencias es negativo
+    if any(e < 0 for e in referencias):
+        raise ValueError("No se pueden proporcionar valores negativos en la lista de referencias.")
+
+    for tiempo in tiempos[1:]:
+
+        cont = 0
+        valores = []
+
+        for e in tiempo:
+
+            # Validar si los valores son numéricos
+            if not isinstance(e, int):
+                raise ValueError("Los valores de las tiempos deben ser numéricos.")
+
+            # Validar si algún elemento de los valores es cero
+            if e == 0:
+                raise ZeroDivisionError("No se puede dividir por cero. Algún valor de la lista de tiempos es cero.")
+
+            # Validar si algún elemento es negativo
+            if e < 0:
+                raise ValueError("No se pueden proporcionar valores negativos en los valores.")
+
+            # Calcular la eficiencia en cada tarea
+            operacion = referencias[cont] / e
+            valores.append(operacion)
+            columnas[cont].append(operacion * 100)
+            cont = cont + 1
+
+        prom_usuario = (sum(valores) / len(valores))
+        porcentaje_usuario = round(prom_usuario * 100)
+        eficiencia_usuarios.append(porcentaje_usuario)
+
+    # Calcular la eficiencia promedio
+    eficacia_porcentaje = round(sum(eficiencia_usuarios) / len(eficiencia_usuarios))
+
+    # Actualizar los resultados en la base de datos
+    resultados.update({"tiempos": eficiencia_usuarios}, Query().id_soft == id_soft)
+    invalidar_respuestas([id_soft], ["obtener_res_tiempos"])
+    estadisticas.upsert(
+        {"id_soft": id_soft, "tiempos": calcular_estadisticas(columnas)}, Query().id_soft == id_soft
+    )
+
+    # Actualizar la eficiencia y las métricas que dependen de ella
+    actualizar_metricas(id_soft, {"eficiencia": eficacia_porcentaje})
+
+@trazar_calculo
+def calcular_sat_puntajes(id_soft, puntajes):
+    """
+    Calcula la satisfacción con los puntajes de las preguntas cerradas y actualiza los resultados y sus estadísticas
+    por pregunta.
+
+    Args:
+        id_soft (int): El ID del software.
+        puntajes (list): Una lista que contiene los puntajes tomados, donde cada puntaje es una lista de valores.
+
+    Raises:
+        ValueError: Si el ID del software no existe en la base de datos.
+        ValueError: Si la lista de puntajes está vacía o contiene elementos no válidos.
+
+    Returns:
+        None
+    """
+
+    # Validar la lista de puntajes
+    if not isinstance(puntajes, (list, FilasSubida, FilasArreglo)) or len(puntajes) < 2:
+        raise ValueError("La lista de puntajes debe contener al menos dos elementos.")
+
+    puntajes_usuarios = []
+    pesos = puntajes[0]
+
+    # Satisfacción agrupada por pregunta (columna) para las estadísticas
+    columnas = [[] for _ in pesos]
+
+    # Validar que la lista de pesos contenga solamente elementos numéricos
+    if not all(isinstance(e, int) for e in pesos):
+        raise ValueError("Los valores de la lista de pesos deben ser numéricos.")
+
+    # Validar si algún elemento de la lista de pesos es negativo
+    if any(e < 0 for e in pesos):
+        raise ValueError("No se pueden proporcionar valores negativos en la lista de pesos.")
+
+    for puntaje in puntajes[1:]:
+
+        cont = 0
+        valores = []
+
+        for e in puntaje:
+
+            # Validar si los valores son numéricos
+            if not isinstance(e, int):
+                raise ValueError("Los valores de las puntajes deben ser numéricos.")
+
+            # Validar si algún elemento de los valores es cero
+            if e < 1 or e > 5:
+                raise ValueError("Los valores de las puntajes deben estar entre 1 y 5.")
+
+            # Validar si algún elemento es negativo
+            if e < 0:
+                raise ValueError("No se pueden proporcionar valores negativos en los valores.")
+
+            # Calcular la satisfacción en cada pregunta
+            operacion = e * pesos[cont] * 20
+            valores.append(operacion)
+            columnas[cont].append(e * 20)
+            cont = cont + 1
+
+        porcentaje_usuario = round(sum(valores) / sum(pesos))
+        puntajes_usuarios.append(porcentaje_usuario)
+
+    # Calcular la satisfacción promedio con los puntajes
+    puntajes_porcentaje = round(sum(puntajes_usuarios) / len(puntajes_usuarios))
+
+    # Actualizar los resultados en la base de datos
+    resultados.update({"puntajes": puntajes_usuarios}, Query().id_soft == id_soft)
+    invalidar_respuestas([id_soft], ["obtener_res_puntajes"])
+    estadisticas.upsert(
+        {"id_soft": id_soft, "puntajes": calcular_estadisticas(columnas)}, Query().id_soft == id_soft
+    )
+
+    # Actualizar la satisfacción con los puntajes y las métricas que dependen de ella
+    actualizar_metricas(id_soft, {"satisfaccion_pun": puntajes_porcentaje})
+
+@trazar_calculo
+def calcular_sat_comentarios(id_soft, comentarios, motor=None):
+    """
+        Calcula la satisfacción con los puntajes de las preguntas abiertas y actualiza los resultados y sus
+        estadísticas por pregunta.
+
+        Args:
+            id_soft (int): El ID del software.
+            comentarios (list): Una lista que contiene los comentarios tomados, donde cada comentario es una lista de valores.
+            motor (str): El motor de análisis de sentimientos ("vader" o "lexico_es"), o None para usar el de la
+            configuración (MOTOR_SENTIMIENTO).
+
+        Raises:
+            ValueError: Si el ID del software no existe en la base de datos.
+            ValueError: Si la lista de comentarios está vacía o contiene elementos no válidos.
+            ValueError: Si el motor de análisis de sentimientos no existe.
+
+        Returns:
+            dict: La cantidad de comentarios analizados ("analizados") y de comentarios cuya polaridad se reutilizó
+            ("reutilizados").
+
+        Notas:
+        - La polaridad de cada comentario se guarda en el campo "polaridades" de "resultados". Los comentarios que ya
+        estaban guardados para el software (o repetidos en la misma lista) no se vuelven a traducir ni a analizar,
+        siempre que se hayan analizado con el mismo motor.
+        """
+
+    # Validar la lista de puntajes
+    if not isinstance(comentarios, (list, FilasSubida)) or len(comentarios) < 2:
+        raise ValueError("La lista de comentarios debe contener al menos dos elementos.")
+
+    motor = motor or current_app.config["MOTOR_SENTIMIENTO"]
+
+    # Validar el motor de análisis de sentimientos
+    if motor not in MOTORES_SENTIMIENTO:
+        raise ValueError(f"El motor de sentimientos debe ser uno de: {', '.join(MOTORES_SENTIMIENTO)}.")
+
+    comentarios_usuarios = []
+    pesos = comentarios[0]
+
+    # Polaridad (sin ponderar) agrupada por pregunta (columna) para las estadísticas
+    columnas = [{"neg": [], "neu": [], "pos": [], "comp": []} for _ in pesos]
+
+    # Polaridades de los comentarios ya guardados, por texto, para no volver a analizarlos
+    polaridades_previas = obtener_polaridades_previas(id_soft, motor)
+    polaridades_usuarios = []
+    pendientes = {}
+    total = 0
+
+    # Validar los comentarios y reunir los que no se han analizado
+    for comentario in comentarios[1:]:
+        for e in comentario:
+
+            # Validar si los valores son cadena de texto
+            if not isinstance(e, str):
+                raise ValueError("Los valores de las comentarios deben ser cadenas de texto.")
+
+            if e not in polaridades_previas:
+                pendientes[e] = None
+
+            total = total + 1
+
+    anotar(comentarios=total, polaridades_reutilizadas=total - len(pendientes))
+
+    # Calcular el nivel de satisfacción de los comentarios pendientes en el pool de análisis (en un lote, ya se
+    # analizaron antes de su transacción: ver analizar_comentarios_lote)
+    analizadas = g.get("polaridades_lote", {}).get(motor, {})
+    polaridades_previas.update({c: analizadas[c] for c in pendientes if c in analizadas})
+    polaridades_previas.update(analizar_comentarios([c for c in pendientes if c not in analizadas], motor))
+
+    for comentario in comentarios[1:]:
+        cont = 0
+        polaridades_usuario = []
+        valores_neg = []
+        valores_neu = []
+        valores_pos = []
+        valores_comp = []
+
+        porcentaje_usuario = {}
+
+        for e in comentario:
+
+            polaridad = {}
+
+            # Obtener la polaridad del comentario (nueva o reutilizada)
+            puntaje = polaridades_previas[e]
+            polaridades_usuario.append(puntaje)
+
+            # Obtener polaridad del comentario
+            valor_neg = puntaje['neg']
+            valor_neu = puntaje['neu']
+            valor_pos = puntaje['pos']
+            valor_compuesto = puntaje['compound']
+
+            # Convertir la polaridad a porcentaje
+            porc_neg = valor_neg * 100
+            porc_neu = valor_neu * 100
+            porc_pos = valor_pos * 100
+            porc_comp = round(((valor_compuesto + 1) / 2) * 100)
+
+            columnas[cont]["neg"].append(porc_neg)
+            columnas[cont]["neu"].append(porc_neu)
+            columnas[cont]["pos"].append(porc_pos)
+            columnas[cont]["comp"].append(porc_comp)
+
+            # Guardar cada porcentaje en un diccionario luego de multiplicarlo por el peso
+            polaridad['neg'] = round((porc_neg * pesos[cont]))
+            polaridad['neu'] = round((porc_neu * pesos[cont]))
+            polaridad['pos'] = round((porc_pos * pesos[cont]))
+            polaridad['comp'] = round((porc_comp * pesos[cont]))
+
+            valores_neg.append(polaridad['neg'])
+            valores_neu.append(polaridad['neu'])
+            valores_pos.append(polaridad['pos'])
+            valores_comp.append(polaridad['comp'])
+            cont = cont + 1
+
+        porcentaje_usuario['neg'] = round((sum(valores_neg) / sum(pesos)))
+        porcentaje_usuario['neu'] = round((sum(valores_neu) / sum(pesos)))
+        porcentaje_usuario['pos'] = round((sum(valores_pos) / sum(pesos)))
+        porcentaje_usuario['comp'] = round((sum(valores_comp) / sum(pesos)))
+
+        comentarios_usuarios.append(porcentaje_usuario)
+        polaridades_usuarios.append(polaridades_usuario)
+
+    # Calcular la satisfacción promedio con los comentarios
+    suma = sum(c['comp'] for c in comentarios_usuarios)
+    cant = len(comentarios_usuarios)
+    comentarios_porcentaje = round(suma / cant)
+
+    # Actualizar los resultados en la base de datos
+    resultados.update(
+        {"comentarios": comentarios_usuarios, "polaridades": polaridades_usuarios, "motor": motor},
+        Query().id_soft == id_soft
+    )
+    invalidar_respuestas([id_soft], ["obtener_res_comentarios"])
+    estadisticas.upsert(
+        {
+            "id_soft": id_soft,
+            "comentarios": [
+                {clave: calcular_estadisticas([valores])[0] for clave, valores in columna.items()}
+                for columna in columnas
+            ]
+        },
+        Query().id_soft == id_soft
+    )
+
+    # Actualizar la satisfacción con los comentarios y las métricas que dependen de ella
+    actualizar_metricas(id_soft, {"satisfaccion_com": comentarios_porcentaje})
+
+    return {"analizados": len(pendientes), "reutilizados": total - len(pendientes)}
+
+def obtener_polaridades_previas(id_soft, motor):
+    """
+    Obtiene la polaridad de cada comentario guardado para un software, indexada por el texto del comentario.
+
+    Args:
+        id_soft (int): El ID del software.
+        motor (str): El motor de análisis de sentimientos con el que se van a analizar los comentarios.
+
+    Returns:
+        dict: Un diccionario {comentario: polaridad}, donde la polaridad tiene las claves "neg", "neu", "pos" y
+        "compound" de VADER. Está vacío si el software no tiene comentarios analizados con el mismo motor.
+    """
+
+    evaluacion = evaluaciones.get(Query().id_soft == id_soft) or {}
+    resultado = resultados.get(Query().id_soft == id_soft) or {}
+
+    # Las polaridades de otro motor no son comparables
+    if resultado.get("motor", "vader") != motor:
+        return {}
+
+    comentarios_previos = evaluacion.get("comentarios", [])[1:]
+    polaridades = resultado.get("polaridades", [])
+
+    # Asociar cada comentario guardado con su polaridad (ambas matrices tienen las mismas celdas)
+    return {
+        e: polaridad
+        for comentario, polaridades_usuario in zip(comentarios_previos, polaridades)
+        for e, polaridad in zip(comentario, polaridades_usuario)
+    }
+
+def calcular_satisfaccion(software):
+    """
+    Calcula la satisfacción de un software basado en dos valores: "satisfaccion_pun" y "satisfaccion_com".
+
+    Args:
+        software (dict): El documento del software, con sus métricas.
+
+    Returns:
+        int: El promedio redondeado de ambas satisfacciones, o SIN_VALOR si falta alguna.
+    """
+
+    puntuacion_satisfaccion = software["satisfaccion_pun"]
+    comentario_satisfaccion = software["satisfaccion_com"]
+
+    # Verificar si falta algún valor de satisfacción
+    if puntuacion_satisfaccion == SIN_VALOR or comentario_satisfaccion == SIN_VALOR:
+        return SIN_VALOR
+
+    # Calcular la satisfacción promedio y redondear al entero más cercano
+    return round((puntuacion_satisfaccion + comentario_satisfaccion) / 2)
+
+def calcular_usabilidad(software):
+    """
+    Calcula la usabilidad de un software basado en los valores de "eficacia", "eficiencia" y "satisfaccion".
+
+    Args:
+        software (dict): El documento del software, con sus métricas.
+
+    Returns:
+        int: El promedio redondeado de las tres métricas, o la usabilidad anterior si falta alguna.
+    """
+
+    if not metricas_completas(software):
+        return software["usabilidad"]
+
+    # Calcular la usabilidad promedio y redondear al entero más cercano
+    return round((software["eficacia"] + software["eficiencia"] + software["satisfaccion"]) / 3)
+
+def es_analizado(software):
+    """
+    Indica si un software ya fue analizado, es decir, si alguna vez tuvo todas sus métricas.
+
+    Args:
+        software (dict): El documento del software, con sus métricas.
+
+    Returns:
+        bool: True si las tres métricas tienen valores válidos o si el software ya estaba analizado.
+    """
+
+    return software["analizado"] or metricas_completas(software)
+
+def metricas_completas(software):
+    """
+    Indica si la eficacia, la eficiencia y la satisfacción de un software tienen valores válidos.
+
+    Args:
+        software (dict): El documento del software, con sus métricas.
+
+    Returns:
+        bool: True si ninguna de las tres métricas es SIN_VALOR.
+    """
+
+    return all(software[metrica] > SIN_VALOR for metrica in ("eficacia", "eficiencia", "satisfaccion"))
+
+# métricas derivadas de cada software, en orden de cálculo: (métrica, métricas de las que depende, función)
+METRICAS_DERIVADAS = [
+    ("satisfaccion", ("satisfaccion_pun", "satisfaccion_com"), calcular_satisfaccion),
+    ("usabilidad", ("eficacia", "eficiencia", "satisfaccion"), calcular_usabilidad),
+    ("analizado", ("eficacia", "eficiencia", "satisfaccion"), es_analizado),
+]
+
+def actualizar_metricas(id_soft, cambios):
+    """
+    Actualiza métricas de un software y recalcula solo las métricas derivadas que dependen de ellas.
+
+    Args:
+        id_soft (int): El ID del software.
+        cambios (dict): Las métricas calculadas (p. ej. {"eficacia": 72}).
+
+    Returns:
+        dict: Las métricas que cambiaron, con su nuevo valor.
+
+    Notas:
+    - El documento del software se lee una vez y, si alguna métrica cambió, se escribe una vez.
+    - Las métricas derivadas se recalculan en el orden de METRICAS_DERIVADAS, y solo si cambió alguna de sus
+    dependencias (directa o a través de otra métrica derivada).
+    - Si cambió una métrica con intervalo de confianza, los intervalos guardados se borran, porque ya no
+    corresponden a los resultados (ver calcular_intervalos).
+    """
+
+    software = dict(softwares.get(Query().id_soft == id_soft))
+    actualizadas = {}
+
+    # Aplicar los cambios y marcar como pendientes las métricas que cambiaron
+    for metrica, valor in cambios.items():
+        if software.get(metrica) != valor:
+            software[metrica] = valor
+            actualizadas[metrica] = valor
+
+    # Recalcular las métricas derivadas cuyas dependencias cambiaron
+    for metrica, dependencias, funcion in METRICAS_DERIVADAS:
+        if not any(d in actualizadas for d in dependencias):
+            continue
+
+        valor = funcion(software)
+
+        if software[metrica] != valor:
+            software[metrica] = valor
+            actualizadas[metrica] = valor
+
+    # Borrar los intervalos de confianza calculados con los resultados anteriores
+    vencidos = any(metrica in software.get("intervalos", {}) for metrica in actualizadas)
+
+    # Guardar el documento del software una sola vez
+    if actualizadas:
+        softwares.update({**actualizadas, "intervalos": {}} if vencidos else actualizadas, Query().id_soft == id_soft)
+        invalidar_respuestas([id_soft], ["obtener_soft"])
+        publicar_evento("metricas", id_soft, actualizadas)
+
+        if vencidos:
+            publicar_evento("intervalos", id_soft, {})
+
+    # Comparar el software analizado con su versión anterior (sus resultados por participante pueden haber cambiado
+    # aunque las métricas no)
+    if software["analizado"]:
+        detectar_regresiones(software)
+
+    registrar_cambio([id_soft])
+
+    return actualizadas
+
+
+
+
+
+
+def calcular_intervalos(id_soft, remuestreos=10000, confianza=0.95, semilla=None):
+    """
+    Calcula intervalos de confianza bootstrap (percentiles) para la eficacia, la eficiencia, la satisfacción y la
+    usabilidad de un software, y los guarda junto a las estimaciones puntuales en el documento del software.
+
+    Args:
+        id_soft (int): El ID del software.
+        remuestreos (int): La cantidad de remuestras bootstrap.
+        confianza (float): El nivel de confianza del intervalo, entre 0 y 1.
+        semilla (int): Semilla opcional del generador aleatorio, para obtener resultados reproducibles.
+
+    Raises:
+        ValueError: Si la cantidad de remuestras, el nivel de confianza o la semilla no son válidos.
+        ValueError: Si no existen resultados para el software.
+
+    Returns:
+        dict: Los intervalos calculados, con un diccionario {"inferior", "superior"} por métrica. Las métricas sin
+        resultados se omiten.
+
+    Notas:
+    - Se remuestrean los resultados por participante guardados en "resultados", que son los mismos con los que se
+    obtienen las estimaciones puntuales.
+    - La usabilidad se remuestrea por participante cuando todas las matrices tienen la misma cantidad de
+    participantes; en caso contrario se combinan las remuestras de cada métrica.
+    """
+
+    # Validar los parámetros del remuestreo
+    if not isinstance(remuestreos, int) or remuestreos < 1:
+        raise ValueError("La cantidad de remuestreos debe ser un entero positivo.")
+
+    if remuestreos > current_app.config["MAX_REMUESTREOS"]:
+        raise ValueError(f"La cantidad de remuestreos no puede superar {current_app.config['MAX_REMUESTREOS']}.")
+
+    if semilla is not None and (not isinstance(semilla, int) or isinstance(semilla, bool) or semilla < 0):
+        raise ValueError("La semilla debe ser un entero no negativo.")
+
+    if not isinstance(confianza, (int, float)) or not 0 < confianza < 1:
+        raise ValueError("El nivel de confianza debe estar entre 0 y 1.")
+
+    resultado = resultados.get(Query().id_soft == id_soft)
+
+    if resultado is None:
+        raise ValueError(f"No se encontraron resultados para el id_soft {id_soft}.")
+
+    # Obtener los valores por participante de cada métrica
+    valores = valores_participantes(resultado)
+
+    generador = np.random.default_rng(semilla)
+
+    # Remuestrear la media de cada métrica con resultados
+    medias = {
+        metrica: medias_bootstrap(v, remuestreos, generador)
+        for metrica, v in valores.items() if v.size > 0
+    }
+
+    if "satisfaccion_pun" in medias and "satisfaccion_com" in medias:
+        medias["satisfaccion"] = (medias["satisfaccion_pun"] + medias["satisfaccion_com"]) / 2
+
+    # La usabilidad requiere las tres métricas, igual que en calcular_usabilidad
+    if all(metrica in medias for metrica in ("eficacia", "eficiencia", "satisfaccion")):
+
+        tamanos = {v.size for v in valores.values()}
+
+        if len(tamanos) == 1:
+            # Remuestrear a los participantes con todas sus métricas a la vez
+            usabilidad_usuarios = (
+                valores["eficacia"] + valores["eficiencia"]
+                + (valores["satisfaccion_pun"] + valores["satisfaccion_com"]) / 2
+            ) / 3
+            medias["usabilidad"] = medias_bootstrap(usabilidad_usuarios, remuestreos, generador)
+        else:
+            medias["usabilidad"] = (medias["eficacia"] + medias["eficiencia"] + medias["satisfaccion"]) / 3
+
+    # Calcular los percentiles de cada métrica
+    alfa = (1 - confianza) / 2
+    intervalos = {}
+
+    for metrica, m in medias.items():
+        inferior, superior = np.quantile(m, [alfa, 1 - alfa])
+        intervalos[metrica] = {"inferior": round(float(inferior), 2), "superior": round(float(superior), 2)}
+
+    # Actualizar los intervalos en la base de datos
+    softwares.update(
+        {"intervalos": {**intervalos, "confianza": confianza, "remuestreos": remuestreos}},
+        Query().id_soft == id_soft
+    )
+    invalidar_respuestas([id_soft], ["obtener_soft"])
+    publicar_evento("intervalos", id_soft, intervalos)
+    registrar_cambio([id_soft])
+
+    return intervalos
+
+def valores_participantes(resultado):
+    """
+    Obtiene los valores por participante de cada métrica calculada a partir de una matriz.
+
+    Args:
+        resultado (dict): El documento de "resultados" del software.
+
+    Returns:
+        dict: Un arreglo de numpy por métrica ("eficacia", "eficiencia", "satisfaccion_pun" y "satisfaccion_com"),
+        vacío si la matriz aún no se guardó.
+    """
+
+    return {
+        "eficacia": np.asarray(resultado.get("tareas", []), dtype=np.float64),
+        "eficiencia": np.asarray(resultado.get("tiempos", []), dtype=np.float64),
+        "satisfaccion_pun": np.asarray(resultado.get("puntajes", []), dtype=np.float64),
+        "satisfaccion_com": np.asarray([c["comp"] for c in resultado.get("comentarios", [])], dtype=np.float64),
+    }
+
+def medias_bootstrap(valores, remuestreos, generador):
+    """
+    Calcula las medias de varias remuestras bootstrap de un arreglo de valores, todas a la vez.
+
+    Args:
+        valores (numpy.ndarray): Los valores de cada participante (arreglo de una dimensión).
+        remuestreos (int): La cantidad de remuestras.
+        generador (numpy.random.Generator): El generador de números aleatorios.
+
+    Returns:
+        numpy.ndarray: Un arreglo con la media de cada remuestra.
+
+    Notas:
+    - Cuando hay pocos valores distintos (p. ej. porcentajes enteros) se sortea cuántas veces aparece cada valor
+    en cada remuestra con una distribución multinomial, lo que no depende de la cantidad de participantes.
+    - En caso contrario se sortean los índices de los participantes en bloques de ELEMENTOS_POR_BLOQUE elementos,
+    para no reservar una matriz de remuestreos x participantes completa.
+    """
+
+    n = valores.size
+    unicos, conteos = np.unique(valores, return_counts=True)
+
+    # Sortear las frecuencias de cada valor distinto
+    if unicos.size * 16 <= n:
+        frecuencias = generador.multinomial(n, conteos / n, size=remuestreos)
+        return frecuencias @ unicos / n
+
+    # Sortear los índices de los participantes por bloques de remuestras
+    medias = np.empty(remuestreos)
+    bloque = max(1, ELEMENTOS_POR_BLOQUE // n)
+
+    for inicio in range(0, remuestreos, bloque):
+        fin = min(inicio + bloque, remuestreos)
+        indices = generador.integers(0, n, size=(fin - inicio, n))
+        medias[inicio:fin] = valores.take(indices).mean(axis=1)
+
+    return medias
+
+
+
+
+
+
+# Detección de regresiones entre versiones de un software
+
+# métricas comparadas entre versiones, y campos de "evaluaciones" cuyas tareas se comparan una a una
+METRICAS_REGRESION = ["eficacia", "eficiencia", "satisfaccion_pun", "satisfaccion_com", "satisfaccion", "usabilidad"]
+CAMPOS_TAREAS_REGRESION = {"tareas": "eficacia", "tiempos": "eficiencia"}
+
+# pesos de las métricas de las que se calculan las métricas derivadas (ver calcular_satisfaccion y
+# calcular_usabilidad)
+PESOS_DERIVADAS = {
+    "satisfaccion": {"satisfaccion_pun": 1 / 2, "satisfaccion_com": 1 / 2},
+    "usabilidad": {"eficacia": 1 / 3, "eficiencia": 1 / 3, "satisfaccion_pun": 1 / 6, "satisfaccion_com": 1 / 6},
+}
+
+# iteraciones de la fracción continua de la función beta incompleta (ver beta_incompleta)
+ITERACIONES_BETA = 200
+
+class IndiceVersiones:
+    """
+    Índice en memoria de los ID y las versiones de los softwares de cada nombre, para encontrar las otras versiones
+    de un software sin recorrer la tabla "softwares".
+
+    Notas:
+    - El nombre y la versión de un software no cambian después de crearlo: el índice se completa al crear softwares
+    (ver crear_softwares) y se reconstruye si otro proceso modificó la base de datos (ver
+    AlmacenTransaccional.cambios_externos).
+    - Puede incluir softwares eliminados o de transacciones descartadas, por lo que quien lo usa lee los documentos.
+    - Se usa con el candado del almacenamiento tomado.
+    """
+
+    def __init__(self):
+        self.versiones = None
+        self.estado = None
+
+    def buscar(self, almacen, nombre):
+        """
+        Obtiene los softwares con un nombre.
+
+        Args:
+            almacen (AlmacenTransaccional): El almacenamiento de la base de datos del índice.
+            nombre (str): El nombre de los softwares.
+
+        Returns:
+            dict: La versión de cada software ({id_soft: version}).
+        """
+
+        estado = almacen.cambios_externos()
+
+        # Construir el índice al usarlo por primera vez o después de un cambio de otro proceso
+        if self.versiones is None or estado != self.estado:
+            self.versiones = {}
+            self.estado = estado
+
+            for software in ((almacen.read() or {}).get("softwares") or {}).values():
+                self.versiones.setdefault(software["nombre"], {})[software["id_soft"]] = software["version"]
+
+        return dict(self.versiones.get(nombre, {}))
+
+    def agregar(self, softwares_nuevos):
+        """
+        Agrega softwares creados al índice.
+
+        Args:
+            softwares_nuevos (list): El id_soft, el nombre y la versión de cada software.
+        """
+
+        if self.versiones is None:
+            return
+
+        for id_soft, nombre, version in softwares_nuevos:
+            self.versiones.setdefault(nombre, {})[id_soft] = version
+
+def clave_version(version):
+    """
+    Obtiene una clave para ordenar versiones, que compara sus partes numéricas como números ("1.10" es posterior a
+    "1.9").
+
+    Args:
+        version (str): La versión.
+
+    Returns:
+        list: Las partes de la versión, como tuplas comparables entre sí.
+    """
+
+    return [
+        (int(parte), "") if parte.isdigit() else (-1, parte)
+        for parte in re.findall(r"\d+|[^\d.\-_ ]+", str(version))
+    ]
+
+def versiones_vecinas(software, ids):
+    """
+    Obtiene las versiones analizadas anterior y siguiente de un software, entre los softwares con su mismo nombre.
+
+    Args:
+        software (dict): El documento del software.
+        ids (list): Los ID de los otros softwares con el mismo nombre (ver IndiceVersiones).
+
+    Returns:
+        tuple: Los documentos de la versión anterior y de la siguiente (None si no existen). Las versiones iguales
+        se ordenan por id_soft.
+    """
+
+    clave = (clave_version(software["version"]), software["id_soft"])
+    anterior = siguiente = None
+
+    # Leer solo los softwares del índice (los eliminados no se ven)
+    for otro in softwares.search(Query().id_soft.one_of(ids)):
+        if not otro["analizado"] or otro["nombre"] != software["nombre"]:
+            continue
+
+        clave_otro = (clave_version(otro["version"]), otro["id_soft"])
+
+        if clave_otro < clave and (anterior is None or clave_otro > anterior[0]):
+            anterior = (clave_otro, otro)
+        elif clave_otro > clave and (siguiente is None or clave_otro < siguiente[0]):
+            siguiente = (clave_otro, otro)
+
+    return anterior and anterior[1], siguiente and siguiente[1]
+
+def detectar_regresiones(software):
+    """
+    Compara un software analizado con su versión analizada anterior, y la siguiente versión con él, y guarda los
+    informes en la tabla "regresiones".
+
+    Args:
+        software (dict): El documento del software, con sus métricas actualizadas.
+
+    Notas:
+    - Se llama al actualizar las métricas de un software analizado (ver actualizar_metricas).
+    - Si ningún otro software tiene el mismo nombre no se lee la base de datos. En caso contrario, las lecturas y
+    escrituras se hacen en una transacción: una sola lectura y una sola escritura de la base de datos.
+    - Si el software no tiene una versión anterior analizada, se borra su informe.
+    """
+
+    almacen = base_de_datos_actual().storage
+
+    with almacen.candado:
+        ids = almacen.versiones.buscar(almacen, software["nombre"])
+
+    ids.pop(software["id_soft"], None)
+
+    if not ids:
+        return
+
+    with transaccion():
+        anterior, siguiente = versiones_vecinas(software, list(ids))
+
+        if anterior is None:
+            regresiones.remove(Query().id_soft == software["id_soft"])
+        else:
+            guardar_informe_regresion(anterior, software)
+
+        if siguiente is not None:
+            guardar_informe_regresion(software, siguiente)
+            registrar_cambio([siguiente["id_soft"]])
+
+def guardar_informe_regresion(anterior, actual):
+    """
+    Calcula y guarda el informe de regresión de un software respecto a su versión anterior.
+
+    Args:
+        anterior (dict): El documento de la versión anterior.
+        actual (dict): El documento del software.
+
+    Notas:
+    - Para cada métrica y cada tarea se guarda el valor de cada versión, la diferencia y el valor p de la prueba t
+    de Welch de los valores por participante (None si no se puede calcular, p. ej. con menos de dos participantes).
+    - Es una regresión toda métrica o tarea que empeoró con un valor p menor que SIGNIFICANCIA_REGRESIONES.
+    - Las tareas se comparan si ambas versiones tienen la misma cantidad de tareas.
+    """
+
+    ids = [anterior["id_soft"], actual["id_soft"]]
+    resultados_versiones = {r["id_soft"]: r for r in resultados.search(Query().id_soft.one_of(ids))}
+    evaluaciones_versiones = {e["id_soft"]: e for e in evaluaciones.search(Query().id_soft.one_of(ids))}
+
+    # Columnas comparadas: cada métrica y cada tarea de CAMPOS_TAREAS_REGRESION (si coinciden las tareas)
+    columnas = [(metrica, None) for metrica in METRICAS_REGRESION]
+    tareas = {}
+
+    for campo, metrica in CAMPOS_TAREAS_REGRESION.items():
+        matrices = [valores_por_tarea(evaluaciones_versiones.get(id_soft, {}).get(campo), campo) for id_soft in ids]
+
+        if all(m is not None for m in matrices) and matrices[0].shape[1] == matrices[1].shape[1]:
+            tareas[metrica] = matrices
+            columnas.extend((metrica, tarea) for tarea in range(matrices[0].shape[1]))
+
+    # Estadísticos de todas las columnas de cada versión a la vez
+    estadisticos = []
+
+    for version, id_soft in enumerate(ids):
+        valores = valores_participantes(resultados_versiones.get(id_soft, {}))
+        valores.update({metrica: participantes_derivados(valores, metrica) for metrica in PESOS_DERIVADAS})
+
+        matriz = rellenar_columnas(
+            [valores[metrica] for metrica in METRICAS_REGRESION]
+            + [m[version][:, tarea] for m in tareas.values() for tarea in range(m[version].shape[1])]
+        )
+        estadisticos.append(estadisticos_columnas(matriz, valores))
+
+    valores_p = prueba_welch(*estadisticos)
+    medias = [e[0] for e in estadisticos]
+    significancia = current_app.config["SIGNIFICANCIA_REGRESIONES"]
+
+    informe = {
+        "id_soft": actual["id_soft"],
+        "nombre": actual["nombre"],
+        "version": actual["version"],
+        "anterior": {"id_soft": anterior["id_soft"], "version": anterior["version"]},
+        "fecha": datetime.now().timestamp(),
+        "metricas": {},
+        "tareas": {metrica: [] for metrica in CAMPOS_TAREAS_REGRESION.values()},
+        "regresiones": [],
+    }
+
+    for j, ((metrica, tarea), p) in enumerate(zip(columnas, valores_p)):
+        p = None if np.isnan(p) else round(float(p), 4)
+
+        if tarea is None:
+            # Las métricas se comparan con los valores guardados en los softwares
+            if anterior[metrica] <= SIN_VALOR or actual[metrica] <= SIN_VALOR:
+                continue
+
+            comparacion = {"anterior": anterior[metrica], "actual": actual[metrica]}
+            comparacion["delta"] = comparacion["actual"] - comparacion["anterior"]
+            informe["metricas"][metrica] = {**comparacion, "p": p}
+        else:
+            comparacion = {"tarea": tarea, "anterior": round(float(medias[0][j]), 2),
+                           "actual": round(float(medias[1][j]), 2)}
+            comparacion["delta"] = round(comparacion["actual"] - comparacion["anterior"], 2)
+            informe["tareas"][metrica].append({**comparacion, "p": p})
+
+        if comparacion["delta"] < 0 and p is not None and p < significancia:
+            informe["regresiones"].append({"metrica": metrica, "tarea": tarea})
+
+    regresiones.upsert(informe, Query().id_soft == actual["id_soft"])
+
+def participantes_derivados(valores, metrica):
+    """
+    Calcula los valores por participante de una métrica derivada (ver PESOS_DERIVADAS).
+
+    Args:
+        valores (dict): Los valores por participante de cada métrica (ver valores_participantes).
+        metrica (str): "satisfaccion" o "usabilidad".
+
+    Returns:
+        numpy.ndarray: Los valores por participante, vacío si las matrices de las que depende no tienen la misma
+        cantidad de participantes.
+    """
+
+    pesos = PESOS_DERIVADAS[metrica]
+
+    if len({valores[m].size for m in pesos}) != 1:
+        return np.empty(0)
+
+    return sum(peso * valores[m] for m, peso in pesos.items())
+
+def valores_por_tarea(valor, campo):
+    """
+    Calcula la eficacia o la eficiencia de cada participante en cada tarea, igual que calcular_eficacia y
+    calcular_eficiencia.
+
+    Args:
+        valor (dict | list): La matriz tal como está guardada en "evaluaciones", con la fila de referencias.
+        campo (str): El campo de la matriz ("tareas" o "tiempos").
+
+    Returns:
+        numpy.ndarray: Los porcentajes (participantes x tareas), o None si la matriz no se guardó o no es válida.
+    """
+
+    if not valor:
+        return None
+
+    try:
+        matriz = cargar_matriz(valor) if isinstance(valor, dict) else np.asarray(valor, dtype=np.float64)
+    except ValueError:
+        return None
+
+    if matriz.ndim != 2 or matriz.shape[0] < 2:
+        return None
+
+    referencias, filas = matriz[0].astype(np.float64), matriz[1:].astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (filas / referencias if campo == "tareas" else referencias / filas) * 100
+
+def rellenar_columnas(columnas):
+    """
+    Reúne columnas de distinto largo en una matriz, completando con NaN.
+
+    Args:
+        columnas (list): Arreglos de numpy de una dimensión.
+
+    Returns:
+        numpy.ndarray: La matriz (filas x columnas).
+    """
+
+    matriz = np.full((max((c.size for c in columnas), default=0), len(columnas)), np.nan)
+
+    for j, columna in enumerate(columnas):
+        matriz[:columna.size, j] = columna
+
+    return matriz
+
+def estadisticos_columnas(matriz, valores):
+    """
+    Calcula la media de cada columna de una matriz de valores por participante y los términos de la prueba t de
+    Welch, ignorando los NaN.
+
+    Args:
+        matriz (numpy.ndarray): Los valores (participantes x columnas), con las columnas de METRICAS_REGRESION
+        primero.
+        valores (dict): Los valores por participante de cada métrica, con los que se combinan las métricas derivadas
+        sin valores por participante.
+
+    Returns:
+        tuple: La media, la varianza de la media (s² / n) y el término de Welch-Satterthwaite ((s² / n)² / (n - 1))
+        de cada columna; NaN en las columnas con menos de dos valores.
+
+    Notas:
+    - Si las matrices de las que depende una métrica derivada tienen distinta cantidad de participantes, sus
+    estadísticos se combinan con los pesos de PESOS_DERIVADAS, como si las métricas fueran independientes (igual que
+    en calcular_intervalos).
+    """
+
+    validos = ~np.isnan(matriz)
+    n = validos.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = np.where(validos, matriz, 0).sum(axis=0) / n
+        error = np.where(validos, (matriz - media) ** 2, 0).sum(axis=0) / (n - 1) / n
+        termino = error ** 2 / (n - 1)
+
+    # Combinar las métricas derivadas sin valores por participante (las componentes se calculan antes)
+    for j, metrica in enumerate(METRICAS_REGRESION):
+        if metrica in PESOS_DERIVADAS and valores[metrica].size == 0:
+            componentes = [(METRICAS_REGRESION.index(m), peso) for m, peso in PESOS_DERIVADAS[metrica].items()]
+            media[j] = sum(peso * media[k] for k, peso in componentes)
+            error[j] = sum(peso ** 2 * error[k] for k, peso in componentes)
+            termino[j] = sum(peso ** 4 * termino[k] for k, peso in componentes)
+
+    return media, error, termino
+
+def prueba_welch(antes, despues):
+    """
+    Prueba t de Welch de la diferencia de medias de varias columnas a la vez.
+
+    Args:
+        antes (tuple): Los estadísticos de la versión anterior (ver estadisticos_columnas).
+        despues (tuple): Los estadísticos de la versión actual, con las mismas columnas.
+
+    Returns:
+        numpy.ndarray: El valor p bilateral de cada columna, o NaN si alguna versión tiene menos de dos valores.
+
+    Notas:
+    - Si las dos varianzas son cero, el valor p es 0 cuando las medias difieren y 1 cuando son iguales.
+    """
+
+    media1, error1, termino1 = antes
+    media2, error2, termino2 = despues
+    error = error1 + error2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Estadístico t y grados de libertad de Welch-Satterthwaite
+        t = (media2 - media1) / np.sqrt(error)
+        libertad = error ** 2 / (termino1 + termino2)
+
+        # P(|T| > |t|) = I_x(gl/2, 1/2) con x = gl / (gl + t²)
+        p = beta_incompleta(libertad / 2, 0.5, libertad / (libertad + t ** 2))
+
+    return np.where(error == 0, np.where(media1 == media2, 1.0, 0.0), p)
+
+def beta_incompleta(a, b, x):
+    """
+    Calcula la función beta incompleta regularizada I_x(a, b) de arreglos de numpy, con la fracción continua de
+    Lentz (como en Numerical Recipes, betai).
+
+    Args:
+        a (numpy.ndarray): El primer parámetro (positivo).
+        b (float | numpy.ndarray): El segundo parámetro (positivo).
+        x (numpy.ndarray): Los valores, entre 0 y 1.
+
+    Returns:
+        numpy.ndarray: I_x(a, b) para cada elemento.
+    """
+
+    a, b, x = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (a, b, x)))
+
+    # La fracción converge rápido para x < (a + 1) / (a + b + 2); en los demás casos, I_x(a, b) = 1 - I_1-x(b, a)
+    invertir = x > (a + 1) / (a + b + 2)
+    a, b, x = np.where(invertir, b, a), np.where(invertir, a, b), np.where(invertir, 1 - x, x)
+
+    lgamma = np.vectorize(math.lgamma, otypes=[np.float64])
+    minimo = 1e-300
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        frente = np.exp(a * np.log(x) + b * np.log1p(-x) + lgamma(a + b) - lgamma(a) - lgamma(b)) / a
+
+        c = np.ones_like(x)
+        d = 1 - (a + b) * x / (a + 1)
+        d = 1 / np.where(np.abs(d) < minimo, minimo, d)
+        h = d
+
+        for m in range(1, ITERACIONES_BETA + 1):
+            for coeficiente in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                                -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+                d = 1 + coeficiente * d
+                d = 1 / np.where(np.abs(d) < minimo, minimo, d)
+                c = 1 + coeficiente / c
+                c = np.where(np.abs(c) < minimo, minimo, c)
+                h = h * d * c
+
+            # Terminar cuando todos los elementos convergieron (los NaN no cuentan)
+            if not np.any(np.abs(d * c - 1) > 1e-15):
+                break
+
+        resultado = np.where(x <= 0, 0.0, frente * h)
+
+    return np.where(invertir, 1 - resultado, resultado)
+
+
+
+
+
+
+# Recálculo de los resultados de toda la base de datos (comando recalcular)
+
+# tablas que se copian a los procesos del recálculo, y las que se escriben con los resultados
+TABLAS_RECALCULO = ["softwares", "evaluaciones", "resultados", "estadisticas"]
+TABLAS_RECALCULADAS = ["softwares", "resultados", "estadisticas"]
+
+# aplicación de cada proceso del recálculo, con una base de datos en memoria (ver iniciar_proceso_recalculo)
+app_recalculo = None
+
+def iniciar_proceso_recalculo(configuracion):
+    """
+    Crea la aplicación de un proceso del recálculo, con la configuración de la aplicación que lo inició.
+    """
+
+    global app_recalculo
+
+    app_recalculo = crear_app(configuracion)
+    app_recalculo.extensions["base_de_datos"].close()
+    app_recalculo.extensions["base_de_datos"] = TinyDB(storage=AlmacenTransaccional(MemoryStorage))
+
+def recalcular_software(documentos, motor, reanalizar):
+    """
+    Recalcula los resultados y las métricas de un software a partir de sus matrices, en un proceso del recálculo.
+
+    Args:
+        documentos (dict): Los documentos del software en cada tabla de TABLAS_RECALCULO ({tabla: documento}).
+        motor (str): El motor de análisis de sentimientos, o None para usar el que se usó al guardar los comentarios.
+        reanalizar (bool): True para volver a analizar todos los comentarios, sin reutilizar sus polaridades.
+
+    Returns:
+        tuple: Los documentos recalculados ({tabla: documento} de TABLAS_RECALCULADAS) y los errores de cada campo
+        ({campo: mensaje}).
+    """
+
+    id_soft = documentos["softwares"]["id_soft"]
+    evaluacion = documentos["evaluaciones"]
+    resultado = dict(documentos.get("resultados") or {"id_soft": id_soft})
+    motor = motor or resultado.get("motor") or app_recalculo.config["MOTOR_SENTIMIENTO"]
+
+    # Sin las polaridades guardadas, todos los comentarios se vuelven a analizar
+    if reanalizar:
+        resultado.pop("polaridades", None)
+
+    base_de_datos = app_recalculo.extensions["base_de_datos"]
+    base_de_datos.storage.write({
+        "softwares": {"1": documentos["softwares"]},
+        "evaluaciones": {"1": evaluacion},
+        "resultados": {"1": resultado},
+        "estadisticas": {"1": documentos["estadisticas"]} if documentos.get("estadisticas") else {},
+    })
+    reiniciar_tablas(base_de_datos)
+
+    calculos = [
+        ("tareas", calcular_eficacia, ()),
+        ("tiempos", calcular_eficiencia, ()),
+        ("puntajes", calcular_sat_puntajes, ()),
+        ("comentarios", calcular_sat_comentarios, (motor,)),
+    ]
+    errores = {}
+
+    with app_recalculo.app_context():
+        for campo, calcular, argumentos in calculos:
+            matriz = filas_matriz(evaluacion.get(campo, []))
+
+            # Los campos sin datos no tienen resultados que recalcular
+            if len(matriz) < 2:
+                continue
+
+            try:
+                calcular(id_soft, matriz, *argumentos)
+            except Exception as e:
+                errores[campo] = str(e)
+
+        recalculados = {tabla: obtener_tabla(tabla).get(Query().id_soft == id_soft) for tabla in TABLAS_RECALCULADAS}
+
+    return {tabla: dict(documento) for tabla, documento in recalculados.items() if documento}, errores
+
+def comparar_recalculo(actuales, recalculados):
+    """
+    Describe las diferencias entre los documentos de un software y los recalculados.
+
+    Args:
+        actuales (dict): Los documentos guardados ({tabla: documento}).
+        recalculados (dict): Los documentos recalculados ({tabla: documento}).
+
+    Returns:
+        list: Una descripción por cada diferencia (vacía si no hay cambios): el valor anterior y el nuevo de las
+        métricas del software, y los campos que cambiaron en "resultados" y "estadisticas".
+    """
+
+    diferencias = []
+
+    for tabla, documento in recalculados.items():
+        actual = actuales.get(tabla) or {}
+
+        for campo, valor in documento.items():
+            if actual.get(campo) == valor:
+                continue
+
+            if tabla == "softwares":
+                diferencias.append(f"{campo}: {actual.get(campo)} -> {valor}")
+            else:
+                diferencias.append(f"{tabla}.{campo}")
+
+    return diferencias
+
+def guardar_recalculo(actuales, recalculados):
+    """
+    Guarda los documentos recalculados de un software, escribiendo solo los campos que cambiaron.
+
+    Args:
+        actuales (dict): Los documentos guardados ({tabla: documento}, con su doc_id).
+        recalculados (dict): Los documentos recalculados ({tabla: documento}).
+    """
+
+    for tabla, documento in recalculados.items():
+        actual = actuales.get(tabla)
+
+        if actual is None:
+            obtener_tabla(tabla).insert(documento)
+            continue
+
+        cambios = {campo: valor for campo, valor in documento.items() if actual.get(campo) != valor}
+
+        if cambios:
+            obtener_tabla(tabla).update(cambios, doc_ids=[actual.doc_id])
+
+@rutas.cli.command("recalcular")
+@click.option("--procesos", type=int, default=None, help="Procesos de cálculo (por defecto, uno por CPU).")
+@click.option("--lote", type=int, default=100, help="Softwares guardados en cada escritura de la base de datos.")
+@click.option("--punto-control", type=click.Path(dir_okay=False), default=None,
+              help="Archivo con el último software guardado, para reanudar el recálculo si se interrumpe.")
+@click.option("--motor", type=click.Choice(MOTORES_SENTIMIENTO), default=None,
+              help="Motor de análisis de sentimientos (por defecto, el que se usó en cada software).")
+@click.option("--reanalizar", is_flag=True,
+              help="Volver a analizar todos los comentarios (p. ej. al cambiar de modelo de traducción o sentimiento).")
+@click.option("--simular", is_flag=True, help="Mostrar las diferencias sin guardar los resultados.")
+@click.option("--inquilino", default=None, help="Recalcular la base de datos de este inquilino.")
+def recalcular(procesos, lote, punto_control, motor, reanalizar, simular, inquilino):
+    """
+    Recalcula los resultados y las métricas de todos los softwares a partir de las matrices de "evaluaciones".
+
+    Los softwares se recalculan en varios procesos, en orden de id_soft, y se guardan por lotes (una escritura de
+    la base de datos por lote). Con --punto-control, un recálculo interrumpido continúa después del último lote
+    guardado.
+
+    Los documentos de cada lote se vuelven a leer en su transacción, y se omiten los softwares cuyas matrices
+    cambiaron mientras se recalculaban (p. ej. por una solicitud a la API). Los softwares guardados (y los informes
+    de regresión que cambiaron) se agregan al registro de cambios después de cada lote, si está configurado.
+
+    Las tablas de TABLAS_RECALCULO se leen completas al comenzar (TinyDB lee el archivo entero en cada lectura,
+    por lo que leerlas por lotes repetiría esa lectura en cada uno); los documentos se liberan a medida que se
+    envían a los procesos.
+    """
+
+    # Usar la base de datos del inquilino, igual que en una solicitud con la cabecera X-Inquilino
+    if inquilino is not None:
+        if current_app.extensions["inquilinos"] is None or not PATRON_INQUILINO.fullmatch(inquilino):
+            raise click.ClickException(f"Inquilino no válido: {inquilino} (ver DIRECTORIO_INQUILINOS)")
+
+        g.base_de_datos = current_app.extensions["inquilinos"].adquirir(inquilino)
+
+    desde = 0
+
+    if punto_control and os.path.exists(punto_control):
+        with open(punto_control, encoding="utf-8") as archivo:
+            desde = json.load(archivo)["ultimo"]
+
+        click.echo(f"Reanudando después del software {desde}", err=True)
+
+    # Leer cada tabla una sola vez, indexada por id_soft
+    documentos = {
+        tabla: {documento["id_soft"]: documento for documento in obtener_tabla(tabla) if "id_soft" in documento}
+        for tabla in TABLAS_RECALCULO
+    }
+    ids = sorted(i for i in documentos["softwares"] if i > desde and i in documentos["evaluaciones"])
+
+    # Los procesos usan la misma configuración, sin tareas en segundo plano ni otras bases de datos
+    configuracion = {clave: current_app.config[clave] for clave in CONFIGURACION_PREDETERMINADA}
+    configuracion.update({
+        "PRECARGA_MODELOS": "no", "HILOS_ANALISIS": 1, "DIRECTORIO_INQUILINOS": None, "REGISTRO_CAMBIOS": None,
+        "ORIGEN_REPLICA": None, "ARCHIVO_TRAZAS": None,
+    })
+
+    inicio = time.perf_counter()
+    cambiados = 0
+    errores = 0
+    omitidos = 0
+
+    with ProcessPoolExecutor(procesos, initializer=iniciar_proceso_recalculo, initargs=(configuracion,)) as pool:
+        # Enviar los softwares a medida que se guardan los lotes, con a lo sumo dos lotes en curso
+        pendientes = deque()
+        siguientes = iter(ids)
+
+        def enviar(cantidad):
+            for id_soft in itertools.islice(siguientes, cantidad):
+                actuales = {tabla: documentos[tabla].pop(id_soft, None) for tabla in TABLAS_RECALCULO}
+                pendientes.append((id_soft, actuales, pool.submit(recalcular_software, actuales, motor, reanalizar)))
+
+        enviar(2 * lote)
+        hechos = 0
+
+        while pendientes:
+            lote_actual = [pendientes.popleft() for _ in range(min(lote, len(pendientes)))]
+            enviar(lote)
+            calculados = [(id_soft, actuales, *futuro.result()) for id_soft, actuales, futuro in lote_actual]
+
+            # Guardar el lote en una sola escritura (o solo mostrar las diferencias)
+            with nullcontext() if simular else transaccion():
+                # Releer los documentos del lote, que pudieron cambiar mientras se recalculaban
+                if not simular:
+                    ids_lote = [id_soft for id_soft, *_ in calculados]
+                    vigentes = {
+                        tabla: {d["id_soft"]: d for d in obtener_tabla(tabla).search(Query().id_soft.one_of(ids_lote))}
+                        for tabla in TABLAS_RECALCULO
+                    }
+
+                for id_soft, actuales, recalculados, fallidos in calculados:
+                    if not simular:
+                        evaluacion = vigentes["evaluaciones"].get(id_soft)
+
+                        # Omitir los softwares eliminados o cuyas matrices cambiaron: sus resultados ya son otros
+                        if evaluacion is None or evaluacion.get("hashes") != actuales["evaluaciones"].get("hashes"):
+                            omitidos = omitidos + 1
+                            click.echo(f"software {id_soft}: cambió durante el recálculo, se omite", err=True)
+                            continue
+
+                        actuales = {tabla: vigentes[tabla].get(id_soft) for tabla in TABLAS_RECALCULO}
+
+                    diferencias = comparar_recalculo(actuales, recalculados)
+                    cambiados = cambiados + bool(diferencias)
+                    errores = errores + bool(fallidos)
+
+                    for campo, mensaje in fallidos.items():
+                        click.echo(f"software {id_soft}: error en {campo}: {mensaje}", err=True)
+
+                    if simular:
+                        if diferencias:
+                            click.echo(f"software {id_soft}: {', '.join(diferencias)}")
+                    elif diferencias:
+                        guardar_recalculo(actuales, recalculados)
+                        registrar_cambio([id_soft])
+
+                        if recalculados["softwares"]["analizado"]:
+                            detectar_regresiones(recalculados["softwares"])
+
+            # Fuera de una solicitud, los cambios del lote se agregan al registro de cambios aquí
+            agregar_cambios_registrados()
+
+            ultimo = lote_actual[-1][0]
+
+            if punto_control and not simular:
+                guardar_punto_control(punto_control, ultimo)
+
+            # Mostrar el avance, la velocidad y el tiempo restante estimado
+            hechos = hechos + len(lote_actual)
+            velocidad = hechos / (time.perf_counter() - inicio)
+            restante = (len(ids) - hechos) / velocidad
+            click.echo(
+                f"{hechos}/{len(ids)} softwares ({velocidad:.1f}/s, faltan ~{restante:.0f} s, último {ultimo})",
+                err=True,
+            )
+
+    click.echo(
+        f"Softwares recalculados: {len(ids)}, con cambios: {cambiados}, con errores: {errores}, omitidos: {omitidos}",
+        err=True,
+    )
+
+    if punto_control and not simular and os.path.exists(punto_control):
+        os.remove(punto_control)
+
+def guardar_punto_control(ruta, ultimo):
+    """
+    Guarda el último software recalculado en el archivo de punto de control, reemplazándolo de forma atómica.
+    """
+
+    temporal = f"{ruta}.tmp"
+
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"ultimo": ultimo}, archivo)
+
+    os.replace(temporal, ruta)
+
+def validar_dimensiones(matriz):
+    """
+    Valida que una matriz de evaluación no supere las dimensiones máximas de la configuración.
+
+    Args:
+        matriz (list): La matriz recibida en la solicitud.
+
+    Returns:
+        str: Un mensaje de error si la matriz supera MAX_FILAS filas o MAX_COLUMNAS columnas, o None si es válida.
+    """
+
+    if not isinstance(matriz, list):
+        return None
+
+    max_filas = current_app.config["MAX_FILAS"]
+    max_columnas = current_app.config["MAX_COLUMNAS"]
+
+    if len(matriz) > max_filas:
+        return f"La matriz no puede tener más de {max_filas} filas."
+
+    if any(isinstance(fila, list) and len(fila) > max_columnas for fila in matriz):
+        return f"La matriz no puede tener más de {max_columnas} columnas."
+
+    return None
+
+def calcular_huella(*valores):
+    """
+    Calcula la huella (hash SHA-256) del contenido de una matriz de evaluación.
+
+    Args:
+        *valores: La matriz y los demás valores de los que dependen sus resultados (p. ej. el motor de análisis).
+
+    Returns:
+        str: La huella en hexadecimal.
+    """
+
+    contenido = json.dumps(valores, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+def matriz_sin_cambios(id_soft, campo, huella):
+    """
+    Indica si la matriz guardada en un campo de "evaluaciones" tiene la huella indicada.
+
+    Args:
+        id_soft (int): El ID del software.
+        campo (str): El campo de la matriz ("tareas", "tiempos", "puntajes" o "comentarios").
+        huella (str): La huella de la matriz recibida (ver calcular_huella).
+
+    Returns:
+        bool: True si la matriz y sus resultados ya están guardados.
+    """
+
+    evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+    sin_cambios = evaluacion is not None and evaluacion.get("hashes", {}).get(campo) == huella
+    anotar(matriz_sin_cambios=sin_cambios)
+
+    return sin_cambios
+
+def guardar_matriz(id_soft, campo, valor, huella):
+    """
+    Guarda una matriz en "evaluaciones" junto con su huella, en una sola escritura, y agrega una revisión al
+    historial con la matriz y las métricas del software.
+
+    Args:
+        id_soft (int): El ID del software.
+        campo (str): El campo de la matriz ("tareas", "tiempos", "puntajes" o "comentarios").
+        valor (dict | list): La matriz tal como se guarda (ver codificar_matriz).
+        huella (str): La huella de la matriz recibida (ver calcular_huella).
+    """
+
+    anteriores = []
+
+    def actualizar(evaluacion):
+        revisiones = evaluacion.setdefault("revisiones", {})
+        anteriores.append((evaluacion.get(campo, []), revisiones.get(campo, 0)))
+
+        evaluacion[campo] = valor
+        evaluacion.setdefault("hashes", {})[campo] = huella
+        revisiones[campo] = revisiones.get(campo, 0) + 1
+
+    evaluaciones.update(actualizar, Query().id_soft == id_soft)
+    invalidar_respuestas([id_soft], [f"obtener_val_{campo}"])
+    registrar_cambio([id_soft])
+
+    # Agregar la revisión al historial, comparando con la matriz que se reemplazó
+    if anteriores:
+        anterior, revision = anteriores[0]
+        agregar_revision(id_soft, campo, revision + 1, anterior, valor)
+
+def agregar_revision(id_soft, campo, revision, anterior, valor):
+    """
+    Agrega una revisión de una matriz al historial del software.
+
+    Args:
+        id_soft (int): El ID del software.
+        campo (str): El campo de la matriz ("tareas", "tiempos", "puntajes" o "comentarios").
+        revision (int): El número de la revisión (1 para la primera matriz guardada).
+        anterior (dict | list): La matriz de la revisión anterior, tal como estaba guardada (ver codificar_matriz).
+        valor (dict | list): La matriz de esta revisión, tal como se guarda en "evaluaciones".
+
+    Notas:
+    - La revisión guarda la matriz completa ("instantanea") cada INTERVALO_INSTANTANEAS revisiones, o si solo
+    cambiaron unas pocas filas, solo esas filas ("delta", ver filas_cambiadas). "base" es la revisión de la última
+    matriz completa, de modo que reconstruir una revisión aplica a lo sumo INTERVALO_INSTANTANEAS - 1 deltas.
+    - La matriz completa se guarda en la misma forma que en "evaluaciones" (compacta si MATRICES_COMPACTAS está
+    activada), de modo que el historial no guarda una copia expandida de cada matriz.
+    """
+
+    ultima = historial.get((Query().id_soft == id_soft) & (Query().campo == campo) & (Query().revision == revision - 1))
+
+    # Comparar las matrices compactas como arreglos, sin expandirlas a listas
+    if isinstance(valor, dict) and (isinstance(anterior, dict) or not anterior):
+        anterior, matriz = cargar_matriz(anterior), cargar_matriz(valor)
+    else:
+        anterior, matriz = matriz_a_lista(anterior), matriz_a_lista(valor)
+
+    cambiadas = filas_cambiadas(anterior, matriz)
+
+    # Guardar la matriz completa al comenzar el historial, al cumplirse el intervalo o si cambió más de la mitad
+    completa = (
+        ultima is None
+        or revision - ultima["base"] >= current_app.config["INTERVALO_INSTANTANEAS"]
+        or len(cambiadas) * 2 > len(matriz)
+    )
+
+    # Solo las filas del delta se convierten a listas
+    delta = None if completa else {
+        "filas": len(matriz),
+        "cambios": {str(i): matriz[i].tolist() if isinstance(matriz, np.ndarray) else matriz[i] for i in cambiadas},
+    }
+
+    software = softwares.get(doc_id=id_soft) or {}
+
+    historial.insert({
+        "id_soft": id_soft,
+        "campo": campo,
+        "revision": revision,
+        "fecha": datetime.now().timestamp(),
+        "base": revision if completa else ultima["base"],
+        "instantanea": valor if completa else None,
+        "delta": delta,
+        "metricas": {metrica: software.get(metrica, SIN_VALOR) for metrica in METRICAS_SOFTWARE},
+    })
+
+def filas_cambiadas(anterior, matriz):
+    """
+    Obtiene las filas de una matriz que cambiaron respecto a otra.
+
+    Args:
+        anterior (list | numpy.ndarray): La matriz anterior.
+        matriz (list | numpy.ndarray): La matriz nueva (del mismo tipo que la anterior).
+
+    Returns:
+        list: Los índices de las filas nuevas o distintas de la matriz nueva, en orden.
+    """
+
+    if isinstance(matriz, np.ndarray):
+
+        # Si cambió la cantidad de columnas (o no había matriz), cambiaron todas las filas
+        if anterior.shape[1:] != matriz.shape[1:]:
+            return list(range(len(matriz)))
+
+        comunes = min(len(anterior), len(matriz))
+        distintas = np.flatnonzero((anterior[:comunes] != matriz[:comunes]).any(axis=1))
+
+        return distintas.tolist() + list(range(comunes, len(matriz)))
+
+    return [i for i, fila in enumerate(matriz) if i >= len(anterior) or anterior[i] != fila]
+
+def reconstruir_revision(id_soft, campo, revision):
+    """
+    Reconstruye una revisión del historial a partir de su última matriz completa y los deltas posteriores.
+
+    Args:
+        id_soft (int): El ID del software.
+        campo (str): El campo de la matriz ("tareas", "tiempos", "puntajes" o "comentarios").
+        revision (int): El número de la revisión.
+
+    Returns:
+        dict: La revisión ("revision", "fecha" y "metricas") con su matriz ("matriz"), o None si no existe.
+    """
+
+    buscada = historial.get((Query().id_soft == id_soft) & (Query().campo == campo) & (Query().revision == revision))
+
+    if buscada is None:
+        return None
+
+    # Obtener la matriz completa y los deltas hasta la revisión buscada, en orden
+    cadena = sorted(
+        historial.search(
+            (Query().id_soft == id_soft) & (Query().campo == campo)
+            & (Query().revision >= buscada["base"]) & (Query().revision <= revision)
+        ),
+        key=lambda r: r["revision"]
+    )
+
+    # La matriz completa puede estar guardada en forma compacta
+    matriz = matriz_a_lista(cadena[0]["instantanea"])
+
+    for delta in (r["delta"] for r in cadena[1:]):
+        matriz = matriz[:delta["filas"]] + [None] * (delta["filas"] - len(matriz))
+
+        for i, fila in delta["cambios"].items():
+            matriz[int(i)] = fila
+
+    return {
+        "campo": campo,
+        "revision": revision,
+        "fecha": buscada["fecha"],
+        "metricas": buscada["metricas"],
+        "matriz": matriz,
+    }
+
+def calcular_estadisticas(columnas):
+    """
+    Calcula las estadísticas de cada columna (tarea o pregunta) de una matriz de evaluación.
+
+    Args:
+        columnas (list): Una lista con los valores de cada columna, donde cada columna es una lista de números.
+
+    Returns:
+        list: Una lista con un diccionario por columna con las claves "media", "minimo", "maximo" y "desviacion"
+        (desviación estándar poblacional). Las columnas sin valores tienen todas sus claves en SIN_VALOR.
+    """
+
+    estadisticas_columnas = []
+
+    for valores in columnas:
+
+        # Verificar si la columna no tiene valores
+        if not valores:
+            estadisticas_columnas.append(
+                {"media": SIN_VALOR, "minimo": SIN_VALOR, "maximo": SIN_VALOR, "desviacion": SIN_VALOR}
+            )
+            continue
+
+        estadisticas_columnas.append({
+            "media": round(statistics.fmean(valores), 2),
+            "minimo": round(min(valores), 2),
+            "maximo": round(max(valores), 2),
+            "desviacion": round(statistics.pstdev(valores), 2),
+        })
+
+    return estadisticas_columnas
+
+
+
+
+
+
+# Funciones para analizar el sentimiento de los comentarios
+def analizar_comentario(comentario, motor, analizadores):
+    """
+    Calcula la polaridad de un comentario según su idioma y el motor indicado.
+
+    Args:
+        comentario (str): El comentario.
+        motor (str): El motor para los comentarios en español: "vader" o "lexico_es".
+        analizadores (dict): Los analizadores de cada motor (ver RegistroModelos.analizadores).
+
+    Returns:
+        dict: La polaridad del comentario, con las claves "neg", "neu", "pos" y "compound", y el idioma detectado
+        del comentario ("idioma").
+
+    Notas:
+    - Los comentarios en inglés se analizan con VADER sin traducirlos.
+    - Los comentarios en español se analizan con el léxico en español, o se traducen al inglés si el motor es
+    "vader". Los comentarios en otros idiomas siempre se traducen al inglés.
+    """
+
+    idioma = detectar_idioma(comentario)
+    contar(f"idioma.{idioma}")
+
+    if idioma == "en":
+        contar("ruta.directa")
+
+        with tramo("polarity_scores", motor="vader", idioma=idioma, caracteres=len(comentario)):
+            puntaje = analizadores["vader"].polarity_scores(comentario)
+
+    # El léxico en español no necesita traducir el comentario
+    elif idioma == "es" and motor == "lexico_es":
+        contar("ruta.lexico_es")
+
+        with tramo("polarity_scores", motor="lexico_es", idioma=idioma, caracteres=len(comentario)):
+            puntaje = analizadores["lexico_es"].polarity_scores(comentario)
+
+    else:
+        # Traducir el comentario al inglés
+        contar("ruta.traduccion")
+        comentario_traducido = traducir_comentario_argos(comentario, idioma)
+
+        with tramo("polarity_scores", motor="vader", idioma="en", caracteres=len(comentario_traducido)):
+            puntaje = analizadores["vader"].polarity_scores(comentario_traducido)
+
+    return {**puntaje, "idioma": idioma}
+
+def analizar_comentarios(comentarios, motor):
+    """
+    Calcula la polaridad de varios comentarios en paralelo, en el pool de análisis de la aplicación.
+
+    Args:
+        comentarios (list): Los comentarios a analizar (sin repetidos).
+        motor (str): El motor para los comentarios en español: "vader" o "lexico_es".
+
+    Raises:
+        TimeoutError: Si el análisis de algún comentario dura más de TIEMPO_MAXIMO_COMENTARIO segundos.
+
+    Returns:
+        dict: Un diccionario {comentario: polaridad} (ver analizar_comentario).
+
+    Notas:
+    - El tiempo máximo de cada comentario se cuenta desde que empieza a analizarse, no desde que se envía al pool:
+    esperar a que se desocupe un hilo (p. ej. por los comentarios de otras solicitudes) no agota el tiempo.
+    - Cada solicitud tiene a lo sumo tantos comentarios en el pool como hilos tiene: los demás se envían a medida
+    que terminan los anteriores, para que la cola del pool no crezca con la cantidad de comentarios.
+    """
+
+    if not comentarios:
+        return {}
+
+    analizadores = registro_modelos.analizadores()
+    pool = current_app.extensions["pool_analisis"]
+    tiempo_maximo = current_app.config["TIEMPO_MAXIMO_COMENTARIO"]
+    siguientes = iter(comentarios)
+    en_curso = {}
+    inicios = {}
+    polaridades = {}
+
+    def enviar():
+        # Cada comentario se analiza con una copia del contexto, para que sus tramos pertenezcan a la traza de la
+        # solicitud
+        for c in itertools.islice(siguientes, pool.hilos - len(en_curso)):
+            futuro = pool.ejecutor.submit(
+                contextvars.copy_context().run, analizar_comentario_medido, c, motor, analizadores, inicios
+            )
+            en_curso[futuro] = c
+
+    try:
+        enviar()
+
+        while en_curso:
+            # Esperar hasta que termine algún comentario o venza el plazo del que empezó primero
+            comenzados = [inicios[c] for c in en_curso.values() if c in inicios]
+            plazo = min(comenzados) + tiempo_maximo - time.monotonic() if comenzados else tiempo_maximo
+            terminados, _ = wait(en_curso, timeout=max(plazo, 0), return_when=FIRST_COMPLETED)
+
+            for futuro in terminados:
+                polaridades[en_curso.pop(futuro)] = futuro.result()
+
+            ahora = time.monotonic()
+
+            if any(c in inicios and ahora - inicios[c] >= tiempo_maximo for c in en_curso.values()):
+                contar("analisis.tiempo_agotado")
+                raise TimeoutError(
+                    f"El análisis de los comentarios superó el tiempo máximo de {tiempo_maximo} s por comentario."
+                )
+
+            enviar()
+    finally:
+        # Descartar los comentarios que aún no empezaron a analizarse (p. ej. si se agotó el tiempo)
+        for futuro in en_curso:
+            futuro.cancel()
+
+    return polaridades
+
+def analizar_comentario_medido(comentario, motor, analizadores, inicios):
+    """
+    Analiza un comentario (ver analizar_comentario) en un hilo del pool, guardando en `inicios` el momento en que
+    empieza, desde el que se cuenta su tiempo máximo (ver analizar_comentarios).
+    """
+
+    inicios[comentario] = time.monotonic()
+
+    return analizar_comentario(comentario, motor, analizadores)
+
+def detectar_idioma(comentario):
+    """
+    Detecta el idioma de un comentario contando sus palabras frecuentes de cada idioma.
+
+    Args:
+        comentario (str): El comentario.
+
+    Returns:
+        str: El código ISO 639 del idioma detectado, o IDIOMA_PREDETERMINADO si no hay palabras que lo indiquen.
+
+    Notas:
+    - Otro idioma se detecta solo con al menos EVIDENCIA_MINIMA_IDIOMA palabras frecuentes o caracteres propios, y
+    más que las del idioma predeterminado.
+    """
+
+    texto = comentario.lower()
+    palabras = PATRON_PALABRAS.findall(texto)
+
+    puntajes = {
+        idioma: sum(1 for p in palabras if p in frecuentes)
+        + sum(1 for c in CARACTERES_IDIOMA.get(idioma, "") if c in texto)
+        for idioma, frecuentes in PALABRAS_IDIOMA.items()
+    }
+
+    mejor = max(puntajes, key=puntajes.get)
+
+    # Con poca evidencia o en caso de empate se prefiere el idioma predeterminado
+    if puntajes[mejor] < EVIDENCIA_MINIMA_IDIOMA or puntajes[mejor] == puntajes[IDIOMA_PREDETERMINADO]:
+        return IDIOMA_PREDETERMINADO
+
+    return mejor
+
+def contar(nombre, cantidad=1):
+    """
+    Incrementa un contador de las métricas de la aplicación.
+
+    Args:
+        nombre (str): El nombre del contador.
+        cantidad (int): El incremento.
+    """
+
+    with candado_metricas:
+        metricas[nombre] += cantidad
+
+@rutas.cli.command("calibrar_sentimiento")
+@click.option("--archivo", type=click.File("r", encoding="utf-8"), default=None,
+              help="Archivo JSON con una lista de comentarios (por defecto, los comentarios guardados).")
+@click.option("--maximo", type=int, default=1000, help="Cantidad máxima de comentarios a comparar.")
+def calibrar_sentimiento(archivo, maximo):
+    """
+    Compara el puntaje compuesto del léxico en español con el de VADER sobre la traducción al inglés.
+    """
+
+    # Obtener los comentarios de referencia
+    if archivo is not None:
+        comentarios = json.load(archivo)
+    else:
+        comentarios = [
+            e
+            for evaluacion in evaluaciones
+            for comentario in evaluacion.get("comentarios", [])[1:]
+            for e in comentario
+        ]
+
+    comentarios = [c for c in comentarios if isinstance(c, str)][:maximo]
+
+    if len(comentarios) < 2:
+        raise click.ClickException("Se necesitan al menos dos comentarios para la calibración.")
+
+    compuestos = {}
+    tiempos = {}
+
+    # Analizar los comentarios con cada motor y medir el tiempo de cada uno
+    analizadores = registro_modelos.analizadores()
+
+    for motor in MOTORES_SENTIMIENTO:
+        inicio = time.perf_counter()
+        compuestos[motor] = [analizar_comentario(c, motor, analizadores)["compound"] for c in comentarios]
+        tiempos[motor] = (time.perf_counter() - inicio) / len(comentarios)
+
+    referencia = compuestos["vader"]
+    candidato = compuestos["lexico_es"]
+
+    # Las clases de sentimiento usan los umbrales habituales de VADER
+    def clase(c):
+        return 1 if c >= 0.05 else -1 if c <= -0.05 else 0
+
+    error_medio = statistics.fmean(abs(a - b) for a, b in zip(referencia, candidato))
+    coincidencias = statistics.fmean(clase(a) == clase(b) for a, b in zip(referencia, candidato))
+
+    try:
+        correlacion = f"{statistics.correlation(referencia, candidato):.3f}"
+    except statistics.StatisticsError:
+        correlacion = "indefinida"
+
+    click.echo(f"Comentarios comparados: {len(comentarios)}")
+    click.echo(f"Correlación de Pearson del puntaje compuesto: {correlacion}")
+    click.echo(f"Error absoluto medio del puntaje compuesto: {error_medio:.3f}")
+    click.echo(f"Coincidencia de clase (negativo / neutral / positivo): {coincidencias:.1%}")
+
+    for motor in MOTORES_SENTIMIENTO:
+        click.echo(f"Tiempo medio por comentario con {motor}: {tiempos[motor] * 1e6:.1f} µs")
+
+
+
+
+
+
+#Función para traducir comentarios al inglés usando Argos Translate
+def traducir_comentario_argos(comentario, idioma="es"):
+    """
+    Traduce un comentario al inglés usando Argos Translate.
+
+    Args:
+        comentario (str): El comentario.
+        idioma (str): El código ISO 639 del idioma del comentario.
+
+    Returns:
+        str: El comentario traducido al inglés.
+    """
+    try:
+        # Traducir el comentario
+        with tramo("traducir_comentario_argos", idioma=idioma, caracteres=len(comentario)):
+            with registro_modelos.traducciones.usar(idioma, "en") as traduccion:
+                com_traducido = traduccion.translate(comentario)
+        return com_traducido
+    except Exception as e:
+        raise ValueError(f"Error al traducir el comentario: {str(e)}")
+
+class PoolSaturado(Exception):
+    """
+    Error lanzado cuando el pool de análisis no admite más solicitudes.
+    """
+
+class PoolAnalisis:
+    """
+    Hilos dedicados a traducir y analizar comentarios, con una cantidad acotada de solicitudes admitidas.
+
+    Notas:
+    - Se admiten a la vez como máximo hilos + cola solicitudes; las demás se rechazan de inmediato (PoolSaturado),
+    para que una ráfaga de análisis no deje sin recursos a las demás rutas.
+    - Los hilos se crean al enviar el primer comentario, por lo que el pool puede crearse antes de un fork.
+    - Cada solicitud admitida envía a lo sumo `hilos` comentarios a la vez (ver analizar_comentarios), por lo que la
+    cola del ejecutor tiene como máximo (hilos + cola) * hilos comentarios.
+    """
+
+    def __init__(self, hilos, cola):
+        self.hilos = hilos
+        self.ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="analisis")
+        self.admitidas = threading.BoundedSemaphore(hilos + cola)
+
+    @contextmanager
+    def admitir(self):
+        """
+        Reserva un lugar del pool para una solicitud de análisis mientras dura el bloque with.
+
+        Raises:
+            PoolSaturado: Si no quedan lugares.
+        """
+
+        if not self.admitidas.acquire(blocking=False):
+            contar("analisis.rechazadas")
+            raise PoolSaturado("El servidor está analizando demasiados comentarios. Intente de nuevo más tarde.")
+
+        try:
+            contar("analisis.admitidas")
+            yield
+        finally:
+            self.admitidas.release()
+
+class CacheIdempotencia:
+    """
+    Respuestas de las solicitudes enviadas con la cabecera Idempotency-Key, para repetirlas sin volver a ejecutarlas.
+
+    Notas:
+    - Cada clave se guarda con la huella del cuerpo de la solicitud: repetir la clave con otro cuerpo es un error.
+    - Mientras la primera solicitud se ejecuta, la clave queda reservada (sin respuesta). Una reserva se descarta
+    tras `vigencia` segundos, por si el proceso que la tomó se detuvo sin terminar la solicitud.
+    - Las reservas, las respuestas y las reservas liberadas se agregan a un registro junto a la base de datos (si
+    hay ruta), de modo que los procesos de trabajo de Gunicorn comparten las claves y las respuestas se repiten
+    también después de reiniciar la aplicación. Cada proceso lee las líneas nuevas del registro al no encontrar
+    una clave, y reserva las claves con el registro bloqueado (como el de las lápidas, ver Lapidas), por lo que dos
+    procesos no ejecutan la misma clave a la vez.
+    - Se guardan como máximo `maximo` claves; al superarlo se descarta la usada hace más tiempo. El registro se
+    reescribe solo con las respuestas y las reservas vigentes al tener más de 2 * `maximo` líneas.
+    """
+
+    def __init__(self, maximo, ruta=None, vigencia=600):
+        self.maximo = maximo
+        self.ruta = ruta
+        self.vigencia = vigencia
+        self.respuestas = OrderedDict()
+        self.reservas = {}
+        self.posicion = 0
+        self.inodo = None
+        self.lineas = 0
+        self.candado = threading.Lock()
+
+        if ruta is not None:
+            with self.bloquear(fcntl.LOCK_SH if fcntl else None) as archivo:
+                self.leer(archivo)
+
+    @contextmanager
+    def bloquear(self, modo):
+        """
+        Abre el registro (creándolo si no existe) con un bloqueo compartido o exclusivo entre procesos.
+        """
+
+        while True:
+            with open(self.ruta, "a+b") as archivo:
+                if fcntl is not None:
+                    fcntl.flock(archivo, modo)
+
+                # Si otro proceso reescribió el registro mientras se esperaba el bloqueo, abrir el nuevo
+                if os.fstat(archivo.fileno()).st_ino != os.stat(self.ruta).st_ino:
+                    continue
+
+                yield archivo
+                return
+
+    def leer(self, archivo):
+        """
+        Lee las reservas, las respuestas y las reservas liberadas agregadas al registro abierto desde la última
+        lectura.
+        """
+
+        # Si el registro se reescribió, se lee desde el principio
+        inodo = os.fstat(archivo.fileno()).st_ino
+
+        if inodo != self.inodo:
+            self.inodo, self.posicion, self.lineas = inodo, 0, 0
+
+        archivo.seek(self.posicion)
+
+        for linea in archivo:
+            # Una línea incompleta es una línea que aún se está escribiendo
+            if not linea.endswith(b"\n"):
+                break
+
+            self.posicion += len(linea)
+            self.lineas += 1
+            guardada = json.loads(linea)
+            clave = tuple(guardada["clave"])
+            actual = self.respuestas.get(clave)
+
+            if "cuerpo" in guardada:
+                respuesta = (base64.b64decode(guardada["cuerpo"]), guardada["codigo"], guardada["tipo"])
+                self.respuestas[clave] = (guardada["huella"], respuesta)
+                self.respuestas.move_to_end(clave)
+                self.reservas.pop(clave, None)
+            elif "reserva" in guardada:
+                if actual is None or actual[1] is None:
+                    self.respuestas[clave] = (guardada["huella"], None)
+                    self.respuestas.move_to_end(clave)
+                    self.reservas[clave] = guardada["reserva"]
+            elif actual is not None and actual[1] is None:
+                del self.respuestas[clave]
+                self.reservas.pop(clave, None)
+
+        self.recortar()
+
+    def recortar(self):
+        """
+        Descarta las claves usadas hace más tiempo, si hay más de `maximo`.
+        """
+
+        while len(self.respuestas) > self.maximo:
+            clave, _ = self.respuestas.popitem(last=False)
+            self.reservas.pop(clave, None)
+
+    def buscar(self, clave):
+        """
+        Obtiene la huella y la respuesta guardadas de una clave (la respuesta es None si está reservada), o None si
+        no está guardada o su reserva venció.
+        """
+
+        guardada = self.respuestas.get(clave)
+
+        if guardada is None:
+            return None
+
+        if guardada[1] is None and time.time() - self.reservas.get(clave, 0) > self.vigencia:
+            del self.respuestas[clave]
+            self.reservas.pop(clave, None)
+            return None
+
+        self.respuestas.move_to_end(clave)
+
+        return guardada
+
+    def reservar(self, clave, huella):
+        """
+        Reserva una clave para ejecutar su solicitud, si no estaba guardada.
+
+        Args:
+            clave (tuple): El inquilino, la ruta y el valor de la cabecera Idempotency-Key.
+            huella (str): La huella del cuerpo de la solicitud.
+
+        Returns:
+            tuple: None si la clave se reservó, o la huella y la respuesta guardadas (None si está en curso).
+        """
+
+        with self.candado:
+            guardada = self.buscar(clave)
+
+            # Una reserva de otro proceso puede haber terminado: se vuelve a leer el registro
+            if guardada is not None and (guardada[1] is not None or self.ruta is None):
+                return guardada
+
+            if self.ruta is None:
+                self.respuestas[clave] = (huella, None)
+                self.reservas[clave] = time.time()
+                self.recortar()
+                return None
+
+            # Reservar la clave con el registro bloqueado, después de leer las reservas de los demás procesos
+            with self.bloquear(fcntl.LOCK_EX if fcntl else None) as archivo:
+                self.leer(archivo)
+                guardada = self.buscar(clave)
+
+                if guardada is not None:
+                    return guardada
+
+                self.respuestas[clave] = (huella, None)
+                self.reservas[clave] = time.time()
+                self.agregar(archivo, self.codificar(clave, huella, None))
+                self.recortar()
+
+            return None
+
+    def guardar(self, clave, huella, respuesta):
+        """
+        Guarda la respuesta de una clave reservada.
+
+        Args:
+            clave (tuple): El inquilino, la ruta y el valor de la cabecera Idempotency-Key.
+            huella (str): La huella del cuerpo de la solicitud.
+            respuesta (tuple): El cuerpo, el código y el tipo de contenido de la respuesta.
+        """
+
+        with self.candado:
+            self.respuestas[clave] = (huella, respuesta)
+            self.reservas.pop(clave, None)
+
+            if self.ruta is None:
+                return
+
+            with self.bloquear(fcntl.LOCK_EX if fcntl else None) as archivo:
+                # Incluir las líneas de otros procesos antes de agregar la propia
+                self.leer(archivo)
+                self.respuestas[clave] = (huella, respuesta)
+
+                if self.lineas >= 2 * self.maximo:
+                    self.compactar()
+                else:
+                    self.agregar(archivo, self.codificar(clave, huella, respuesta))
+
+    def liberar(self, clave):
+        """
+        Libera una clave reservada cuya solicitud falló, para que pueda reintentarse.
+
+        Args:
+            clave (tuple): El inquilino, la ruta y el valor de la cabecera Idempotency-Key.
+        """
+
+        with self.candado:
+            if clave not in self.respuestas or self.respuestas[clave][1] is not None:
+                return
+
+            del self.respuestas[clave]
+            self.reservas.pop(clave, None)
+
+            if self.ruta is not None:
+                with self.bloquear(fcntl.LOCK_EX if fcntl else None) as archivo:
+                    self.leer(archivo)
+                    self.agregar(archivo, json.dumps({"clave": clave, "liberada": True}).encode("utf-8") + b"\n")
+
+    def agregar(self, archivo, linea):
+        """
+        Agrega una línea codificada al registro abierto y bloqueado.
+        """
+
+        archivo.write(linea)
+        archivo.flush()
+        self.posicion = archivo.tell()
+        self.lineas += 1
+
+    def codificar(self, clave, huella, respuesta):
+        """
+        Obtiene la línea del registro de una respuesta, o de la reserva de la clave si la respuesta es None.
+        """
+
+        if respuesta is None:
+            linea = {"clave": clave, "huella": huella, "reserva": self.reservas.get(clave, 0)}
+        else:
+            cuerpo, codigo, tipo = respuesta
+            linea = {"clave": clave, "huella": huella, "cuerpo": base64.b64encode(cuerpo).decode("ascii"),
+                     "codigo": codigo, "tipo": tipo}
+
+        return json.dumps(linea).encode("utf-8") + b"\n"
+
+    def compactar(self):
+        """
+        Reescribe el registro solo con las respuestas y las reservas vigentes. Se llama con el registro bloqueado.
+        """
+
+        with open(self.ruta + ".tmp", "wb") as archivo:
+            for clave, (huella, respuesta) in self.respuestas.items():
+                archivo.write(self.codificar(clave, huella, respuesta))
+
+        # Los demás procesos leen el registro nuevo desde el principio al ver otro inodo
+        os.replace(self.ruta + ".tmp", self.ruta)
+        estado = os.stat(self.ruta)
+        self.inodo, self.posicion, self.lineas = estado.st_ino, estado.st_size, len(self.respuestas)
+
+class CacheRespuestas:
+    """
+    Respuestas de las rutas de lectura de RUTAS_RESPUESTAS, guardadas ya serializadas (y comprimidas con gzip) para
+    enviarlas sin leer la base de datos ni codificar el JSON.
+
+    Notas:
+    - Cada respuesta se guarda por inquilino, software y ruta. Las funciones que modifican la base de datos
+    descartan las respuestas de los softwares y campos que cambian (ver invalidar_respuestas).
+    - Los cambios hechos por otros procesos no se conocen en detalle: al detectarlos (ver
+    AlmacenTransaccional.cambios_externos) se descartan todas las respuestas de esa base de datos.
+    - Cada descarte aumenta la generación: una respuesta generada antes de un descarte puede tener datos anteriores
+    al cambio, por lo que no se guarda.
+    - Se guardan como máximo `maximo` bytes; al superarlo se descartan las respuestas usadas hace más tiempo.
+    """
+
+    def __init__(self, maximo, minimo_gzip):
+        self.maximo = maximo
+        self.minimo_gzip = minimo_gzip
+        self.respuestas = OrderedDict()
+        self.bytes = 0
+        self.estados = {}
+        self.generacion = 0
+        self.candado = threading.Lock()
+
+    def obtener(self, clave, estado):
+        """
+        Obtiene una respuesta guardada.
+
+        Args:
+            clave (tuple): El inquilino, el id_soft y la ruta.
+            estado (tuple): El almacenamiento de la base de datos del inquilino y sus cambios externos; si cambió,
+            se descartan las respuestas del inquilino.
+
+        Returns:
+            tuple: La respuesta guardada (el cuerpo y el cuerpo comprimido, o None si no se comprimió), o None si no
+            está guardada, y la generación actual (ver guardar).
+        """
+
+        inquilino = clave[0]
+
+        with self.candado:
+            if self.estados.get(inquilino) != estado:
+                self.descartar([c for c in self.respuestas if c[0] == inquilino])
+                self.estados[inquilino] = estado
+
+            respuesta = self.respuestas.get(clave)
+
+            if respuesta is not None:
+                self.respuestas.move_to_end(clave)
+
+            return respuesta, self.generacion
+
+    def guardar(self, clave, cuerpo, generacion):
+        """
+        Guarda una respuesta, si no se descartó ninguna desde que se obtuvo la generación.
+
+        Args:
+            clave (tuple): El inquilino, el id_soft y la ruta.
+            cuerpo (bytes): El cuerpo de la respuesta.
+            generacion (int): La generación devuelta por obtener antes de leer los datos de la respuesta.
+
+        Returns:
+            tuple: La respuesta guardada (o que se hubiera guardado).
+        """
+
+        # Comprimir una sola vez, para todas las solicitudes que acepten gzip
+        comprimido = None
+
+        if self.minimo_gzip is not None and len(cuerpo) >= self.minimo_gzip:
+            comprimido = gzip.compress(cuerpo, mtime=0)
+
+            if len(comprimido) >= len(cuerpo):
+                comprimido = None
+
+        respuesta = (cuerpo, comprimido)
+        tamano = len(cuerpo) + len(comprimido or b"")
+
+        with self.candado:
+            if generacion != self.generacion or tamano > self.maximo:
+                return respuesta
+
+            self.descartar([clave])
+            self.respuestas[clave] = respuesta
+            self.bytes += tamano
+
+            while self.bytes > self.maximo:
+                _, (cuerpo, comprimido) = self.respuestas.popitem(last=False)
+                self.bytes -= len(cuerpo) + len(comprimido or b"")
+
+        return respuesta
+
+    def invalidar(self, inquilino, ids, rutas=None):
+        """
+        Descarta las respuestas de softwares modificados.
+
+        Args:
+            inquilino (str): El inquilino de los softwares (None para la base de datos de la aplicación).
+            ids (list): Los ID de los softwares.
+            rutas (list): Las rutas cuyas respuestas cambian, o None para todas las de RUTAS_RESPUESTAS.
+        """
+
+        rutas = RUTAS_RESPUESTAS if rutas is None else rutas
+
+        with self.candado:
+            self.descartar([(inquilino, id_soft, ruta) for id_soft in ids for ruta in rutas])
+
+    def descartar(self, claves):
+        # Se llama con el candado tomado
+        self.generacion += 1
+
+        for clave in claves:
+            respuesta = self.respuestas.pop(clave, None)
+
+            if respuesta is not None:
+                self.bytes -= len(respuesta[0]) + len(respuesta[1] or b"")
+
+class RegistroCambios:
+    """
+    Archivo de líneas JSON con el estado de los softwares después de cada cambio guardado, en orden.
+
+    Cada línea tiene la fecha del cambio ("fecha"), el id_soft y el documento de cada tabla de TABLAS_REPLICADAS
+    (None si se eliminó). Aplicar las líneas en orden reproduce la base de datos.
+
+    Notas:
+    - La revisión cuenta los bytes de cambios agregados desde que se creó el registro: aumenta con cada cambio y
+    permite leer los cambios posteriores a una revisión sin recorrer el archivo.
+    - Al superar `max_bytes` de cambios, el registro se compacta: el último estado de cada software se guarda en
+    una instantánea (<registro>.instantanea) junto con su revisión, y el registro se vacía y sigue desde ella (su
+    primera línea, {"base": <revisión>}, indica la revisión de la instantánea). Las réplicas con una revisión
+    anterior cargan la instantánea (ver leer_cambios).
+    - El archivo se bloquea al escribir (con fcntl, si está disponible), por lo que varios procesos pueden agregar
+    cambios al mismo registro.
+    """
+
+    def __init__(self, ruta, max_bytes=None):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.candado = threading.Lock()
+
+    def agregar(self, ids):
+        """
+        Agrega el estado actual de varios softwares al registro.
+
+        Args:
+            ids (set): Los ID de los softwares.
+
+        Returns:
+            int: La revisión después de agregarlos.
+        """
+
+        ids = set(ids)
+        almacen = base_de_datos_actual().storage
+
+        with self.candado, open(self.ruta, "a+b") as archivo:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_EX)
+
+            # Tomar los documentos de la última escritura (o del archivo, si otro proceso lo cambió después) dentro
+            # del bloqueo, para que el orden del registro sea el de los cambios. Con el candado tomado ningún hilo
+            # escribe la base de datos hasta agregar las líneas
+            with almacen.candado:
+                datos = almacen.datos_escritos() or {}
+                documentos = {
+                    campo: {
+                        d["id_soft"]: d for d in (datos.get(tabla) or {}).values()
+                        if d.get("id_soft") in ids and d["id_soft"] not in almacen.lapidas.fechas
+                    }
+                    for tabla, campo in TABLAS_REPLICADAS.items()
+                }
+                fecha = datetime.now().timestamp()
+
+                lineas = [
+                    json.dumps(
+                        {"fecha": fecha, "id_soft": id_soft,
+                         **{campo: documentos[campo].get(id_soft) for campo in TABLAS_REPLICADAS.values()}},
+                        ensure_ascii=False, separators=(",", ":")
+                    ) + "\n"
+                    for id_soft in sorted(ids)
+                ]
+                archivo.write("".join(lineas).encode("utf-8"))
+                archivo.flush()
+
+            base, inicio = leer_encabezado(archivo)
+            revision = base + archivo.seek(0, os.SEEK_END) - inicio
+
+            # Compactar el registro si superó su tamaño máximo
+            if self.max_bytes and revision - base > self.max_bytes:
+                self.compactar(archivo, base, inicio, revision)
+
+            return revision
+
+    def compactar(self, archivo, base, inicio, revision):
+        """
+        Guarda el último estado de cada software en la instantánea y vacía el registro (abierto y bloqueado).
+
+        Args:
+            archivo (file): El registro, abierto para agregar y bloqueado.
+            base (int): La revisión de la instantánea actual (0 si no hay).
+            inicio (int): La posición del primer cambio en el registro.
+            revision (int): La revisión actual, que pasa a ser la de la nueva instantánea.
+
+        Notas:
+        - La instantánea se reemplaza antes de vaciar el registro: si el proceso termina entre ambos pasos, el
+        registro conserva sus cambios, que repiten los de la instantánea.
+        """
+
+        ultimas = {}
+
+        # Partir de la instantánea anterior y aplicar los cambios del registro (cada línea es el estado completo)
+        if base and os.path.exists(f"{self.ruta}.instantanea"):
+            with open(f"{self.ruta}.instantanea", "rb") as instantanea:
+                instantanea.readline()
+
+                for linea in instantanea:
+                    ultimas[json.loads(linea)["id_soft"]] = linea
+
+        archivo.seek(inicio)
+
+        for linea in archivo:
+            if not linea.endswith(b"\n"):
+                break
+
+            cambio = json.loads(linea)
+
+            # Los softwares eliminados no se guardan en la instantánea
+            if all(cambio.get(campo) is None for campo in TABLAS_REPLICADAS.values()):
+                ultimas.pop(cambio["id_soft"], None)
+            else:
+                ultimas[cambio["id_soft"]] = linea
+
+        with open(f"{self.ruta}.instantanea.tmp", "wb") as instantanea:
+            instantanea.write(json.dumps({"revision": revision}).encode("utf-8") + b"\n")
+            instantanea.writelines(ultimas[id_soft] for id_soft in sorted(ultimas))
+            instantanea.flush()
+            os.fsync(instantanea.fileno())
+
+        os.replace(f"{self.ruta}.instantanea.tmp", f"{self.ruta}.instantanea")
+
+        # El registro sigue desde la revisión de la instantánea
+        archivo.truncate(0)
+        archivo.write(json.dumps({"base": revision}).encode("utf-8") + b"\n")
+        archivo.flush()
+        os.fsync(archivo.fileno())
+        contar("registro.compactaciones")
+
+    def revision(self):
+        """
+        Obtiene la revisión actual del registro.
+        """
+
+        if not os.path.exists(self.ruta):
+            return 0
+
+        with open(self.ruta, "rb") as archivo:
+            base, inicio = leer_encabezado(archivo)
+            return base + archivo.seek(0, os.SEEK_END) - inicio
+
+def leer_encabezado(archivo):
+    """
+    Lee la primera línea de un registro de cambios compactado (ver RegistroCambios.compactar).
+
+    Args:
+        archivo (file): El registro, abierto en modo binario.
+
+    Returns:
+        tuple: La revisión de la instantánea del registro (0 si no se compactó) y la posición del primer cambio.
+    """
+
+    archivo.seek(0)
+    linea = archivo.readline()
+
+    if linea.startswith(b'{"base":') and linea.endswith(b"\n"):
+        return json.loads(linea)["base"], len(linea)
+
+    return 0, 0
+
+def leer_cambios(ruta, desde, limite):
+    """
+    Lee los cambios de un registro posteriores a una revisión.
+
+    Args:
+        ruta (str): La ruta del registro de cambios.
+        desde (int): La revisión desde la que se leen los cambios.
+        limite (int): La cantidad máxima de cambios.
+
+    Raises:
+        ValueError: Si la revisión no corresponde al comienzo de un cambio.
+
+    Returns:
+        tuple: Los cambios (lista de diccionarios), la revisión después del último cambio leído, la revisión
+        actual del registro y si los cambios son la instantánea del registro (True), que reemplaza a todos los
+        softwares de la réplica.
+
+    Notas:
+    - Si la revisión es anterior a la instantánea (p. ej. 0 en una réplica nueva), se devuelve la instantánea
+    completa, sin límite, con su revisión.
+    """
+
+    if not os.path.exists(ruta):
+        return [], 0, 0, False
+
+    with open(ruta, "rb") as archivo:
+        # Bloquear el registro para no leerlo mientras se compacta
+        if fcntl is not None:
+            fcntl.flock(archivo, fcntl.LOCK_SH)
+
+        base, inicio = leer_encabezado(archivo)
+        ultima = base + archivo.seek(0, os.SEEK_END) - inicio
+
+        if desde > ultima:
+            raise ValueError(f"La revisión {desde} es posterior a la última ({ultima}).")
+
+        # Los cambios anteriores a la instantánea ya no están en el registro
+        if desde < base:
+            with open(f"{ruta}.instantanea", "rb") as instantanea:
+                revision = json.loads(instantanea.readline())["revision"]
+                return [json.loads(linea) for linea in instantanea], revision, ultima, True
+
+        # La revisión debe estar justo después del final de un cambio
+        posicion = desde - base + inicio
+
+        if posicion > inicio:
+            archivo.seek(posicion - 1)
+            if archivo.read(1) != b"\n":
+                raise ValueError(f"La revisión {desde} no corresponde al comienzo de un cambio.")
+
+        archivo.seek(posicion)
+        lista = []
+
+        while len(lista) < limite:
+            linea = archivo.readline()
+
+            # Una línea incompleta es un cambio que aún se está escribiendo
+            if not linea.endswith(b"\n"):
+                break
+
+            lista.append(json.loads(linea))
+            desde = desde + len(linea)
+
+    return lista, desde, ultima, False
+
+class Replica:
+    """
+    Copia en memoria de la base de datos del servidor principal, actualizada con su registro de cambios.
+
+    Notas:
+    - El origen puede ser la URL del principal (se lee su ruta /cambios) o la ruta de su registro de cambios, si
+    ambos procesos están en el mismo equipo.
+    - La réplica empieza desde la revisión 0: carga la instantánea del registro, si se compactó, y aplica los
+    cambios posteriores.
+    - El hilo que aplica los cambios se inicia con la primera solicitud de cada proceso (p. ej. la de la sonda
+    /readyz), porque los hilos no sobreviven al fork del proceso de trabajo de Gunicorn.
+    """
+
+    def __init__(self, base_de_datos, origen, intervalo, limite, respuestas=None):
+        self.base_de_datos = base_de_datos
+        self.origen = origen
+        self.intervalo = intervalo
+        self.limite = limite
+        self.respuestas = respuestas
+        self.revision = 0
+        self.revision_origen = None
+        self.sincronizada = None
+        self.error = None
+        self.condicion = threading.Condition()
+        self.candado = threading.Lock()
+        self.hilo = None
+
+    def iniciar(self):
+        """
+        Inicia el hilo que aplica los cambios del origen, si no está en ejecución en el proceso actual.
+        """
+
+        with self.candado:
+            if self.hilo is None or not self.hilo.is_alive():
+                self.hilo = threading.Thread(target=self.sincronizar, daemon=True)
+                self.hilo.start()
+
+    def leer(self):
+        """
+        Lee los cambios del origen posteriores a la revisión de la réplica.
+
+        Returns:
+            tuple: Los cambios, la revisión después del último, la revisión actual del origen y si los cambios son
+            la instantánea del origen (ver leer_cambios).
+        """
+
+        if not self.origen.startswith(("http://", "https://")):
+            return leer_cambios(self.origen, self.revision, self.limite)
+
+        url = f"{self.origen.rstrip('/')}/cambios?desde={self.revision}&limite={self.limite}"
+
+        with urllib.request.urlopen(url, timeout=30) as respuesta:
+            datos = json.loads(respuesta.read())
+
+        return datos["cambios"], datos["revision"], datos["ultima"], datos.get("instantanea", False)
+
+    def aplicar(self, lista, revision, ultima, instantanea=False):
+        """
+        Aplica cambios leídos del origen a la base de datos en memoria.
+
+        Args:
+            lista (list): Los cambios (ver RegistroCambios).
+            revision (int): La revisión del origen después del último cambio.
+            ultima (int): La revisión actual del origen.
+            instantanea (bool): True si los cambios son la instantánea del origen, que reemplaza a todos los
+            softwares.
+        """
+
+        if lista or instantanea:
+            almacen = self.base_de_datos.storage
+
+            # Las tablas se reemplazan por copias modificadas, para no cambiar los datos de las lecturas en curso
+            with almacen.candado:
+                datos = dict(almacen.read() or {})
+                ids = {cambio["id_soft"] for cambio in lista}
+
+                for tabla, campo in TABLAS_REPLICADAS.items():
+                    documentos = {} if instantanea else dict(datos.get(tabla, {}))
+
+                    # Con la instantánea también cambian los softwares que ya no están en el origen
+                    if instantanea:
+                        ids.update(d["id_soft"] for d in datos.get(tabla, {}).values())
+
+                    for cambio in lista:
+                        if cambio.get(campo) is None:
+                            documentos.pop(str(cambio["id_soft"]), None)
+                        else:
+                            documentos[str(cambio["id_soft"])] = cambio[campo]
+
+                    datos[tabla] = documentos
+
+                almacen.write(datos)
+                reiniciar_tablas(self.base_de_datos)
+
+                # Las réplicas no tienen inquilinos
+                if self.respuestas is not None:
+                    self.respuestas.invalidar(None, ids)
+
+        with self.condicion:
+            self.revision = revision
+            self.revision_origen = ultima
+
+            if revision == ultima:
+                self.sincronizada = time.time()
+
+            self.condicion.notify_all()
+
+    def sincronizar(self):
+        """
+        Aplica los cambios del origen indefinidamente (se ejecuta en un hilo de la aplicación).
+        """
+
+        while True:
+            try:
+
+                lista, revision, ultima, instantanea = self.leer()
+                self.aplicar(lista, revision, ultima, instantanea)
+                self.error = None
+                contar("replica.cambios", len(lista))
+
+                # Seguir leyendo de inmediato si el origen tiene más cambios
+                if revision < ultima:
+                    continue
+
+            except Exception as e:
+                self.error = str(e)
+                contar("replica.errores")
+
+            time.sleep(self.intervalo)
+
+    def esperar(self, revision, espera):
+        """
+        Espera a que la réplica alcance una revisión.
+
+        Args:
+            revision (int): La revisión.
+            espera (float): Segundos máximos de espera.
+
+        Returns:
+            bool: True si la réplica alcanzó la revisión.
+        """
+
+        with self.condicion:
+            return self.condicion.wait_for(lambda: self.revision >= revision, timeout=espera)
+
+    def estado(self):
+        """
+        Obtiene el estado de la réplica.
+
+        Returns:
+            dict: La revisión aplicada ("revision"), la del origen en la última lectura ("revision_origen"), los
+            bytes de cambios pendientes ("atraso"), los segundos desde que estuvo al día por última vez
+            ("segundos_atraso", None si nunca lo estuvo) y el último error de lectura ("error").
+        """
+
+        with self.condicion:
+            atraso = None if self.revision_origen is None else self.revision_origen - self.revision
+            segundos = None if self.sincronizada is None else (0 if atraso == 0 else time.time() - self.sincronizada)
+
+            return {
+                "modo": "replica",
+                "origen": self.origen,
+                "revision": self.revision,
+                "revision_origen": self.revision_origen,
+                "atraso": atraso,
+                "segundos_atraso": segundos,
+                "error": self.error,
+            }
+
+class BusEventos:
+    """
+    Eventos de los cambios guardados, numerados en orden, con los más recientes disponibles para reanudar.
+
+    Notas:
+    - Se guardan los últimos `maximo` eventos. Un cliente que pide eventos más antiguos (o de otra ejecución de la
+    aplicación) recibe un evento "reinicio" y debe volver a leer los datos.
+    - Los eventos son del proceso, por lo que la API se ejecuta en un solo proceso (ver gunicorn.conf.py). Los ID
+    empiezan en el momento de crear el bus (en microsegundos), para que los de otra ejecución no coincidan con los
+    de esta. Los cambios de otros procesos (p. ej. el comando recalcular) no tienen eventos: /eventos envía
+    "reinicio" al detectarlos (ver generar_eventos).
+    """
+
+    def __init__(self, maximo):
+        self.recientes = deque(maxlen=maximo)
+        self.ultimo = time.time_ns() // 1000
+        self.condicion = threading.Condition()
+
+    def publicar(self, tipo, id_soft, datos=None, inquilino=None):
+        """
+        Publica un evento y despierta a los clientes que esperan eventos nuevos.
+
+        Args:
+            tipo (str): El tipo de cambio.
+            id_soft (int): El ID del software modificado.
+            datos (dict): Los valores que cambiaron.
+            inquilino (str): El inquilino de la base de datos modificada (None para la de la aplicación).
+        """
+
+        with self.condicion:
+            self.ultimo = self.ultimo + 1
+            evento = {"id": self.ultimo, "tipo": tipo, "id_soft": id_soft, "datos": datos, "inquilino": inquilino}
+            self.recientes.append(evento)
+            self.condicion.notify_all()
+
+        contar(f"eventos.{tipo}")
+
+    def esperar(self, desde, espera):
+        """
+        Obtiene los eventos posteriores a uno, esperando a que se publique alguno si no hay.
+
+        Args:
+            desde (int): El ID del último evento recibido por el cliente.
+            espera (float): Segundos máximos de espera.
+
+        Returns:
+            list: Los eventos con ID mayor que `desde` (vacía si no se publicó ninguno), o None si `desde` ya no
+            está disponible.
+        """
+
+        with self.condicion:
+            self.condicion.wait_for(lambda: self.ultimo != desde, timeout=espera)
+
+            # El primer evento disponible debe ser el siguiente al último recibido
+            primero = self.recientes[0]["id"] if self.recientes else self.ultimo + 1
+
+            if desde > self.ultimo or (desde < self.ultimo and primero > desde + 1):
+                return None
+
+            return [evento for evento in self.recientes if evento["id"] > desde]
+
+class PoolTraducciones:
+    """
+    Conjunto acotado de modelos de traducción de Argos Translate, cargados al usarlos por primera vez.
+
+    Notas:
+    - Se mantienen como máximo "maximo" modelos (MAX_MODELOS_TRADUCCION); al superarlo se expulsa el usado hace
+    más tiempo. Un modelo expulsado que otro hilo está usando (ver usar) se libera cuando termina de usarlo.
+    - Si el paquete de un par de idiomas no está instalado, se descarga e instala al pedirlo.
+    - La carga (y la instalación) se hace sin el candado: los hilos que piden otros pares no esperan, y los que
+    piden el mismo par esperan a la misma carga.
+    """
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.modelos = OrderedDict()
+        self.cargando = {}
+        self.usos = Counter()
+        self.expulsados = {}
+        self.candado = threading.Lock()
+
+    def obtener(self, origen, destino):
+        """
+        Obtiene el modelo de traducción de un par de idiomas, cargándolo si es necesario.
+
+        Args:
+            origen (str): El código ISO 639 del idioma de origen.
+            destino (str): El código ISO 639 del idioma de destino.
+
+        Raises:
+            ValueError: Si no existe un paquete de Argos Translate para el par de idiomas.
+
+        Returns:
+            object: La traducción de Argos Translate, con el método translate.
+
+        Notas:
+        - Para traducir debe usarse usar, para que el modelo no se libere mientras se usa.
+        """
+
+        clave = (origen, destino)
+
+        with self.candado:
+
+            if clave in self.modelos:
+                self.modelos.move_to_end(clave)
+                anotar(modelo_en_cache=True)
+                return self.modelos[clave]
+
+            # Esperar la carga que inició otro hilo, o iniciarla
+            futuro = self.cargando.get(clave)
+            propio = futuro is None
+
+            if propio:
+                futuro = Future()
+                self.cargando[clave] = futuro
+
+        anotar(modelo_en_cache=False)
+
+        if not propio:
+            return futuro.result()
+
+        try:
+            traduccion = self.cargar(origen, destino)
+        except BaseException as e:
+            with self.candado:
+                del self.cargando[clave]
+
+            futuro.set_exception(e)
+            raise
+
+        with self.candado:
+            del self.cargando[clave]
+            self.modelos[clave] = traduccion
+            self.expulsados.pop(clave, None)
+            contar("modelos.cargados")
+
+            # Expulsar los modelos usados hace más tiempo
+            while len(self.modelos) > self.maximo:
+                expulsada, modelo = self.modelos.popitem(last=False)
+                contar("modelos.expulsados")
+
+                if self.usos[expulsada]:
+                    self.expulsados[expulsada] = modelo
+                else:
+                    liberar_traduccion(modelo)
+
+        futuro.set_result(traduccion)
+
+        return traduccion
+
+    @contextmanager
+    def usar(self, origen, destino):
+        """
+        Obtiene el modelo de traducción de un par de idiomas (ver obtener) y evita que se libere mientras se usa.
+
+        Yields:
+            object: La traducción de Argos Translate, con el método translate.
+        """
+
+        clave = (origen, destino)
+
+        while True:
+            traduccion = self.obtener(origen, destino)
+
+            # Otro hilo pudo expulsar el modelo después de obtenerlo: volver a cargarlo
+            with self.candado:
+                if self.modelos.get(clave) is traduccion:
+                    self.usos[clave] = self.usos[clave] + 1
+                    break
+
+        try:
+            yield traduccion
+        finally:
+            with self.candado:
+                self.usos[clave] = self.usos[clave] - 1
+
+                # Liberar el modelo si se expulsó mientras se usaba y ya nadie lo usa
+                if not self.usos[clave]:
+                    del self.usos[clave]
+
+                    if clave in self.expulsados:
+                        liberar_traduccion(self.expulsados.pop(clave))
+
+    def cargar(self, origen, destino):
+        """
+        Carga la traducción de un par de idiomas, instalando su paquete si no está instalado.
+        """
+
+        import argostranslate.package
+        import argostranslate.translate
+
+        traduccion = buscar_traduccion(origen, destino)
+
+        if traduccion is None:
+
+            argostranslate.package.update_package_index()
+
+            if not argostranslate.package.install_package_for_language_pair(origen, destino):
+                raise ValueError(f"No existe un paquete de traducción de '{origen}' a '{destino}'.")
+
+            # Argos Translate guarda en caché los idiomas instalados
+            argostranslate.translate.get_installed_languages.cache_clear()
+            traduccion = buscar_traduccion(origen, destino)
+
+            if traduccion is None:
+                raise ValueError(f"No se pudo cargar la traducción de '{origen}' a '{destino}'.")
+
+        return traduccion
+
+def buscar_traduccion(origen, destino):
+    """
+    Busca una traducción instalada de Argos Translate entre dos idiomas.
+
+    Returns:
+        object: La traducción, o None si alguno de los idiomas o la traducción no están instalados.
+    """
+
+    import argostranslate.translate
+
+    idiomas = {idioma.code: idioma for idioma in argostranslate.translate.get_installed_languages()}
+
+    if origen not in idiomas or destino not in idiomas:
+        return None
+
+    return idiomas[origen].get_translation(idiomas[destino])
+
+def liberar_traduccion(traduccion):
+    """
+    Libera el modelo cargado de una traducción de Argos Translate (se vuelve a cargar si se usa otra vez).
+    """
+
+    # Las traducciones con caché envuelven a la traducción que tiene el modelo
+    while traduccion is not None:
+        if hasattr(traduccion, "translator"):
+            traduccion.translator = None
+        traduccion = getattr(traduccion, "underlying", None)
+
+class RegistroModelos:
+    """
+    Registro de los modelos de análisis de sentimientos y de traducción, que se construyen una sola vez por proceso.
+
+    Notas:
+    - Los analizadores de sentimientos se comparten entre solicitudes (solo se leen al analizar).
+    - precargar construye los modelos antes de crear los procesos de trabajo (ver gunicorn.conf.py), para que sus
+    páginas de memoria se compartan entre procesos (copy-on-write).
+    - Los traductores de CTranslate2 crean hilos propios y no sobreviven a un fork, por lo que en el proceso padre
+    solo se cargan los idiomas de Argos Translate; calentar carga los traductores en cada proceso de trabajo.
+    """
+
+    def __init__(self, max_traducciones):
+        self.candado = threading.Lock()
+        self.vader = None
+        self.lexico_es = AnalizadorSentimientoEs()
+        self.traducciones = PoolTraducciones(max_traducciones)
+        self.precarga = "pendiente"
+        self.calentado = False
+        self.error = None
+        self.tiempos = {}
+
+    def analizadores(self):
+        """
+        Obtiene los analizadores de sentimientos de cada motor, construyéndolos si es la primera vez.
+
+        Returns:
+            dict: Un diccionario {motor: analizador} con el analizador de VADER (Valence Aware Dictionary and
+            sEntiment Reasoner) en inglés ("vader") y el analizador con léxico en español ("lexico_es").
+        """
+
+        if self.vader is None:
+            with self.candado:
+                if self.vader is None:
+                    inicio = time.perf_counter()
+                    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                    self.vader = SentimentIntensityAnalyzer()
+                    self.tiempos["vader"] = round(time.perf_counter() - inicio, 3)
+
+        return {"vader": self.vader, "lexico_es": self.lexico_es}
+
+    def traduccion(self, origen, destino):
+        """
+        Obtiene la traducción de un par de idiomas (ver PoolTraducciones.obtener).
+        """
+
+        return self.traducciones.obtener(origen, destino)
+
+    def precargar(self, pares=None, calentar=True):
+        """
+        Construye los analizadores de sentimientos y carga las traducciones de los pares de idiomas indicados.
+
+        Args:
+            pares (list): Los pares (origen, destino) a cargar, o None para cargar solo el de español a inglés.
+            calentar (bool): Si se cargan también los traductores (no debe hacerse antes de un fork).
+
+        Notas:
+        - Los errores se guardan en el estado del registro en vez de lanzarse, para que las rutas que no analizan
+        comentarios sigan disponibles.
+        """
+
+        self.precarga = "en_curso"
+
+        try:
+
+            self.analizadores()
+
+            for origen, destino in (pares or [("es", "en")]):
+                inicio = time.perf_counter()
+                self.traduccion(origen, destino)
+                self.tiempos[f"{origen}-{destino}"] = round(time.perf_counter() - inicio, 3)
+
+            if calentar:
+                self.calentar()
+
+            self.precarga = "lista"
+
+        except Exception as e:
+            self.precarga = "error"
+            self.error = str(e)
+
+    def calentar(self):
+        """
+        Traduce una frase con cada traducción cargada, para que sus traductores se carguen antes de la primera
+        solicitud.
+        """
+
+        for origen, destino in list(self.traducciones.modelos):
+            inicio = time.perf_counter()
+
+            with self.traducciones.usar(origen, destino) as traduccion:
+                traduccion.translate("hola")
+            self.tiempos[f"calentar {origen}-{destino}"] = round(time.perf_counter() - inicio, 3)
+
+        self.calentado = True
+
+    def estado(self):
+        """
+        Obtiene el estado de los modelos del registro.
+
+        Returns:
+            dict: El estado de la precarga ("pendiente", "en_curso", "lista" o "error"), el error si lo hubo, si los
+            traductores están calentados, si VADER está construido, las traducciones cargadas y el tiempo de carga
+            de cada modelo en segundos.
+        """
+
+        return {
+            "precarga": self.precarga,
+            "error": self.error,
+            "calentado": self.calentado,
+            "vader": self.vader is not None,
+            "traducciones": [f"{origen}-{destino}" for origen, destino in self.traducciones.modelos],
+            "tiempos": dict(self.tiempos),
+        }
+
+# modelos de análisis de sentimientos y de traducción del proceso (compartidos por todas las aplicaciones)
+registro_modelos = RegistroModelos(CONFIGURACION_PREDETERMINADA["MAX_MODELOS_TRADUCCION"])
+
+
+
+
+
+
+
+# Funciones para guardar las matrices de evaluación como bloques binarios compactos
+def codificar_matriz(matriz):
+    """
+    Convierte una matriz numérica en un bloque binario compacto, si la opción MATRICES_COMPACTAS está activada.
+
+    Args:
+        matriz (list | FilasSubida): Una matriz de enteros (lista de listas), con la fila de referencias o pesos
+        incluida.
+
+    Returns:
+        dict | list: Un diccionario con el tipo de los enteros ("tipo"), la forma de la matriz ("forma") y sus bytes
+        en base64 ("datos"); o la misma matriz si la opción está desactivada, si la matriz no es rectangular o si
+        contiene valores que no son enteros.
+
+    Notas:
+    - Las filas se recorren dos veces (para validarlas y para copiarlas al bloque) sin crear una lista con todas,
+    de modo que las filas de una subida por partes se leen de sus archivos.
+    """
+
+    if not current_app.config["MATRICES_COMPACTAS"] or not matriz:
+        return matriz
+
+    # Solo se compactan las matrices rectangulares de enteros
+    columnas = len(matriz[0])
+    minimo = maximo = None
+
+    for fila in matriz:
+        if len(fila) != columnas or any(type(e) is not int for e in fila):
+            return matriz
+
+        if fila:
+            minimo = min(fila) if minimo is None else min(minimo, min(fila))
+            maximo = max(fila) if maximo is None else max(maximo, max(fila))
+
+    # Elegir el tipo entero más pequeño que puede representar todos los valores
+    minimo = 0 if minimo is None else minimo
+    maximo = 0 if maximo is None else maximo
+
+    for tipo in TIPOS_COMPACTOS:
+        limites = np.iinfo(np.dtype(tipo))
+        if limites.min <= minimo and maximo <= limites.max:
+            break
+    else:
+        return matriz
+
+    forma = (len(matriz), columnas)
+    arreglo = np.fromiter(itertools.chain.from_iterable(matriz), dtype=tipo, count=forma[0] * forma[1])
+
+    return {
+        "tipo": tipo,
+        "forma": list(forma),
+        "datos": base64.b64encode(arreglo.tobytes()).decode("ascii"),
+    }
+
+def cargar_matriz(valor):
+    """
+    Obtiene una matriz guardada como un arreglo de numpy, sin crear un objeto por cada valor.
+
+    Args:
+        valor (dict | list): La matriz tal como está guardada en "evaluaciones" (compacta o como lista de listas).
+
+    Returns:
+        numpy.ndarray: La matriz. Si está guardada en forma compacta, el arreglo es una vista de solo lectura sobre
+        los bytes decodificados, sin copias adicionales.
+    """
+
+    # Las matrices compactas solo se decodifican al pedirlas
+    if isinstance(valor, dict):
+        datos = base64.b64decode(valor["datos"])
+        return np.frombuffer(datos, dtype=valor["tipo"]).reshape(valor["forma"])
+
+    return np.asarray(valor)
+
+def matriz_a_lista(valor):
+    """
+    Obtiene una matriz guardada como lista de listas, que es la forma en que la API la recibe y la devuelve.
+
+    Args:
+        valor (dict | list): La matriz tal como está guardada en "evaluaciones" (compacta o como lista de listas).
+
+    Returns:
+        list: La matriz como lista de listas.
+    """
+
+    if isinstance(valor, dict):
+        return cargar_matriz(valor).tolist()
+
+    return valor
+
+def filas_matriz(valor):
+    """
+    Obtiene las filas de una matriz guardada en la forma que reciben las funciones calcular_*.
+
+    Args:
+        valor (dict | list): La matriz tal como está guardada en "evaluaciones" (compacta o como lista de listas).
+
+    Returns:
+        FilasArreglo | list: Las filas sobre la vista de numpy de una matriz compacta, o la misma lista.
+    """
+
+    return FilasArreglo(cargar_matriz(valor)) if isinstance(valor, dict) else valor
+
+class FilasArreglo:
+    """
+    Filas de una matriz compacta, convertidas a listas de enteros de una en una a medida que se recorren.
+
+    Se comporta como la lista de filas que reciben las funciones calcular_* (igual que FilasSubida), de modo que los
+    cálculos usan directamente la vista de numpy de cargar_matriz sin expandir la matriz completa a listas. Cada
+    valor se calcula igual que con una lista de listas, para obtener los mismos resultados.
+    """
+
+    def __init__(self, arreglo):
+        self.arreglo = arreglo
+
+    def __iter__(self):
+        return (fila.tolist() for fila in self.arreglo)
+
+    def __len__(self):
+        return len(self.arreglo)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return FilasArreglo(self.arreglo[indice])
+
+        return self.arreglo[indice].tolist()
+
+
+
+
+
+
+
+# Rutas de la API REST para obtener datos de la base de datos a través de solicitudes HTTP
+
+@rutas.route('/obtener_soft', methods=['POST'])
+def obtener_soft():
+    """
+    Obtiene un software de la base de datos.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Un software con el ID especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado, y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener el software con el ID especificado, ya serializado o de la base de datos
+    response = respuesta_guardada("obtener_soft", id_soft, lambda: softwares.get(Query().id_soft == id_soft))
+
+    # Verificar si el software existe en la base de datos
+    if response is None:
+        response = {"error": "No existe un software con el ID especificado"}
+        return jsonify(response), 404
+
+    # Retornar el software en formato JSON
+    return response, 200
+
+
+
+@rutas.route('/obtener_estadisticas', methods=['POST'])
+def obtener_estadisticas():
+    """
+    Obtiene las estadísticas por columna (tarea o pregunta) de las evaluaciones de un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Un diccionario con las claves "tareas", "tiempos", "puntajes" y "comentarios". Cada una contiene una lista con
+    la media, el mínimo, el máximo y la desviación estándar de cada columna; en "comentarios" estas se dan para cada
+    polaridad ("neg", "neu", "pos" y "comp").
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    - Las estadísticas se calculan al guardar las evaluaciones, por lo que aquí solo se leen.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado, y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener las estadísticas del software especificado
+    estadistica = estadisticas.get(Query().id_soft == id_soft)
+
+    # Verificar si se encontraron estadísticas para el software especificado
+    if not estadistica:
+        response = {"error": "No se encontraron estadísticas para el software especificado"}
+        return jsonify(response), 404
+
+    return jsonify({
+        "tareas": estadistica.get("tareas", []),
+        "tiempos": estadistica.get("tiempos", []),
+        "puntajes": estadistica.get("puntajes", []),
+        "comentarios": estadistica.get("comentarios", [])
+    }), 200
+
+
+
+@rutas.route('/calcular_intervalos', methods=['POST'])
+def calcular_intervalos_soft():
+    """
+    Calcula los intervalos de confianza bootstrap de las métricas de un software.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1,
+        "remuestreos": 10000,
+        "confianza": 0.95,
+        "semilla": 42
+    }
+
+    Valor de retorno:
+    Los intervalos calculados para cada métrica ("eficacia", "eficiencia", "satisfaccion_pun", "satisfaccion_com",
+    "satisfaccion" y "usabilidad"), con los límites "inferior" y "superior".
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud; los demás son opcionales.
+    - "remuestreos" no puede superar MAX_REMUESTREOS, y "semilla" debe ser un entero no negativo.
+    - Los intervalos también quedan guardados en el campo "intervalos" del software, hasta que cambie alguna de sus
+    métricas.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado, y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Verificar si el id_soft existe en la base de datos
+    if not softwares.contains(doc_id=id_soft):
+        return jsonify({"error": f"No se encontró el id_soft {id_soft} en la base de datos"}), 404
+
+    try:
+
+        intervalos = calcular_intervalos(
+            id_soft,
+            remuestreos=request.json.get("remuestreos", 10000),
+            confianza=request.json.get("confianza", 0.95),
+            semilla=request.json.get("semilla")
+        )
+
+    except ValueError as e:
+        return jsonify({"error: ": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error inesperado: ": str(e)}), 500
+
+    return jsonify(intervalos), 200
+
+
+
+@rutas.route('/obtener_val_tareas', methods=['POST'])
+def obtener_val_tareas():
+    """
+    Obtiene las tareas asociadas a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de tareas asociadas al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado, y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener la evaluación del software especificado, o su respuesta ya serializada
+    def obtener():
+        evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+        return matriz_a_lista(evaluacion["tareas"]) if evaluacion else None
+
+    response = respuesta_guardada("obtener_val_tareas", id_soft, obtener)
+
+    # Verificar si se encontraron tareas para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron tareas para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+@rutas.route('/obtener_val_tiempos', methods=['POST'])
+def obtener_val_tiempos():
+    """
+    Obtiene los tiempos asociados a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de tiempos asociados al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener la evaluación asociada al software especificado, o su respuesta ya serializada
+    def obtener():
+        evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+        return matriz_a_lista(evaluacion["tiempos"]) if evaluacion else None
+
+    response = respuesta_guardada("obtener_val_tiempos", id_soft, obtener)
+
+    # Verificar si se encontraron tiempos para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron tiempos para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+@rutas.route('/obtener_val_puntajes', methods=['POST'])
+def obtener_val_puntajes():
+    """
+    Obtiene los puntajes asociados a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de puntajes asociados al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener la evaluación asociada al software especificado, o su respuesta ya serializada
+    def obtener():
+        evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+        return matriz_a_lista(evaluacion["puntajes"]) if evaluacion else None
+
+    response = respuesta_guardada("obtener_val_puntajes", id_soft, obtener)
+
+    # Verificar si se encontraron puntajes para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron puntajes para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+@rutas.route('/obtener_val_comentarios', methods=['POST'])
+def obtener_val_comentarios():
+    """
+    Obtiene los comentarios asociados a un software específico.
 
-        for e in comentario:
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
 
-            polaridad = {}
+    Valor de retorno:
+    Una lista de comentarios asociados al software especificado.
 
-            # Validar si los valores son cadena de texto
-            if not isinstance(e, str):
-                raise ValueError("Los valores de las comentarios deben ser cadenas de texto.")
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
 
-            # Traducir el comentario al inglés
-            comentario_traducido = traducir_comentario_argos(e)
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
 
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
 
-            # Calcular el nivel de satisfacción de cada comentario
-            puntaje = analizador.polarity_scores(comentario_traducido)
+    # Obtener la evaluación asociada al software especificado, o su respuesta ya serializada
+    def obtener():
+        evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+        return evaluacion["comentarios"] if evaluacion else None
 
-            # Obtener polaridad del comentario
-            valor_neg = puntaje['neg']
-            valor_neu = puntaje['neu']
-            valor_pos = puntaje['pos']
-            valor_compuesto = puntaje['compound']
+    response = respuesta_guardada("obtener_val_comentarios", id_soft, obtener)
 
-            # Convertir la polaridad a porcentaje
-            porc_neg = valor_neg * 100
-            porc_neu = valor_neu * 100
-            porc_pos = valor_pos * 100
-            porc_comp = round(((valor_compuesto + 1) / 2) * 100)
+    # Verificar si se encontraron comentarios para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron comentarios para el software especificado"}
+        return jsonify(response), 404
 
-            # Guardar cada porcentaje en un diccionario luego de multiplicarlo por el peso
-            polaridad['neg'] = round((porc_neg * pesos[cont]))
-            polaridad['neu'] = round((porc_neu * pesos[cont]))
-            polaridad['pos'] = round((porc_pos * pesos[cont]))
-            polaridad['comp'] = round((porc_comp * pesos[cont]))
+    return response
 
-            valores_neg.append(polaridad['neg'])
-            valores_neu.append(polaridad['neu'])
-            valores_pos.append(polaridad['pos'])
-            valores_comp.append(polaridad['comp'])
-            cont = cont + 1
+@rutas.route('/obtener_res_tareas', methods=['POST'])
+def obtener_res_tareas():
+    """
+    Obtiene los resultados de las tareas asociadas a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de los cálculos hechos con las tareas asociadas al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener los resultados del software especificado, o su respuesta ya serializada
+    def obtener():
+        resultado = resultados.get(Query().id_soft == id_soft)
+        return resultado["tareas"] if resultado else None
+
+    response = respuesta_guardada("obtener_res_tareas", id_soft, obtener)
+
+    # Verificar si se encontraron tareas para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron tareas para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+@rutas.route('/obtener_res_tiempos', methods=['POST'])
+def obtener_res_tiempos():
+    """
+    Obtiene los resultados de los tiempos asociados a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de los cálculos hechos con los tiempos asociados al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener el resultado del software especificado, o su respuesta ya serializada
+    def obtener():
+        resultado = resultados.get(Query().id_soft == id_soft)
+        return resultado["tiempos"] if resultado else None
+
+    response = respuesta_guardada("obtener_res_tiempos", id_soft, obtener)
+
+    # Verificar si se encontraron tiempos para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron tiempos para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+@rutas.route('/obtener_res_puntajes', methods=['POST'])
+def obtener_res_puntajes():
+    """
+    Obtiene los resultados de los puntajes asociados a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de los cálculos hechos con los puntajes asociados al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener el resultado del software especificado, o su respuesta ya serializada
+    def obtener():
+        resultado = resultados.get(Query().id_soft == id_soft)
+        return resultado["puntajes"] if resultado else None
+
+    response = respuesta_guardada("obtener_res_puntajes", id_soft, obtener)
+
+    # Verificar si se encontraron puntajes para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron puntajes para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+@rutas.route('/obtener_res_comentarios', methods=['POST'])
+def obtener_res_comentarios():
+    """
+    Obtiene los resultados de los comentarios asociados a un software específico.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1
+    }
+
+    Valor de retorno:
+    Una lista de los cálculos hechos con los comentarios asociados al software especificado.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+
+    # Obtener el resultado del software especificado, o su respuesta ya serializada
+    def obtener():
+        resultado = resultados.get(Query().id_soft == id_soft)
+        return resultado["comentarios"] if resultado else None
+
+    response = respuesta_guardada("obtener_res_comentarios", id_soft, obtener)
+
+    # Verificar si se encontraron comentarios para el software especificado
+    if response is None:
+        response = {"error": "No se encontraron comentarios para el software especificado"}
+        return jsonify(response), 404
+
+    return response
+
+
+
+
+
+
+# Rutas de la API para consultar el historial de revisiones de las evaluaciones
+@rutas.route('/listar_revisiones', methods=['POST'])
+def listar_revisiones():
+    """
+    Lista las revisiones guardadas de las matrices de evaluación de un software.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1,
+        "campo": "tareas"
+    }
+
+    Valor de retorno:
+    Una lista con cada revisión ("campo", "revision", "fecha" y las métricas del software después de guardarla,
+    "metricas"), ordenada por campo y revisión.
+
+    Notas:
+    - El campo "id_soft" debe ser proporcionado en la solicitud; sin "campo" se listan las revisiones de todas las
+    matrices.
+    """
+
+    # Verificar si el campo "id_soft" está presente en la solicitud JSON
+    if "id_soft" not in request.json:
+        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
+        return jsonify(response), 400
+
+    # Obtener el ID del software especificado y convertirlo a entero
+    id_soft = int(request.json["id_soft"])
+    campo = request.json.get("campo")
+
+    if campo is not None and campo not in CAMPOS_EVALUACION:
+        response = {"error": f"Campo no válido. Use uno de: {', '.join(CAMPOS_EVALUACION)}"}
+        return jsonify(response), 400
+
+    condicion = Query().id_soft == id_soft
+
+    if campo is not None:
+        condicion = condicion & (Query().campo == campo)
+
+    revisiones = sorted(historial.search(condicion), key=lambda r: (r["campo"], r["revision"]))
+
+    return jsonify([
+        {"campo": r["campo"], "revision": r["revision"], "fecha": r["fecha"], "metricas": r["metricas"]}
+        for r in revisiones
+    ])
+
+@rutas.route('/obtener_revision', methods=['POST'])
+def obtener_revision():
+    """
+    Obtiene una revisión de una matriz de evaluación de un software, con las métricas del software en ese momento.
+
+    Entrada (request JSON):
+    {
+        "id_soft": 1,
+        "campo": "tareas",
+        "revision": 3
+    }
+
+    Valor de retorno:
+    La revisión ("campo", "revision", "fecha", "metricas" y "matriz"), o un error 404 si no existe.
+    """
+
+    r = request.json
+
+    # Verificar si los campos están presentes en la solicitud JSON
+    if "id_soft" not in r or "campo" not in r or "revision" not in r:
+        response = {"error": "Campos 'id_soft', 'campo' y 'revision' faltantes en la solicitud"}
+        return jsonify(response), 400
+
+    if r["campo"] not in CAMPOS_EVALUACION:
+        response = {"error": f"Campo no válido. Use uno de: {', '.join(CAMPOS_EVALUACION)}"}
+        return jsonify(response), 400
+
+    revision = reconstruir_revision(int(r["id_soft"]), r["campo"], int(r["revision"]))
+
+    if revision is None:
+        response = {"error": "No se encontró la revisión para el software especificado"}
+        return jsonify(response), 404
+
+    return jsonify(revision)
+
+
+
+
+
+
+# Rutas de la API para consultar las métricas de la aplicación y el estado de los modelos
+
+@rutas.route('/healthz')
+def healthz():
+    """
+    Indica si el proceso está vivo (sonda de liveness).
+
+    Valor de retorno:
+    Siempre {"estado": "vivo"} con el código 200.
+    """
+
+    return jsonify({"estado": "vivo"}), 200
+
+@rutas.route('/readyz')
+def readyz():
+    """
+    Indica si la aplicación puede atender solicitudes (sonda de readiness).
+
+    Valor de retorno:
+    {"listo": true, "modelos": <bool>} con el código 200 si la base de datos está abierta. El campo "modelos" indica
+    si los modelos de análisis de comentarios están listos. Una réplica devuelve el código 503 hasta que alcanza al
+    servidor principal por primera vez.
+
+    Notas:
+    - Para dirigir las solicitudes de análisis de comentarios solo a las instancias con los modelos cargados se debe
+    usar /readyz/comentarios.
+    """
+
+    # Una réplica está lista cuando alcanzó al principal por primera vez
+    replica = current_app.extensions.get("replica")
+
+    if replica is not None and replica.sincronizada is None:
+        return jsonify({"listo": False, "replica": replica.estado()}), 503
+
+    return jsonify({"listo": True, "modelos": registro_modelos.precarga == "lista"}), 200
+
+@rutas.route('/readyz/comentarios')
+def readyz_comentarios():
+    """
+    Indica si la aplicación puede analizar comentarios (sonda de readiness para /guardar_comentarios).
+
+    Valor de retorno:
+    El estado del registro de modelos, con el código 200 si la precarga terminó o 503 en caso contrario.
+    """
+
+    estado = registro_modelos.estado()
+    codigo = 200 if estado["precarga"] == "lista" else 503
+
+    return jsonify(estado), codigo
+
+@rutas.route('/estado_modelos')
+def estado_modelos():
+    """
+    Obtiene el estado de los modelos de análisis de sentimientos y de traducción.
+
+    Valor de retorno:
+    El estado del registro de modelos (ver RegistroModelos.estado).
+    """
+
+    return jsonify(registro_modelos.estado()), 200
+
+@rutas.route('/cambios')
+def cambios():
+    """
+    Obtiene los cambios guardados posteriores a una revisión, para las réplicas.
+
+    Parámetros de la URL:
+    - desde: La revisión desde la que se leen los cambios (0 para leer desde el comienzo).
+    - limite: La cantidad máxima de cambios (por defecto, CAMBIOS_POR_LECTURA).
+
+    Valor de retorno:
+    {"cambios": [...], "revision": <revisión después del último cambio>, "ultima": <revisión actual>,
+    "instantanea": <bool>}, con el código 404 si el registro de cambios está desactivado (REGISTRO_CAMBIOS). Si
+    "instantanea" es true, los cambios son la instantánea del registro y reemplazan a todos los softwares (ver
+    leer_cambios).
+    """
+
+    registro = current_app.extensions["registro_cambios"]
 
-        porcentaje_usuario['neg'] = round((sum(valores_neg) / sum(pesos)))
-        porcentaje_usuario['neu'] = round((sum(valores_neu) / sum(pesos)))
-        porcentaje_usuario['pos'] = round((sum(valores_pos) / sum(pesos)))
-        porcentaje_usuario['comp'] = round((sum(valores_comp) / sum(pesos)))
+    if registro is None:
+        return jsonify({"error": "El registro de cambios está desactivado"}), 404
 
-        comentarios_usuarios.append(porcentaje_usuario)
+    try:
 
-    # Calcular la satisfacción promedio con los comentarios
-    suma = sum(c['comp'] for c in comentarios_usuarios)
-    cant = len(comentarios_usuarios)
-    comentarios_porcentaje = round(suma / cant)
+        desde = int(request.args.get("desde", 0))
+        limite = int(request.args.get("limite", current_app.config["CAMBIOS_POR_LECTURA"]))
+        lista, revision, ultima, instantanea = leer_cambios(registro.ruta, desde, limite)
 
-    # Actualizar los resultados en la base de datos
-    resultados.update({"comentarios": comentarios_usuarios}, Query().id_soft == id_soft)
-    softwares.update({"satisfaccion_com": comentarios_porcentaje}, Query().id_soft == id_soft)
+    except ValueError as e:
+        return jsonify({"error: ": str(e)}), 400
 
-    # Calcular la satisfacción general
-    calcular_satisfaccion(id_soft)
+    return jsonify({"cambios": lista, "revision": revision, "ultima": ultima, "instantanea": instantanea}), 200
 
-def calcular_satisfaccion(id_soft):
+@rutas.route('/estado_replica')
+def estado_replica():
     """
-    Calcula la satisfacción de un software basado en dos valores: "satisfaccion_pun" y "satisfaccion_com".
-
-    Parámetros:
-    - id_soft: ID del software para calcular la satisfacción.
+    Obtiene el estado de la replicación.
 
     Valor de retorno:
-    No hay valor de retorno explícito.
+    En una réplica, su estado (ver Replica.estado). En el servidor principal, {"modo": "principal", "revision": ...}
+    con la revisión actual del registro de cambios (None si está desactivado).
+    """
 
-    Notas:
-    - Los valores "satisfaccion_pun" y "satisfaccion_com" deben estar en un rango específico y formato esperado.
-    - El valor `SIN_VALOR` se utiliza para indicar una falta de datos en la satisfacción.
+    replica = current_app.extensions.get("replica")
+
+    if replica is not None:
+        return jsonify(replica.estado()), 200
+
+    registro = current_app.extensions["registro_cambios"]
+
+    return jsonify({"modo": "principal", "revision": registro.revision() if registro else None}), 200
+
+@rutas.route('/metricas')
+def obtener_metricas():
     """
+    Obtiene los contadores de las métricas de la aplicación.
 
-    puntuacion_satisfaccion = softwares.get(Query().id_soft == id_soft)["satisfaccion_pun"]
-    comentario_satisfaccion = softwares.get(Query().id_soft == id_soft)["satisfaccion_com"]
+    Valor de retorno:
+    Un diccionario {contador: valor}. Por ejemplo, "idioma.es" cuenta los comentarios detectados en español,
+    "ruta.directa", "ruta.lexico_es" y "ruta.traduccion" cuentan cómo se analizó cada comentario, y
+    "modelos.cargados" y "modelos.expulsados" cuentan los modelos de traducción cargados y liberados.
+    """
 
-    # Verificar si falta algún valor de satisfacción
-    if puntuacion_satisfaccion == SIN_VALOR or comentario_satisfaccion == SIN_VALOR:
-        softwares.update({"satisfaccion": SIN_VALOR}, Query().id_soft == id_soft)
-    else:
-        # Calcular la satisfacción promedio y redondear al entero más cercano
-        satisfaccion_promedio = round((puntuacion_satisfaccion + comentario_satisfaccion) / 2)
-        softwares.update({"satisfaccion": satisfaccion_promedio}, Query().id_soft == id_soft)
+    with candado_metricas:
+        return jsonify(dict(metricas)), 200
 
-    # Actualizar el estado de análisis del software
-    es_analizado(id_soft)
 
 
 
 
 
+# Rutas de la API y comandos para exportar las evaluaciones y los resultados por bloques
 
-# Función para actualizar el estado de análisis de un software en la base de datos
-def es_analizado(id_soft):
+@rutas.route('/exportar', methods=['POST'])
+def exportar():
     """
-    Actualiza el campo 'usabilidad' de un software basado en los valores de 'eficacia', 'eficiencia' y 'satisfaccion'.
+    Exporta los softwares con sus evaluaciones y resultados como un flujo de bloques CSV, Parquet o Arrow.
 
-    Parámetros:
-    - id_soft: ID del software a ser analizado.
+    Entrada (request JSON, todos los campos son opcionales):
+    {
+        "formato": "csv",
+        "ids": [1, 2, 3],
+        "cursor": 0,
+        "limite": 500
+    }
 
     Valor de retorno:
-    No hay valor de retorno explícito.
+    Un flujo con una fila por valor, con las columnas de COLUMNAS_EXPORTACION. El campo "origen" indica si el valor
+    proviene del software ("software"), de una evaluación ("evaluacion") o de un resultado ("resultado").
 
     Notas:
-    - Los valores 'eficacia', 'eficiencia' y 'satisfaccion' deben estar en un rango específico y formato esperado.
-    - El valor 'SIN_VALOR' se utiliza para indicar una falta de datos en las métricas.
+    - "formato" puede ser "csv", "parquet" o "arrow" (flujo IPC); los dos últimos requieren pyarrow.
+    - Sin "ids" se exportan todos los softwares, en orden ascendente de id_soft.
+    - Solo se exportan los softwares con id_soft mayor que "cursor". Con "limite", la cabecera
+    "X-Cursor-Siguiente" indica el cursor para continuar la exportación, si faltan softwares.
+    - Las filas de un software se escriben juntas, por lo que una exportación interrumpida puede reanudarse
+    usando como cursor el último id_soft recibido completo.
     """
 
-    eficacia = softwares.get(Query().id_soft == id_soft)["eficacia"]
-    eficiencia = softwares.get(Query().id_soft == id_soft)["eficiencia"]
-    satisfaccion = softwares.get(Query().id_soft == id_soft)["satisfaccion"]
+    r = request.get_json(silent=True) or {}
 
-    # Verificar si todas las métricas tienen valores válidos
-    if eficacia > SIN_VALOR and eficiencia > SIN_VALOR and satisfaccion > SIN_VALOR:
+    formato = r.get("formato", "csv")
 
-        # Calcular la usabilidad promedio y redondear al entero más cercano
-        usabilidad = round((eficacia + eficiencia + satisfaccion) / 3)
-
-        # Actualizar el campo 'usabilidad' del software
-        softwares.update({"usabilidad": usabilidad}, Query().id_soft == id_soft)
+    # Validar el formato solicitado
+    if formato not in FORMATOS_EXPORTACION:
+        response = {"error": f"Formato no soportado. Use uno de: {', '.join(FORMATOS_EXPORTACION)}"}
+        return jsonify(response), 400
 
-        # Actualizar el estado de análisis del software
-        softwares.update({"analizado": True}, Query().id_soft == id_soft)
+    try:
 
+        ids, cursor_siguiente = seleccionar_ids_exportacion(r.get("ids"), r.get("cursor", 0), r.get("limite"))
+        bloques = generar_exportacion(ids, formato)
 
+    except (TypeError, ValueError) as e:
+        return jsonify({"error: ": str(e)}), 400
 
+    response = Response(stream_with_context(bloques), mimetype=FORMATOS_EXPORTACION[formato])
+    response.headers["Content-Disposition"] = f"attachment; filename=exportacion.{formato}"
 
+    if cursor_siguiente is not None:
+        response.headers["X-Cursor-Siguiente"] = str(cursor_siguiente)
 
+    return response
 
-#Función para traducir comentarios de español a inglés usando Argos Translate
-def traducir_comentario_argos(comentario):
+@rutas.route('/eventos')
+def eventos():
     """
-    Traduce un comentario del español al inglés usando Argos Translate.
+    Envía los cambios guardados en la base de datos como un flujo de eventos (Server-Sent Events).
 
-    Args:
-        comentario (str): El comentario en español.
+    Parámetros de la URL (opcionales):
+    - id_soft: Solo enviar los eventos de estos softwares (puede repetirse).
+    - desde: El ID del último evento recibido, si el cliente no puede enviar la cabecera Last-Event-ID.
 
-    Returns:
-        str: El comentario traducido al inglés.
+    Cada evento tiene el ID en orden ("id"), el tipo de cambio ("event": "nuevo_soft", "eliminar_soft",
+    "restaurar_soft", "metricas" o "intervalos") y un JSON con el id_soft y los valores que cambiaron ("data"), p. ej.:
+
+        id: 42
+        event: metricas
+        data: {"id_soft": 1, "datos": {"satisfaccion_com": 43, "usabilidad": 88, "analizado": true}}
+
+    Notas:
+    - Con la cabecera Last-Event-ID (que EventSource envía al reconectarse) se reanuda el flujo desde ese evento.
+    Si ya no está disponible se envía el evento "reinicio": el cliente debe volver a leer los datos.
+    - Cada ESPERA_EVENTOS segundos sin eventos se envía un comentario, para mantener abierta la conexión.
+    - Si otro proceso (p. ej. un comando) modifica la base de datos, se envía el evento "reinicio" en las
+    siguientes ESPERA_EVENTOS segundos, porque esos cambios no tienen eventos.
     """
+
     try:
-        # Traducir el comentario
-        com_traducido = argostranslate.translate.translate(comentario, "es", "en")
-        return com_traducido
-    except Exception as e:
-        raise ValueError(f"Error al traducir el comentario: {str(e)}")
 
+        ids = {int(id_soft) for id_soft in request.args.getlist("id_soft")}
+        desde = int(request.headers.get("Last-Event-ID") or request.args.get("desde") or 0)
 
+    except ValueError as e:
+        return jsonify({"error: ": str(e)}), 400
 
+    bus = current_app.extensions["eventos"]
+    espera = current_app.config["ESPERA_EVENTOS"]
 
+    # Sin ID previo, el cliente solo recibe los eventos publicados desde que se conecta
+    if "Last-Event-ID" not in request.headers and "desde" not in request.args:
+        desde = bus.ultimo
 
+    almacen = base_de_datos_actual().storage
+    flujo = generar_eventos(bus, desde, ids, espera, inquilino_actual(), almacen)
 
+    return Response(flujo, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-# Rutas de la API REST para obtener datos de la base de datos a través de solicitudes HTTP
+def cambios_externos_sin_esperar(almacen):
+    """
+    Cuenta los cambios de una base de datos hechos por otros procesos (ver AlmacenTransaccional.cambios_externos),
+    sin esperar el candado.
 
-@app.route('/obtener_soft', methods=['POST'])
-def obtener_soft():
+    Returns:
+        tuple: Las cantidades de cambios, o None si no hay almacenamiento o el candado está tomado (p. ej. durante
+        una transacción).
     """
-    Obtiene un software de la base de datos.
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    if almacen is None or not almacen.candado.acquire(blocking=False):
+        return None
 
-    Valor de retorno:
-    Un software con el ID especificado.
+    try:
+        return almacen.cambios_externos()
+    finally:
+        almacen.candado.release()
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+def generar_eventos(bus, desde, ids, espera, inquilino=None, almacen=None):
     """
+    Genera los mensajes del flujo de eventos (ver la ruta /eventos).
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+    Args:
+        bus (BusEventos): Los eventos de la aplicación.
+        desde (int): El ID del último evento recibido por el cliente.
+        ids (set): Los ID de los softwares cuyos eventos se envían (vacío para enviar todos).
+        espera (float): Segundos entre mensajes de keep-alive.
+        inquilino (str): El inquilino cuyos eventos se envían (None para los de la base de datos de la aplicación).
+        almacen (AlmacenTransaccional): El almacenamiento de la base de datos, para detectar los cambios de otros
+        procesos (None para no detectarlos).
+
+    Yields:
+        str: Los mensajes en el formato de Server-Sent Events.
+    """
 
-    # Obtener el ID del software especificado, y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    externos = cambios_externos_sin_esperar(almacen)
 
-    # Obtener un software de la base de datos con el ID especificado
-    soft = softwares.get(Query().id_soft == id_soft)
+    yield f"retry: {int(espera * 1000)}\n\n"
 
-    # Verificar si el software existe en la base de datos
-    if soft is None:
-        response = {"error": "No existe un software con el ID especificado"}
-        return jsonify(response), 404
+    while True:
+        nuevos = bus.esperar(desde, espera)
 
-    # Retornar el software en formato JSON
-    return jsonify(soft), 200
+        # Otro proceso modificó la base de datos: el cliente debe volver a leer los datos
+        actuales = cambios_externos_sin_esperar(almacen)
 
+        if actuales is not None:
+            if externos is not None and actuales != externos:
+                yield f"id: {desde}\nevent: reinicio\ndata: {{}}\n\n"
 
+            externos = actuales
 
-@app.route('/obtener_val_tareas', methods=['POST'])
-def obtener_val_tareas():
-    """
-    Obtiene las tareas asociadas a un software específico.
+        # El cliente perdió eventos: debe volver a leer los datos y continuar desde el último evento
+        if nuevos is None:
+            desde = bus.ultimo
+            yield f"id: {desde}\nevent: reinicio\ndata: {{}}\n\n"
+            continue
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+        if not nuevos:
+            yield ": keep-alive\n\n"
+            continue
 
-    Valor de retorno:
-    Una lista de tareas asociadas al software especificado.
+        for evento in nuevos:
+            desde = evento["id"]
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
-    """
+            if evento["inquilino"] != inquilino or ids and evento["id_soft"] not in ids:
+                continue
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+            datos = json.dumps({"id_soft": evento["id_soft"], "datos": evento["datos"]}, ensure_ascii=False)
+            yield f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
 
-    # Obtener el ID del software especificado, y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+@rutas.cli.command("exportar")
+@click.option("--formato", type=click.Choice(list(FORMATOS_EXPORTACION)), default="csv", help="Formato de salida.")
+@click.option("--ids", default=None, help="IDs de los softwares a exportar, separados por comas.")
+@click.option("--cursor", type=int, default=0, help="Exportar solo los softwares con id_soft mayor que este.")
+@click.option("--limite", type=int, default=None, help="Cantidad máxima de softwares a exportar.")
+@click.option(
+    "--salida", type=click.File("wb"), default="-", help="Archivo de salida (por defecto, la salida estándar)."
+)
+def exportar_cli(formato, ids, cursor, limite, salida):
+    """
+    Exporta los softwares con sus evaluaciones y resultados (ver la ruta /exportar).
+    """
 
-    # Obtener la evaluación del software especificado
-    evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+    if ids is not None:
+        ids = [int(i) for i in ids.split(",") if i.strip()]
 
-    # Verificar si se encontraron tareas para el software especificado
-    if not evaluacion:
-        response = {"error": "No se encontraron tareas para el software especificado"}
-        return jsonify(response), 404
+    ids, cursor_siguiente = seleccionar_ids_exportacion(ids, cursor, limite)
 
-    return evaluacion["tareas"]
+    for bloque in generar_exportacion(ids, formato):
+        salida.write(bloque)
 
-@app.route('/obtener_val_tiempos', methods=['POST'])
-def obtener_val_tiempos():
+    if cursor_siguiente is not None:
+        click.echo(f"Exportación parcial. Continúe con --cursor {cursor_siguiente}", err=True)
+
+def seleccionar_ids_exportacion(ids=None, cursor=0, limite=None):
     """
-    Obtiene los tiempos asociados a un software específico.
+    Selecciona los IDs de los softwares a exportar, en orden ascendente.
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    Args:
+        ids (list): Los IDs solicitados, o None para exportar todos los softwares.
+        cursor (int): Solo se seleccionan los IDs mayores que este valor.
+        limite (int): La cantidad máxima de IDs a seleccionar, o None para no limitarla.
 
-    Valor de retorno:
-    Una lista de tiempos asociados al software especificado.
+    Raises:
+        ValueError: Si el límite no es un entero positivo.
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    Returns:
+        tuple: La lista de IDs seleccionados y el cursor para continuar (None si no faltan softwares).
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+    if limite is not None and (not isinstance(limite, int) or limite < 1):
+        raise ValueError("El límite debe ser un entero positivo.")
 
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    existentes = sorted(soft["id_soft"] for soft in softwares)
 
-    # Obtener la evaluación asociada al software especificado
-    evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+    if ids is not None:
+        solicitados = {int(i) for i in ids}
+        existentes = [i for i in existentes if i in solicitados]
 
-    # Verificar si se encontraron tiempos para el software especificado
-    if not evaluacion:
-        response = {"error": "No se encontraron tiempos para el software especificado"}
-        return jsonify(response), 404
+    seleccionados = [i for i in existentes if i > int(cursor)]
 
-    return evaluacion["tiempos"]
+    if limite is not None and len(seleccionados) > limite:
+        seleccionados = seleccionados[:limite]
+        return seleccionados, seleccionados[-1]
 
-@app.route('/obtener_val_puntajes', methods=['POST'])
-def obtener_val_puntajes():
+    return seleccionados, None
+
+def generar_filas_exportacion(ids):
     """
-    Obtiene los puntajes asociados a un software específico.
+    Genera las filas exportadas de cada software.
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    Args:
+        ids (list): Los IDs de los softwares a exportar.
 
-    Valor de retorno:
-    Una lista de puntajes asociados al software especificado.
+    Yields:
+        tuple: Una fila con los valores de COLUMNAS_EXPORTACION.
 
     Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    - Cada tabla se lee una sola vez por exportación (cada lectura de una tabla lee la base de datos completa), y
+    sus documentos se unen por id_soft.
+    - Los valores se exportan con su tipo original (las métricas, las matrices y los resultados son enteros).
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
-
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
-
-    # Obtener la evaluación asociada al software especificado
-    evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+    seleccionados = set(ids)
 
-    # Verificar si se encontraron puntajes para el software especificado
-    if not evaluacion:
-        response = {"error": "No se encontraron puntajes para el software especificado"}
-        return jsonify(response), 404
+    # Leer los documentos de los softwares seleccionados de una vez en cada tabla
+    softs = {d["id_soft"]: d for d in softwares if d["id_soft"] in seleccionados}
+    evals = {d["id_soft"]: d for d in evaluaciones if d["id_soft"] in seleccionados}
+    ress = {d["id_soft"]: d for d in resultados if d["id_soft"] in seleccionados}
 
-    return evaluacion["puntajes"]
+    for id_soft in ids:
 
-@app.route('/obtener_val_comentarios', methods=['POST'])
-def obtener_val_comentarios():
-    """
-    Obtiene los comentarios asociados a un software específico.
+        soft = softs.get(id_soft)
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+        if soft is None:
+            continue
 
-    Valor de retorno:
-    Una lista de comentarios asociados al software especificado.
+        base = (id_soft, soft["nombre"], soft["version"])
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
-    """
+        # Métricas del software
+        for campo in METRICAS_SOFTWARE:
+            yield base + ("software", campo, None, None, None, soft[campo], None)
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+        # Matrices de evaluación, incluida la fila de referencias o pesos (fila 0)
+        evaluacion = evals.get(id_soft, {})
 
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+        for campo in ("tareas", "tiempos", "puntajes", "comentarios"):
+            for num_fila, fila in enumerate(matriz_a_lista(evaluacion.get(campo, []))):
+                for num_columna, e in enumerate(fila):
+                    if isinstance(e, str):
+                        yield base + ("evaluacion", campo, num_fila, num_columna, None, None, e)
+                    else:
+                        yield base + ("evaluacion", campo, num_fila, num_columna, None, e, None)
 
-    # Obtener la evaluación asociada al software especificado
-    evaluacion = evaluaciones.get(Query().id_soft == id_soft)
+        # Resultados por participante (la fila coincide con la de la matriz de evaluación)
+        resultado = ress.get(id_soft, {})
 
-    # Verificar si se encontraron comentarios para el software especificado
-    if not evaluacion:
-        response = {"error": "No se encontraron comentarios para el software especificado"}
-        return jsonify(response), 404
+        for campo in ("tareas", "tiempos", "puntajes"):
+            for num_fila, e in enumerate(resultado.get(campo, []), start=1):
+                yield base + ("resultado", campo, num_fila, None, None, e, None)
 
-    return evaluacion["comentarios"]
+        for num_fila, polaridad in enumerate(resultado.get("comentarios", []), start=1):
+            for clave, e in polaridad.items():
+                yield base + ("resultado", "comentarios", num_fila, None, clave, e, None)
 
-@app.route('/obtener_res_tareas', methods=['POST'])
-def obtener_res_tareas():
+def generar_exportacion(ids, formato):
     """
-    Obtiene los resultados de las tareas asociadas a un software específico.
+    Genera los bloques de bytes de una exportación en el formato indicado.
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    Args:
+        ids (list): Los IDs de los softwares a exportar.
+        formato (str): "csv", "parquet" o "arrow".
 
-    Valor de retorno:
-    Una lista de los cálculos hechos con las tareas asociadas al software especificado.
+    Raises:
+        ValueError: Si el formato requiere pyarrow y no está instalado.
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    Returns:
+        generator: Un generador de bloques de bytes, de FILAS_POR_BLOQUE filas cada uno.
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
-
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    filas = generar_filas_exportacion(ids)
 
-    # Obtener los resultados del software especificado
-    resultado = resultados.get(Query().id_soft == id_soft)
+    if formato == "csv":
+        return generar_bloques_csv(filas)
 
-    # Verificar si se encontraron tareas para el software especificado
-    if not resultado:
-        response = {"error": "No se encontraron tareas para el software especificado"}
-        return jsonify(response), 404
+    # Importar pyarrow antes de empezar a generar, para informar el error de inmediato
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError(f"El formato '{formato}' requiere la biblioteca pyarrow.")
 
-    return resultado["tareas"]
+    return generar_bloques_arrow(filas, formato)
 
-@app.route('/obtener_res_tiempos', methods=['POST'])
-def obtener_res_tiempos():
+def generar_bloques_csv(filas):
     """
-    Obtiene los resultados de los tiempos asociados a un software específico.
-
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    Convierte las filas exportadas en bloques CSV (con encabezado en el primer bloque).
 
-    Valor de retorno:
-    Una lista de los cálculos hechos con los tiempos asociados al software especificado.
+    Args:
+        filas (iterable): Las filas con los valores de COLUMNAS_EXPORTACION.
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    Yields:
+        bytes: Un bloque CSV codificado en UTF-8.
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUMNAS_EXPORTACION)
+    cant = 0
 
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    for fila in filas:
 
-    # Obtener el resultado del software especificado
-    resultado = resultados.get(Query().id_soft == id_soft)
+        escritor.writerow(fila)
+        cant = cant + 1
 
-    # Verificar si se encontraron tiempos para el software especificado
-    if not resultado:
-        response = {"error": "No se encontraron tiempos para el software especificado"}
-        return jsonify(response), 404
+        if cant == FILAS_POR_BLOQUE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            cant = 0
 
-    return resultado["tiempos"]
+    yield buffer.getvalue().encode("utf-8")
 
-@app.route('/obtener_res_puntajes', methods=['POST'])
-def obtener_res_puntajes():
+def generar_bloques_arrow(filas, formato):
     """
-    Obtiene los resultados de los puntajes asociados a un software específico.
-
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    Convierte las filas exportadas en bloques Parquet (un grupo de filas por bloque) o en un flujo IPC de Arrow.
 
-    Valor de retorno:
-    Una lista de los cálculos hechos con los puntajes asociados al software especificado.
+    Args:
+        filas (iterable): Las filas con los valores de COLUMNAS_EXPORTACION.
+        formato (str): "parquet" o "arrow".
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+    Yields:
+        bytes: Los bytes escritos por cada lote de filas.
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([
+        ("id_soft", pa.int64()),
+        ("nombre", pa.string()),
+        ("version", pa.string()),
+        ("origen", pa.string()),
+        ("campo", pa.string()),
+        ("fila", pa.int64()),
+        ("columna", pa.int64()),
+        ("clave", pa.string()),
+        ("valor", pa.int64()),
+        ("texto", pa.string()),
+    ])
+
+    salida = BufferSalida()
+
+    if formato == "parquet":
+        escritor = pq.ParquetWriter(salida, esquema)
+    else:
+        escritor = pa.ipc.new_stream(salida, esquema)
 
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    def escribir_lote(lote):
+        columnas = list(zip(*lote))
+        escritor.write_batch(pa.RecordBatch.from_arrays(
+            [pa.array(columna, type=campo.type) for columna, campo in zip(columnas, esquema)], schema=esquema
+        ))
 
-    # Obtener el resultado del software especificado
-    resultado = resultados.get(Query().id_soft == id_soft)
+    lote = []
 
-    # Verificar si se encontraron puntajes para el software especificado
-    if not resultado:
-        response = {"error": "No se encontraron puntajes para el software especificado"}
-        return jsonify(response), 404
+    for fila in filas:
 
-    return resultado["puntajes"]
+        lote.append(fila)
 
-@app.route('/obtener_res_comentarios', methods=['POST'])
-def obtener_res_comentarios():
-    """
-    Obtiene los resultados de los comentarios asociados a un software específico.
+        if len(lote) == FILAS_POR_BLOQUE:
+            escribir_lote(lote)
+            lote = []
+            yield salida.extraer()
 
-    Entrada (request JSON):
-    {
-        "id_soft": 1
-    }
+    if lote:
+        escribir_lote(lote)
 
-    Valor de retorno:
-    Una lista de los cálculos hechos con los comentarios asociados al software especificado.
+    escritor.close()
+    yield salida.extraer()
 
-    Notas:
-    - El campo "id_soft" debe ser proporcionado en la solicitud.
+class BufferSalida(io.RawIOBase):
+    """
+    Archivo en memoria de solo escritura cuyo contenido se extrae por partes, para que los escritores de pyarrow
+    puedan producir un flujo de bytes sin acumular toda la salida.
     """
 
-    # Verificar si el campo "id_soft" está presente en la solicitud JSON
-    if "id_soft" not in request.json:
-        response = {"error": "Campo 'id_soft' faltante en la solicitud"}
-        return jsonify(response), 400
+    def __init__(self):
+        super().__init__()
+        self.datos = bytearray()
+        self.posicion = 0
 
-    # Obtener el ID del software especificado y convertirlo a entero
-    id_soft = int(request.json["id_soft"])
+    def writable(self):
+        return True
 
-    # Obtener el resultado del software especificado
-    resultado = resultados.get(Query().id_soft == id_soft)
+    def write(self, b):
+        self.datos.extend(b)
+        self.posicion = self.posicion + len(b)
+        return len(b)
 
-    # Verificar si se encontraron comentarios para el software especificado
-    if not resultado:
-        response = {"error": "No se encontraron comentarios para el software especificado"}
-        return jsonify(response), 404
+    def tell(self):
+        return self.posicion
 
-    return resultado["comentarios"]
+    def extraer(self):
+        """
+        Devuelve los bytes escritos desde la última extracción y los descarta del buffer.
+        """
+
+        datos = bytes(self.datos)
+        self.datos.clear()
+        return datos
 
 
 
@@ -1257,11 +7777,13 @@ if __name__ == '__main__':
     Ejecuta la aplicación Flask.
 
     Notas:
-    - La variable "app" contiene la instancia de la aplicación Flask.
+    - La aplicación se crea con crear_app y la configuración predeterminada (o la de las variables de entorno).
     - La aplicación se ejecuta en el host '0.0.0.0' o localhost, en el puerto 5000.
     - El modo de depuración está comentado, pero se puede habilitar si es necesario.
     """
 
+    app = crear_app()
+
     # Quitar el comentario de la siguiente línea para habilitar el modo de depuración
     # app.debug = True
 
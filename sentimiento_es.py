@@ -0,0 +1,314 @@
+"""
+sentimiento_es.py
+
+Descripción: Este archivo contiene un analizador de sentimientos para comentarios en español basado en un léxico de
+valencias y en las heurísticas de VADER (negaciones, intensificadores, contrastes, mayúsculas y signos de
+exclamación). Permite puntuar los comentarios directamente en español, sin traducirlos al inglés.
+
+Detalles:
+- Las valencias del léxico usan la misma escala que VADER (de -4 a 4).
+- El resultado de AnalizadorSentimientoEs.polarity_scores tiene las mismas claves que el de VADER ("neg", "neu",
+"pos" y "compound"), por lo que ambos analizadores son intercambiables.
+- Las palabras se comparan sin tildes y en minúsculas; las variantes de género y número se buscan a partir de la
+forma del léxico (p. ej. "intuitivas" coincide con "intuitivo").
+"""
+
+import math
+import re
+import unicodedata
+
+
+# constantes de las heurísticas de VADER
+INCREMENTO_INTENSIFICADOR = 0.293
+INCREMENTO_MAYUSCULAS = 0.733
+FACTOR_NEGACION = -0.74
+ALFA_NORMALIZACION = 15
+
+# palabras que niegan el sentimiento de las tres palabras siguientes
+NEGACIONES = {
+    "no", "nunca", "jamas", "ni", "tampoco", "sin", "nadie", "ninguno", "ninguna", "ningun", "nada", "nin",
+}
+
+# palabras que aumentan (valor positivo) o disminuyen (valor negativo) la intensidad de la palabra siguiente
+INTENSIFICADORES = {
+    "muy": INCREMENTO_INTENSIFICADOR,
+    "mas": INCREMENTO_INTENSIFICADOR,
+    "super": INCREMENTO_INTENSIFICADOR,
+    "bastante": INCREMENTO_INTENSIFICADOR,
+    "demasiado": INCREMENTO_INTENSIFICADOR,
+    "demasiada": INCREMENTO_INTENSIFICADOR,
+    "tan": INCREMENTO_INTENSIFICADOR,
+    "tanto": INCREMENTO_INTENSIFICADOR,
+    "realmente": INCREMENTO_INTENSIFICADOR,
+    "totalmente": INCREMENTO_INTENSIFICADOR,
+    "completamente": INCREMENTO_INTENSIFICADOR,
+    "absolutamente": INCREMENTO_INTENSIFICADOR,
+    "extremadamente": INCREMENTO_INTENSIFICADOR,
+    "increiblemente": INCREMENTO_INTENSIFICADOR,
+    "sumamente": INCREMENTO_INTENSIFICADOR,
+    "altamente": INCREMENTO_INTENSIFICADOR,
+    "enormemente": INCREMENTO_INTENSIFICADOR,
+    "especialmente": INCREMENTO_INTENSIFICADOR,
+    "particularmente": INCREMENTO_INTENSIFICADOR,
+    "verdaderamente": INCREMENTO_INTENSIFICADOR,
+    "siempre": INCREMENTO_INTENSIFICADOR,
+    "re": INCREMENTO_INTENSIFICADOR,
+    "algo": -INCREMENTO_INTENSIFICADOR,
+    "apenas": -INCREMENTO_INTENSIFICADOR,
+    "ligeramente": -INCREMENTO_INTENSIFICADOR,
+    "levemente": -INCREMENTO_INTENSIFICADOR,
+    "medio": -INCREMENTO_INTENSIFICADOR,
+    "relativamente": -INCREMENTO_INTENSIFICADOR,
+    "parcialmente": -INCREMENTO_INTENSIFICADOR,
+    "casi": -INCREMENTO_INTENSIFICADOR,
+    "ocasionalmente": -INCREMENTO_INTENSIFICADOR,
+}
+
+# "poco" delante de un adjetivo invierte su sentido a medias ("poco intuitivo")
+FACTOR_POCO = -0.5
+
+# palabras de contraste: el sentimiento anterior se atenúa y el posterior se refuerza
+CONTRASTES = {"pero", "sino", "embargo"}
+
+# léxico de valencias (palabras sin tildes, en masculino singular o en la forma verbal más frecuente)
+LEXICO = {
+    # valoraciones generales positivas
+    "bueno": 1.9, "buen": 1.9, "bien": 1.6, "mejor": 2.0, "excelente": 3.2, "excepcional": 3.0, "estupendo": 3.0,
+    "genial": 3.0, "fantastico": 3.1, "maravilloso": 3.2, "magnifico": 3.1, "increible": 2.8, "impresionante": 2.8,
+    "espectacular": 3.0, "perfecto": 3.0, "perfectamente": 2.7, "ideal": 2.4, "optimo": 2.4, "positivo": 2.2,
+    "agradable": 2.2, "bonito": 2.1, "lindo": 2.1, "hermoso": 2.6, "atractivo": 2.1, "elegante": 2.0,
+    "limpio": 1.6, "moderno": 1.3, "brillante": 2.6, "sobresaliente": 2.8, "notable": 1.9, "destacado": 2.0,
+    "correcto": 1.3, "adecuado": 1.5, "aceptable": 1.1, "suficiente": 0.8, "decente": 1.1, "satisfactorio": 2.0,
+    "recomendable": 2.2, "recomiendo": 2.2, "recomendaria": 2.2, "maravilla": 3.0, "encantador": 2.9,
+    "favorito": 2.2, "valioso": 2.1, "util": 1.9, "utilidad": 1.5, "practico": 1.8, "conveniente": 1.7,
+    "comodo": 1.9, "comodidad": 1.8, "facil": 1.9, "facilidad": 1.8, "facilmente": 1.7, "sencillo": 1.6,
+    "sencillez": 1.6, "simple": 1.1, "intuitivo": 2.1, "claro": 1.5, "claridad": 1.6, "entendible": 1.5,
+    "comprensible": 1.5, "accesible": 1.6, "amigable": 2.0, "rapido": 1.8, "rapidez": 1.8, "rapidamente": 1.5,
+    "agil": 1.8, "fluido": 1.9, "fluidez": 1.8, "veloz": 1.7, "eficiente": 2.1, "eficiencia": 1.8,
+    "eficaz": 2.1, "efectivo": 1.9, "productivo": 1.9, "productividad": 1.6, "estable": 1.7, "estabilidad": 1.6,
+    "confiable": 2.1, "fiable": 2.0, "seguro": 1.6, "seguridad": 1.3, "robusto": 1.9, "solido": 1.6,
+    "potente": 1.9, "poderoso": 1.9, "completo": 1.6, "versatil": 1.9, "flexible": 1.7, "flexibilidad": 1.6,
+    "personalizable": 1.5, "organizado": 1.6, "ordenado": 1.5, "coherente": 1.5, "consistente": 1.5,
+    "preciso": 1.8, "precision": 1.6, "exacto": 1.6, "innovador": 2.0, "novedoso": 1.7, "creativo": 1.9,
+    "funcional": 1.6, "funciona": 1.2, "funcionan": 1.2, "cumple": 1.3, "cumplen": 1.3, "resuelve": 1.6,
+    "resuelven": 1.6, "soluciona": 1.6, "ayuda": 1.7, "ayudan": 1.7, "ayudo": 1.7, "apoyo": 1.5,
+    "facilita": 1.9, "facilitan": 1.9, "mejora": 1.7, "mejoras": 1.5, "mejorado": 1.7, "ahorra": 1.6,
+    "ahorro": 1.5, "ventaja": 1.6, "ventajas": 1.6, "beneficio": 1.7, "acierto": 2.0, "exito": 2.6,
+    "exitoso": 2.6, "logro": 2.1, "calidad": 1.4, "profesional": 1.5, "amable": 2.0, "atento": 1.7,
+    "paciente": 1.2, "oportuno": 1.6, "puntual": 1.5, "agradecido": 2.2, "gracias": 1.9,
+    # emociones y actitudes positivas
+    "gusta": 1.9, "gustan": 1.9, "gusto": 1.9, "gustaria": 1.0, "encanta": 3.0, "encantan": 3.0,
+    "encanto": 2.8, "encantado": 3.0, "encantada": 3.0, "amo": 3.2, "adoro": 3.2, "disfruto": 2.3,
+    "disfrutar": 2.2, "feliz": 2.7, "felicidad": 2.8, "contento": 2.3, "satisfecho": 2.2, "satisfaccion": 2.1,
+    "alegre": 2.3, "alegria": 2.6, "divertido": 2.3, "entretenido": 1.9, "interesante": 1.7, "emocionante": 2.3,
+    "agradezco": 2.0, "confianza": 2.0, "tranquilo": 1.5, "tranquilidad": 1.7, "orgulloso": 2.2,
+    "impresiona": 2.2, "sorprende": 1.0, "bendicion": 2.5, "amor": 3.2, "amar": 3.0,
+    "wow": 2.6, "bravo": 2.5, "ok": 0.9, "vale": 0.6, "perfeccion": 3.0,
+    # valoraciones generales negativas
+    "malo": -2.5, "mal": -2.2, "peor": -2.6, "pesimo": -3.2, "terrible": -3.1, "horrible": -3.1,
+    "horroroso": -3.1, "espantoso": -3.0, "fatal": -2.9, "desastre": -3.0, "desastroso": -3.0, "basura": -3.0,
+    "inutil": -2.5, "inservible": -2.7, "deficiente": -2.2, "mediocre": -1.8, "regular": -0.6,
+    "insuficiente": -1.8, "inadecuado": -1.7, "incorrecto": -1.6, "inaceptable": -2.6, "lamentable": -2.4,
+    "negativo": -2.0, "feo": -2.1, "anticuado": -1.5, "obsoleto": -1.7, "viejo": -0.8, "sucio": -1.8,
+    "dificil": -1.6, "dificultad": -1.6, "dificultades": -1.6, "complicado": -1.7, "complejo": -1.0,
+    "confuso": -1.9, "confusa": -1.9, "confusion": -1.8, "enredado": -1.7, "incomprensible": -2.1,
+    "engorroso": -2.0, "tedioso": -1.9, "molesto": -2.0, "molesta": -2.0, "incomodo": -1.8, "lento": -1.9,
+    "lentitud": -1.9, "lentamente": -1.3, "pesado": -1.6, "tardado": -1.5, "tarda": -1.2, "tardan": -1.2,
+    "demora": -1.4, "demoras": -1.4, "retraso": -1.6, "retrasos": -1.6, "ineficiente": -2.1, "ineficaz": -2.0,
+    "inestable": -2.0, "inseguro": -1.9, "limitado": -1.4, "limitaciones": -1.4, "limitacion": -1.4,
+    "incompleto": -1.6, "inconsistente": -1.7, "impreciso": -1.6, "desordenado": -1.7, "caotico": -2.2,
+    "caro": -1.3, "costoso": -1.3, "aburrido": -1.9, "aburre": -1.9, "abrumador": -1.7, "frustrante": -2.4,
+    "frustra": -2.3, "frustracion": -2.4, "decepcionante": -2.4, "decepcion": -2.4, "decepciona": -2.3,
+    "decepcionado": -2.3, "insatisfecho": -2.2, "descontento": -2.1, "enojado": -2.5, "enojo": -2.5,
+    "molestia": -1.9, "molestias": -1.9, "odio": -3.2, "odia": -3.0, "detesto": -3.1, "triste": -2.1,
+    "tristeza": -2.1, "miedo": -2.0, "preocupa": -1.6, "preocupacion": -1.6, "estres": -2.0, "estresante": -2.2,
+    "cansado": -1.5, "cansa": -1.5, "agotador": -1.9, "harto": -2.3, "arrepentido": -2.0, "lastima": -1.8,
+    "perdida": -1.8, "pierde": -1.4, "pierdo": -1.5, "perder": -1.4, "perdi": -1.6,
+    # problemas y fallos
+    "problema": -1.7, "problemas": -1.7, "error": -1.8, "errores": -1.8, "fallo": -2.0, "fallos": -2.0,
+    "falla": -2.0, "fallas": -2.0, "fallan": -2.0, "defecto": -1.8, "defectos": -1.8, "bug": -1.9,
+    "bugs": -1.9, "cuelga": -2.2, "congela": -2.2, "bloquea": -2.0, "cierra": -0.6, "colapsa": -2.6,
+    "rompe": -2.0, "roto": -2.1, "daña": -2.2, "dano": -2.0, "interrumpen": -1.7, "interrumpe": -1.7,
+    "interrupcion": -1.6, "interrupciones": -1.6, "falta": -1.4, "faltan": -1.4, "carece": -1.6,
+    "carencia": -1.6, "ausencia": -1.2, "queja": -1.9, "quejas": -1.9, "reclamo": -1.6, "critica": -1.5,
+    "riesgo": -1.4, "peligro": -2.2, "peligroso": -2.4, "vulnerable": -1.6, "inconveniente": -1.8,
+    "inconvenientes": -1.8, "obstaculo": -1.7, "desventaja": -1.6, "desventajas": -1.6, "dificulta": -1.8,
+    "imposible": -2.0, "complica": -1.7, "confunde": -1.8, "pierden": -1.4, "caida": -1.7, "caidas": -1.7,
+    "ruido": -1.0, "lag": -1.8, "spam": -2.0, "mentira": -2.4, "engaño": -2.6, "estafa": -3.1, "fraude": -3.0,
+}
+
+# terminaciones flexivas que se prueban para encontrar la forma del léxico (terminación de la palabra, reemplazo)
+TERMINACIONES = [("as", "o"), ("os", "o"), ("a", "o"), ("es", ""), ("s", "")]
+
+# expresión regular para separar palabras y signos de puntuación relevantes
+PATRON_TOKENS = re.compile(r"[^\W\d_]+|[!?]")
+
+
+def normalizar(palabra):
+    """
+    Convierte una palabra a minúsculas y le quita las tildes (conservando la "ñ").
+
+    Args:
+        palabra (str): La palabra original.
+
+    Returns:
+        str: La palabra normalizada.
+    """
+
+    palabra = palabra.lower().replace("ñ", "\0")
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFD", palabra) if unicodedata.category(c) != "Mn"
+    )
+    return sin_tildes.replace("\0", "ñ")
+
+
+def buscar_valencia(palabra):
+    """
+    Busca la valencia de una palabra normalizada en el léxico, probando también sus variantes de género y número.
+
+    Args:
+        palabra (str): La palabra normalizada.
+
+    Returns:
+        float: La valencia de la palabra, o 0 si no está en el léxico.
+    """
+
+    if palabra in LEXICO:
+        return LEXICO[palabra]
+
+    for terminacion, reemplazo in TERMINACIONES:
+        if palabra.endswith(terminacion) and len(palabra) > len(terminacion) + 2:
+            candidata = palabra[:-len(terminacion)] + reemplazo
+            if candidata in LEXICO:
+                return LEXICO[candidata]
+
+    return 0.0
+
+
+class AnalizadorSentimientoEs:
+    """
+    Analizador de sentimientos para textos en español, con la misma interfaz que SentimentIntensityAnalyzer de VADER.
+
+    Notas:
+    - El léxico y las reglas son datos del módulo, por lo que crear una instancia no tiene costo.
+    """
+
+    def polarity_scores(self, texto):
+        """
+        Calcula la polaridad de un texto en español.
+
+        Args:
+            texto (str): El texto a analizar.
+
+        Returns:
+            dict: Las proporciones de sentimiento negativo ("neg"), neutral ("neu") y positivo ("pos"), y el
+            puntaje compuesto normalizado entre -1 y 1 ("compound"), igual que VADER.
+        """
+
+        tokens = PATRON_TOKENS.findall(texto)
+        palabras = [t for t in tokens if t not in ("!", "?")]
+        normalizadas = [normalizar(p) for p in palabras]
+
+        # Las mayúsculas solo enfatizan si el texto no está escrito completamente en mayúsculas
+        hay_mayusculas_mixtas = any(p.isupper() for p in palabras) and not all(p.isupper() for p in palabras)
+
+        sentimientos = []
+
+        for i, palabra in enumerate(normalizadas):
+
+            # Los intensificadores y las negaciones no tienen valencia propia
+            if palabra in INTENSIFICADORES or palabra in NEGACIONES or palabra == "poco":
+                sentimientos.append(0.0)
+                continue
+
+            valencia = buscar_valencia(palabra)
+
+            if valencia == 0:
+                sentimientos.append(0.0)
+                continue
+
+            # Enfatizar las palabras en mayúsculas
+            if hay_mayusculas_mixtas and palabras[i].isupper():
+                valencia = valencia + math.copysign(INCREMENTO_MAYUSCULAS, valencia)
+
+            # Aplicar los intensificadores y las negaciones de las tres palabras anteriores
+            for distancia in range(1, 4):
+
+                if i - distancia < 0:
+                    break
+
+                anterior = normalizadas[i - distancia]
+
+                # El efecto de los intensificadores disminuye con la distancia, como en VADER
+                if anterior in INTENSIFICADORES:
+                    incremento = INTENSIFICADORES[anterior] * (1, 0.95, 0.9)[distancia - 1]
+                    valencia = valencia + math.copysign(incremento, valencia)
+
+                if anterior == "poco" and distancia == 1:
+                    valencia = valencia * FACTOR_POCO
+
+                if anterior in NEGACIONES:
+                    valencia = valencia * FACTOR_NEGACION
+                    break
+
+            sentimientos.append(valencia)
+
+        # Atenuar el sentimiento anterior a un contraste y reforzar el posterior
+        for i, palabra in enumerate(normalizadas):
+            if palabra in CONTRASTES:
+                sentimientos = [
+                    s * 0.5 if j < i else s * 1.5 if j > i else s for j, s in enumerate(sentimientos)
+                ]
+                break
+
+        return self.puntajes(sentimientos, tokens)
+
+    def puntajes(self, sentimientos, tokens):
+        """
+        Convierte los sentimientos de cada palabra en las proporciones y el puntaje compuesto de VADER.
+
+        Args:
+            sentimientos (list): La valencia final de cada palabra (0 para las palabras neutrales).
+            tokens (list): Los tokens del texto, incluidos los signos "!" y "?".
+
+        Returns:
+            dict: Un diccionario con las claves "neg", "neu", "pos" y "compound".
+        """
+
+        if not sentimientos:
+            return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+
+        suma = sum(sentimientos)
+
+        # Los signos de exclamación e interrogación amplifican el sentimiento
+        exclamaciones = min(tokens.count("!"), 4) * 0.292
+        interrogaciones = tokens.count("?")
+        interrogaciones = 0 if interrogaciones < 2 else min(interrogaciones * 0.18, 0.96)
+        amplificacion = exclamaciones + interrogaciones
+
+        if suma > 0:
+            suma = suma + amplificacion
+        elif suma < 0:
+            suma = suma - amplificacion
+
+        compuesto = suma / math.sqrt(suma * suma + ALFA_NORMALIZACION)
+        compuesto = max(-1.0, min(1.0, compuesto))
+
+        # Proporciones de sentimiento positivo, negativo y neutral
+        suma_pos = sum(s + 1 for s in sentimientos if s > 0)
+        suma_neg = sum(s - 1 for s in sentimientos if s < 0)
+        cant_neu = sum(1 for s in sentimientos if s == 0)
+
+        if suma_pos > abs(suma_neg):
+            suma_pos = suma_pos + amplificacion
+        elif suma_pos < abs(suma_neg):
+            suma_neg = suma_neg - amplificacion
+
+        total = suma_pos + abs(suma_neg) + cant_neu
+
+        return {
+            "neg": round(abs(suma_neg) / total, 3),
+            "neu": round(cant_neu / total, 3),
+            "pos": round(suma_pos / total, 3),
+            "compound": round(compuesto, 4),
+        }